@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (payload compression)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare compression ratios on small envelopes: gzip, deflate, deflate with the
+built-in Caliper dictionary, and deflate with a dictionary trained on sample
+traffic (from different users and documents than the measured envelopes).
+
+    python benchmarks/bench_compression.py
+"""
+
+from common import build_entities, build_events, report, timed
+
+import caliper.entities as entities
+import caliper.request as request
+from caliper.compression import CALIPER_ZDICT, Compressor
+from caliper.util.zdict import train_zdict
+
+SENSOR_ID = "https://example.edu/sensors/1"
+SEND_TIME = "2016-11-15T11:05:01.000Z"
+
+
+def build_traffic(count, size, offset=0):
+    # envelopes of `size` events each, every one from a different user
+    r = []
+    for i in range(offset, offset + count):
+        ents = build_entities()
+        ents["actor"] = entities.Person(id="https://example.edu/users/{}".format(i))
+        envelope = request.Envelope(
+            data=build_events(size, ents=ents), send_time=SEND_TIME, sensor_id=SENSOR_ID
+        )
+        r.append(envelope.as_json(thin_context=True, thin_props=True).encode("utf-8"))
+    return r
+
+
+def main(sizes=(1, 10, 25, 50), samples=200):
+    trained = train_zdict(build_traffic(samples, 5, offset=10000))
+    codecs = [
+        ("gzip", Compressor("gzip")),
+        ("deflate", Compressor("deflate")),
+        ("deflate + built-in zdict", Compressor("deflate", zdict=CALIPER_ZDICT)),
+        ("deflate + trained zdict", Compressor("deflate", zdict=trained)),
+    ]
+    for size in sizes:
+        payloads = build_traffic(20, size)
+        raw = sum(len(p) for p in payloads)
+        rows = []
+        for name, compressor in codecs:
+            compressed = sum(len(compressor.compress(p)) for p in payloads)
+            ms = timed(lambda: [compressor.compress(p) for p in payloads])
+            rows.append(
+                (
+                    name,
+                    raw // len(payloads),
+                    compressed // len(payloads),
+                    "{:.1f}x".format(raw / compressed),
+                    "{:.3f}".format(ms / len(payloads)),
+                )
+            )
+        report(
+            "Compression, {}-event envelopes (zdicts: built-in {} B, trained {} B)".format(
+                size, len(CALIPER_ZDICT), len(trained)
+            ),
+            rows,
+            ("codec", "bytes", "compressed", "ratio", "ms each"),
+        )
+
+
+if __name__ == "__main__":
+    main()
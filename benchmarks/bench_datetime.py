@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (datetime validation)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare validating datetimes with the fast path against the previous full
+aniso8601 parse, on their own and when building events.
+
+    python benchmarks/bench_datetime.py
+"""
+
+from aniso8601 import parse_datetime as aniso_parse_datetime
+
+from common import build_entities, build_events, report, timed
+
+import caliper.base as base
+
+
+# the validator as it was before the fast path, kept here for comparison
+def _legacy_is_valid_datetime(dt):
+    try:
+        assert base._datetime_re.match(dt)
+        aniso_parse_datetime(dt)
+        return True
+    except Exception:
+        return False
+
+
+def _with_legacy_validator(fn):
+    def run():
+        saved = base.is_valid_datetime
+        base.is_valid_datetime = _legacy_is_valid_datetime
+        try:
+            return fn()
+        finally:
+            base.is_valid_datetime = saved
+
+    return run
+
+
+def main(count=500):
+    stamps = [
+        "2016-11-{:02d}T{:02d}:{:02d}:{:02d}.{:03d}Z".format(
+            i % 30 + 1, i % 24, i % 60, (i * 7) % 60, i % 1000
+        )
+        for i in range(count * 10)
+    ]
+
+    def validate():
+        return all(base.is_valid_datetime(dt) for dt in stamps)
+
+    def build():
+        return build_events(count, ents=build_entities())
+
+    for title, fn in (
+        ("Validating {} datetimes".format(len(stamps)), validate),
+        ("Building {} events".format(count), build),
+    ):
+        cases = [
+            ("aniso8601 parse", _with_legacy_validator(fn)),
+            ("fast path", fn),
+        ]
+        rows = [(name, "{:.2f}".format(timed(f))) for name, f in cases]
+        report(title, rows, ("path", "best ms"))
+
+
+if __name__ == "__main__":
+    main()
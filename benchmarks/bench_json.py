@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (JSON backends)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare the JSON backends, encoding and decoding a 500-event envelope.
+
+    python benchmarks/bench_json.py
+"""
+
+import json
+
+from common import build_envelope, report, timed
+
+from caliper.base import JSON_BACKENDS, get_json_backend
+
+
+def main(count=500):
+    d = build_envelope(count).as_dict(thin_context=True, thin_props=True)
+    legacy = json.dumps(d, sort_keys=True)
+    rows = [
+        (
+            "json.dumps(sort_keys=True)",
+            "{:.2f}".format(timed(lambda: json.dumps(d, sort_keys=True))),
+            "{:.2f}".format(timed(lambda: json.loads(legacy))),
+        )
+    ]
+    canonical = None
+    for name in sorted(JSON_BACKENDS):
+        try:
+            backend = get_json_backend(name)
+        except ValueError as e:
+            print("Skipping {}: {}".format(name, e))
+            continue
+        encoded = backend.dumpb(d)
+        canonical = canonical or encoded
+        assert encoded == canonical, "backends disagree on canonical form"
+        rows.append(
+            (
+                "{} backend".format(name),
+                "{:.2f}".format(timed(lambda: backend.dumpb(d))),
+                "{:.2f}".format(timed(lambda: backend.loads(encoded))),
+            )
+        )
+    report(
+        "JSON backends, {}-event envelope".format(count),
+        rows,
+        ("codec", "dumps ms", "loads ms"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (memory per event)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Measure the memory that common event types hold per event, with tracemalloc,
+for events that share their entities, as in a batch buffer.
+
+    python benchmarks/bench_memory.py
+"""
+
+import tracemalloc
+
+from common import build_entities, report
+
+import caliper.entities as entities
+import caliper.events as events
+from caliper.constants import CALIPER_ACTIONS
+
+EVENT_TIME = "2016-11-15T10:15:00.000Z"
+
+
+def _cases(ents):
+    document = entities.Document(id="https://example.edu/etexts/201.epub")
+    assessment = entities.Assessment(id="https://example.edu/terms/201601/assess/1")
+    return [
+        (
+            "ViewEvent",
+            lambda: events.ViewEvent(
+                action=CALIPER_ACTIONS["VIEWED"],
+                object=document,
+                eventTime=EVENT_TIME,
+                **ents
+            ),
+        ),
+        (
+            "NavigationEvent",
+            lambda: events.NavigationEvent(
+                action=CALIPER_ACTIONS["NAVIGATED_TO"],
+                object=document,
+                eventTime=EVENT_TIME,
+                **ents
+            ),
+        ),
+        (
+            "SessionEvent",
+            lambda: events.SessionEvent(
+                action=CALIPER_ACTIONS["LOGGED_IN"],
+                object=ents["edApp"],
+                eventTime=EVENT_TIME,
+                **ents
+            ),
+        ),
+        (
+            "AssessmentEvent",
+            lambda: events.AssessmentEvent(
+                action=CALIPER_ACTIONS["STARTED"],
+                object=assessment,
+                eventTime=EVENT_TIME,
+                **ents
+            ),
+        ),
+    ]
+
+
+def bytes_per_event(build, count):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        held = [build() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del held
+    return (after - before) / count
+
+
+def main(count=10000):
+    rows = [
+        (name, "{:.0f}".format(bytes_per_event(build, count)))
+        for name, build in _cases(build_entities())
+    ]
+    report("Holding {} events".format(count), rows, ("event", "bytes/event"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (connection pooling)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare send throughput against a local HTTP/1.1 endpoint with and without
+keep-alive connection pooling, from one thread and from several.
+
+    python benchmarks/bench_pooling.py
+"""
+
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import build_events, report
+
+from caliper.base import HttpOptions
+from caliper.request import HttpRequestor
+
+SENSOR_ID = "https://example.edu/sensors/1"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def throughput(url, keep_alive, threads, sends):
+    requestor = HttpRequestor(
+        options=HttpOptions(host=url, keep_alive=keep_alive, pool_maxsize=threads)
+    )
+    events = build_events(5)
+
+    def run():
+        for _ in range(sends):
+            requestor.send(events, sensor_id=SENSOR_ID)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    requestor.close()
+    return threads * sends / elapsed
+
+
+def main(sends=200):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{}/".format(server.server_address[1])
+    rows = []
+    for threads in (1, 4):
+        for keep_alive in (False, True):
+            rows.append(
+                (
+                    threads,
+                    "pooled" if keep_alive else "new connection per send",
+                    "{:.0f}".format(throughput(url, keep_alive, threads, sends)),
+                )
+            )
+    server.shutdown()
+    report(
+        "Sends of 5-event envelopes to a local endpoint",
+        rows,
+        ("threads", "connections", "sends/s"),
+    )
+
+
+if __name__ == "__main__":
+    main()
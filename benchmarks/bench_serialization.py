@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (envelope serialization)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare the copy-free serialization path against the previous, defensively
+copying one for a 500-event envelope.
+
+    python benchmarks/bench_serialization.py
+"""
+
+import copy
+import json
+
+from collections.abc import MutableMapping, MutableSequence
+
+from common import build_envelope, report, timed, traced
+
+from caliper.base import CaliperSerializable
+
+
+# the unpacking as it was before the copy-free path, kept here for comparison
+def _legacy_unpack_list(items, known_contexts, thin):
+    r = []
+    for item in items:
+        if isinstance(item, MutableSequence):
+            r.append(_legacy_unpack_list(item, known_contexts, thin))
+        elif isinstance(item, CaliperSerializable):
+            r.append(_legacy_unpack_object(item, known_contexts, thin))
+        else:
+            r.append(copy.deepcopy(item))
+    return r
+
+
+def _legacy_unpack_object(obj, known_contexts, thin):
+    r = {}
+    kc = copy.deepcopy(known_contexts)
+    if obj._context_hashes.context not in known_contexts:
+        r.update({"@context": obj.context})
+        if thin:
+            kc.update(set(obj._context_hashes))
+    for k, v in sorted(obj._get_prop_items()):
+        if k == "@context" or (thin and v in (None, {}, [])):
+            continue
+        elif isinstance(v, MutableSequence):
+            value = _legacy_unpack_list(v, kc, thin)
+        elif isinstance(v, CaliperSerializable):
+            value = _legacy_unpack_object(v, kc, thin)
+        elif isinstance(v, MutableMapping):
+            value = v
+        else:
+            value = v
+        r.update({k: value})
+    return copy.deepcopy(r)
+
+
+def _legacy_as_dict(envelope, thin):
+    return copy.deepcopy(
+        {
+            "sendTime": envelope.sendTime,
+            "sensor": envelope.sensor,
+            "dataVersion": envelope.dataVersion,
+            "data": _legacy_unpack_list(envelope.data, set(), thin),
+        }
+    )
+
+
+def main(count=500):
+    envelope = build_envelope(count)
+    assert _legacy_as_dict(envelope, True) == envelope.as_dict(
+        thin_context=True, thin_props=True
+    )
+    cases = [
+        ("legacy as_dict", lambda: _legacy_as_dict(envelope, True)),
+        (
+            "legacy as_json",
+            lambda: json.dumps(_legacy_as_dict(envelope, True), sort_keys=True),
+        ),
+        (
+            "as_dict (deep_copy=True)",
+            lambda: envelope.as_dict(thin_context=True, thin_props=True),
+        ),
+        (
+            "as_dict (deep_copy=False)",
+            lambda: envelope.as_dict(
+                thin_context=True, thin_props=True, deep_copy=False
+            ),
+        ),
+        ("as_json", lambda: envelope.as_json(thin_context=True, thin_props=True)),
+    ]
+    rows = [
+        (name, "{:.2f}".format(timed(fn)), "{:.1f}".format(traced(fn)))
+        for name, fn in cases
+    ]
+    report(
+        "Serializing a {}-event envelope".format(count),
+        rows,
+        ("path", "best ms", "peak KiB"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (streaming envelope encoding)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare peak memory for encoding a 10k-event backfill envelope as one
+json-string against streaming it into a byte sink.
+
+    python benchmarks/bench_streaming.py
+"""
+
+from common import SEND_TIME, SENSOR_ID, build_envelope, report, timed, traced
+
+from caliper.request import EnvelopeEncoder
+
+
+class _NullSink(object):
+    def write(self, b):
+        pass
+
+
+def main(count=10000):
+    envelope = build_envelope(count)
+
+    def whole():
+        payload, ids = envelope.as_json_with_ids(thin_context=True, thin_props=True)
+        payload.encode("utf-8")
+
+    def streamed():
+        EnvelopeEncoder(
+            send_time=SEND_TIME, sensor_id=SENSOR_ID, thin_context=True, thin_props=True
+        ).write(envelope.data, _NullSink())
+
+    rows = [
+        (name, "{:.1f}".format(timed(fn, repeat=3)), "{:.1f}".format(traced(fn)))
+        for name, fn in (("as_json_with_ids", whole), ("EnvelopeEncoder", streamed))
+    ]
+    report(
+        "Encoding a {}-event envelope".format(count),
+        rows,
+        ("path", "best ms", "peak KiB"),
+    )
+
+
+if __name__ == "__main__":
+    main()
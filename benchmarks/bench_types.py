@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (type checks)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare building events with the type registry's lookups against the previous
+importlib-based ones.
+
+    python benchmarks/bench_types.py
+"""
+
+import importlib
+
+from common import build_entities, build_events, report, timed
+
+import caliper.base as base
+from caliper.constants import CALIPER_CLASSES
+
+
+# the lookups as they were before the registry, kept here for comparison
+def _legacy_get_type(t):
+    m = c = ""
+    if t and isinstance(t, type):
+        m, c = t.__module__, t.__name__
+    elif t:
+        m, c = CALIPER_CLASSES.get(t, ".").rsplit(".", 1)
+    try:
+        return getattr(importlib.import_module(m), c)
+    except (ImportError, ValueError) as e:
+        raise ValueError("Unknown type: {0}".format(str(t))) from e
+
+
+def _legacy_is_subtype(t1, t2):
+    return issubclass(_legacy_get_type(t1), _legacy_get_type(t2))
+
+
+def _with_legacy_lookups(fn):
+    def run():
+        saved = base._get_type, base.is_subtype
+        base._get_type, base.is_subtype = _legacy_get_type, _legacy_is_subtype
+        try:
+            return fn()
+        finally:
+            base._get_type, base.is_subtype = saved
+
+    return run
+
+
+def main(count=500):
+    def build():
+        return build_events(count, ents=build_entities())
+
+    cases = [
+        ("legacy lookups", _with_legacy_lookups(build)),
+        ("type registry", build),
+    ]
+    rows = [(name, "{:.2f}".format(timed(fn))) for name, fn in cases]
+    report("Building {} events".format(count), rows, ("path", "best ms"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (validation levels)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Compare building events at each validation level.
+
+    python benchmarks/bench_validation.py
+"""
+
+from common import build_entities, build_events, report, timed
+
+import caliper.base as base
+
+
+def main(count=500):
+    def build_at(level):
+        def run():
+            with base.validation_level(level):
+                return build_events(count, ents=build_entities())
+
+        return run
+
+    rows = []
+    strict = None
+    for level in base.VALIDATION_LEVELS:
+        best = timed(build_at(level), repeat=20)
+        strict = strict or best
+        rows.append((level, "{:.2f}".format(best), "{:.2f}x".format(strict / best)))
+    report("Building {} events".format(count), rows, ("level", "best ms", "speedup"))
+
+
+if __name__ == "__main__":
+    main()
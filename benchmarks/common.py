@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Caliper-python benchmarking package (shared helpers for benchmark scripts)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import caliper.entities as entities
+import caliper.events as events
+import caliper.request as request
+from caliper.constants import CALIPER_ACTIONS
+
+SENSOR_ID = "https://example.edu/sensors/1"
+SEND_TIME = "2016-11-15T11:05:01.000Z"
+
+
+def build_entities():
+    return {
+        "actor": entities.Person(id="https://example.edu/users/554433"),
+        "edApp": entities.SoftwareApplication(id="https://example.edu", version="v2"),
+        "group": entities.CourseSection(
+            id="https://example.edu/terms/201601/courses/7/sections/1",
+            academicSession="Fall 2016",
+            courseNumber="CPS 435-01",
+            name="CPS 435 Learning Analytics, Section 01",
+        ),
+        "session": entities.Session(
+            id="https://example.edu/sessions/1f6442a482de72ea6ad134943812bff564a76259",
+            startedAtTime="2016-11-15T10:00:00.000Z",
+        ),
+    }
+
+
+def build_event(ents, index=0):
+    return events.ViewEvent(
+        action=CALIPER_ACTIONS["VIEWED"],
+        object=entities.Document(
+            id="https://example.edu/etexts/{}.epub".format(index),
+            name="IMS Caliper Implementation Guide",
+            dateCreated="2016-08-01T06:00:00.000Z",
+            version="1.1",
+            keywords=["caliper", "analytics"],
+            extensions={"pages": [1, 2, 3]},
+        ),
+        eventTime="2016-11-15T10:15:00.000Z",
+        **ents
+    )
+
+
+def build_events(count, ents=None):
+    ents = ents or build_entities()
+    return [build_event(ents, index=i) for i in range(count)]
+
+
+def build_envelope(count, ents=None):
+    return request.Envelope(
+        data=build_events(count, ents=ents), send_time=SEND_TIME, sensor_id=SENSOR_ID
+    )
+
+
+def timed(fn, repeat=5):
+    # best-of-n wall-clock time, in milliseconds
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def traced(fn):
+    # peak traced memory, in KiB, while running fn once
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def report(title, rows, headers):
+    print(title)
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)
+    ]
+    line = "  ".join("{{:>{}}}".format(w) for w in widths)
+    print(line.format(*headers))
+    for r in rows:
+        print(line.format(*r))
+    print()
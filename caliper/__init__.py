@@ -28,14 +28,14 @@ Caliper-compliant sensor or endpoint for you learning services.
 """
 from caliper.base import HttpOptions
 from caliper.constants import CALIPER_VERSION
-from caliper.sensor import Sensor, SimpleSensor
+from caliper.sensor import AsyncSensor, Sensor, SimpleSensor
 
 __title__ = "IMSGlobal_Caliper"
 __version__ = "1.2.0.0"
 __build__ = 0x01020000
 __author__ = "IMS Global Learning Consortium, Inc."
 __license__ = "LGPLv3"
-__all__ = ["Sensor", "SimpleSensor", "HttpOptions", CALIPER_VERSION]
+__all__ = ["AsyncSensor", "Sensor", "SimpleSensor", "HttpOptions", CALIPER_VERSION]
 
 
 def build_default_sensor(sensor_id=None):
@@ -55,6 +55,13 @@ def build_sensor_from_config(config_options=None, sensor_id=None):
     )
 
 
+def build_async_sensor_from_config(config_options=None, sensor_id=None):
+    return AsyncSensor.fashion_sensor_with_config(
+        config_options=config_options or HttpOptions(optimize_serialization=True),
+        sensor_id=sensor_id,
+    )
+
+
 def build_simple_sensor(config_options=None, sensor_id=None):
     return SimpleSensor.fashion_simple_sensor(
         config_options=config_options, sensor_id=sensor_id
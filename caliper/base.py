@@ -18,16 +18,22 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program. If not, see http://www.gnu.org/licenses/.
 
+import calendar
+import contextlib
+import contextvars
 import copy
+import functools
 import hashlib
 import importlib
 import json
+import math
 import re
+import requests
 import warnings
 import uuid
+import weakref
 
 from aniso8601 import (
-    parse_datetime as aniso_parse_datetime,
     parse_time as aniso_parse_time,
     parse_duration as aniso_parse_duration,
 )
@@ -36,6 +42,12 @@ from collections import namedtuple
 
 from rfc3986 import api as rfc3986_api, validators as rfc3986_validators
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from caliper.compression import CONTENT_ENCODINGS
 from caliper.constants import (
     CALIPER_CLASSES,
     CALIPER_CORE_CONTEXT,
@@ -54,7 +66,7 @@ from caliper.constants import (
 _uri_validator = rfc3986_validators.Validator().require_presence_of("scheme",)
 
 _datetime_re = re.compile(
-    r"\A{YYYY}-{MM}-{DD}T{HH}:{mm}:{ss}.{SSS}Z\Z".format(
+    r"\A{YYYY}-{MM}-{DD}T{HH}:{mm}:{ss}[.,]{SSS}Z\Z".format(
         YYYY="([0-9]{4})",
         MM="([0-9]{2})",
         DD="([0-9]{2})",
@@ -70,11 +82,101 @@ _uuid_urn_re = re.compile(
 )
 
 
+# orjson writes some floats differently from the standard library: exponents
+# without a sign or padding ("1e16" rather than "1e+16"), and small numbers in
+# decimal ("0.00001" rather than "1e-05"); output with a number token that has
+# an exponent or lies below 1e-4 falls back to the standard library. To keep
+# the check fast, it maps bytes to character classes (digits and "-" to "0",
+# '"' to "q", "[" to ",") so that the searches have literal prefixes; a match
+# inside a string only costs the fallback's time
+def _byte_class(i):
+    if 48 <= i <= 57 or i == 45:
+        return ord("0")
+    elif i in b"e.:,":
+        return i
+    elif i == ord("["):
+        return ord(",")
+    elif i == ord('"'):
+        return ord("q")
+    return ord("x")
+
+
+_float_token_classes = bytes(_byte_class(i) for i in range(256))
+_float_token_res = (
+    re.compile(rb"q:0[0.]*(?:e|\.0000)"),
+    re.compile(rb",0[0.]*(?:e|\.0000)"),
+)
+
+
+def _has_divergent_float(b):
+    t = b.translate(_float_token_classes)
+    return any(r.search(t) for r in _float_token_res)
+
+
+# orjson also writes NaN and the infinities as null, where the standard library
+# writes NaN, Infinity and -Infinity; only output holding a null can hide one,
+# so only that output has its object searched for them
+def _has_non_finite_float(obj):
+    stack = [obj]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, float):
+            if not math.isfinite(v):
+                return True
+        elif isinstance(v, dict):
+            stack.extend(v.values())
+        elif isinstance(v, (list, tuple)):
+            stack.extend(v)
+    return False
+
+
 # deprecation convenience function
 def deprecation(m):
     warnings.warn(m, DeprecationWarning, stacklevel=2)
 
 
+# validation levels for building entities and events: strict checks every
+# value, and trusted has the property setters only check that required
+# properties are present, for producers whose events are valid by
+# construction; ensure_type() checks stay strict at every level
+VALIDATION_STRICT = "strict"
+VALIDATION_TRUSTED = "trusted"
+VALIDATION_LEVELS = (VALIDATION_STRICT, VALIDATION_TRUSTED)
+
+_default_validation_level = VALIDATION_STRICT
+_validation_level = contextvars.ContextVar("caliper_validation_level", default=None)
+
+
+def _ensure_validation_level(level):
+    if level not in VALIDATION_LEVELS:
+        raise ValueError("Unknown validation level: {0}".format(level))
+    return level
+
+
+def get_validation_level():
+    return _validation_level.get() or _default_validation_level
+
+
+# sets the level for every thread and task that hasn't scoped its own
+def set_validation_level(level):
+    global _default_validation_level
+    _default_validation_level = _ensure_validation_level(level)
+
+
+# scopes a level to the current thread or task, for the span of a with block
+@contextlib.contextmanager
+def validation_level(level):
+    token = _validation_level.set(_ensure_validation_level(level))
+    try:
+        yield level
+    finally:
+        _validation_level.reset(token)
+
+
+def _is_trusted():
+    return get_validation_level() == VALIDATION_TRUSTED
+
+
 # profile handling functions
 def is_valid_profile(p):
     return p in CALIPER_PROFILES.values()
@@ -82,7 +184,7 @@ def is_valid_profile(p):
 
 def _suggest_profile(prf, ctxt, typ):
     if prf:
-        if not is_valid_profile(prf):
+        if not (_is_trusted() or is_valid_profile(prf)):
             raise ValueError(
                 "{0} not in the list of valid Caliper profiles.".format(prf)
             )
@@ -101,6 +203,10 @@ def _suggest_profile(prf, ctxt, typ):
 
 # named tuple to make it easier to handle the context hashes for a Caliper object
 ContextHash = namedtuple("ContextHash", ["context", "context_base"])
+_NO_CONTEXT_HASHES = ContextHash(None, None)
+
+# named tuple to report on the use of the per-instance serialization cache
+SerializationCacheInfo = namedtuple("SerializationCacheInfo", ["hits", "misses"])
 
 
 # context handling functions
@@ -123,9 +229,30 @@ def _get_base_context(ctxt):
 
 
 def _get_context_hash(ctxt):
+    if isinstance(ctxt, str):
+        return _get_str_context_hash(ctxt)
     return hashlib.md5(json.dumps(ctxt, sort_keys=True).encode("utf-8")).hexdigest()
 
 
+# nearly every object has one of the few Caliper contexts, by URI, and so
+# shares its hashes
+@functools.lru_cache(maxsize=64)
+def _get_str_context_hash(ctxt):
+    return hashlib.md5(json.dumps(ctxt).encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _get_str_context_hashes(ctxt):
+    h = _get_str_context_hash(ctxt)
+    return ContextHash(h, h)
+
+
+def _get_context_hashes(ctxt, ctxt_base):
+    if isinstance(ctxt, str):
+        return _get_str_context_hashes(ctxt)
+    return ContextHash(_get_context_hash(ctxt), _get_context_hash(ctxt_base))
+
+
 def _get_root_context_for_profile(p):
     return CALIPER_CONTEXTS.get(p, [CALIPER_CORE_CONTEXT])[0]
 
@@ -137,13 +264,25 @@ def _is_valid_context_for_base(c1, c2):
 
 
 # date and time validation
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+# datetimes have a single fixed shape, so range and calendar checks on its
+# fields give the same verdicts as a full ISO 8601 parse at a fraction of the
+# cost; like aniso8601, we let through a leap second at any minute, as long
+# as it has no fractional part
 def is_valid_datetime(dt):
-    try:
-        assert _datetime_re.match(dt)
-        aniso_parse_datetime(dt)
-        return True
-    except Exception:
+    m = _datetime_re.match(dt) if isinstance(dt, str) else None
+    if not m:
+        return False
+    year, month, day, hour, minute, second, millis = map(int, m.groups())
+    if not (year and 1 <= month <= 12 and day):
         return False
+    if day > _DAYS_IN_MONTH[month] and not (
+        month == 2 and day == 29 and calendar.isleap(year)
+    ):
+        return False
+    return hour < 24 and minute < 60 and (second < 60 or (second, millis) == (60, 0))
 
 
 def is_valid_duration(dur):
@@ -163,7 +302,7 @@ def is_valid_time(time):
 
 
 # URI/URN/UUID validation
-def is_valid_URI(uri):
+def _check_URI(uri):
     try:
         _uri_validator.validate(rfc3986_api.uri_reference(uri))
         return True
@@ -171,6 +310,44 @@ def is_valid_URI(uri):
         return False
 
 
+# verdicts on strings get memoized for the most recently checked URIs, as the
+# same few ids tend to come up over and over; see set_uri_cache_size()
+URI_CACHE_SIZE = 4096
+
+_cached_check_URI = functools.lru_cache(maxsize=URI_CACHE_SIZE)(_check_URI)
+
+UriCacheInfo = namedtuple(
+    "UriCacheInfo", ["hits", "misses", "maxsize", "currsize", "hit_rate"]
+)
+
+
+def is_valid_URI(uri):
+    if isinstance(uri, str):
+        return _cached_check_URI(uri)
+    return _check_URI(uri)
+
+
+# sets how many URIs' verdicts to keep (0 for none), starting the cache and its
+# counts afresh
+def set_uri_cache_size(maxsize):
+    global _cached_check_URI
+    if int(maxsize) < 0:
+        raise ValueError("new cache size must be at least 0 URIs")
+    _cached_check_URI = functools.lru_cache(maxsize=int(maxsize))(_check_URI)
+
+
+def get_uri_cache_info():
+    info = _cached_check_URI.cache_info()
+    lookups = info.hits + info.misses
+    return UriCacheInfo(
+        hits=info.hits,
+        misses=info.misses,
+        maxsize=info.maxsize,
+        currsize=info.currsize,
+        hit_rate=info.hits / lookups if lookups else 0.0,
+    )
+
+
 def is_valid_UUID_URN(uri):
     try:
         assert _uuid_urn_re.match(uri)
@@ -218,7 +395,7 @@ def ensure_type(p, t, optional=False):
         else:
             return True
     elif t and not (
-        (isinstance(p, str) and is_valid_URI(p) and t in CALIPER_TYPES.values())
+        (isinstance(p, str) and t in _CALIPER_TYPE_NAMES and is_valid_URI(p))
         or (isinstance(p, BaseEntity) and is_subtype(p.type, t))
         or (isinstance(p, BaseEvent) and is_subtype(p.type, t))
         or (isinstance(p, MutableMapping) and is_subtype(p.get("type", dict), t))
@@ -244,20 +421,203 @@ def ensure_types(p, tl, optional=False):
         raise TypeError(" or ".join(messages))
 
 
+_CALIPER_TYPE_NAMES = frozenset(CALIPER_TYPES.values())
+
+
+# Caliper types this library has no class for; they stay unknown types
+_UNIMPLEMENTED_TYPES = frozenset(
+    [ENTITY_TYPES["AGGREGATE_PROGRESS"], ENTITY_TYPES["AGGREGATE_TIME_ON_TASK"]]
+)
+
+
+# The Caliper classes by type name, and the subtype relation between them, by
+# type name and by class, as a set of (subtype, supertype) pairs. The entity
+# and event modules import this one, so the event module builds the registry
+# once it has loaded, as the last of them; every import of the package loads
+# both. A class missing from its module is an ImportError
+class _TypeRegistry(object):
+    def __init__(self):
+        self.classes = {}
+        for name, path in CALIPER_CLASSES.items():
+            if name in _UNIMPLEMENTED_TYPES:
+                continue
+            m, c = path.rsplit(".", 1)
+            cls = getattr(importlib.import_module(m), c, None)
+            if cls is None:
+                raise ImportError(
+                    "No class {0} for Caliper type {1}".format(path, name)
+                )
+            self.classes[name] = cls
+        keys = {}
+        for name, cls in self.classes.items():
+            keys.setdefault(cls, {cls}).add(name)
+        self.known = frozenset(k for ks in keys.values() for k in ks)
+        self.subtypes = frozenset(
+            (k1, k2)
+            for c1, ks1 in keys.items()
+            for c2, ks2 in keys.items()
+            if issubclass(c1, c2)
+            for k1 in ks1
+            for k2 in ks2
+        )
+
+
+_type_registry = None
+
+
+def _build_type_registry():
+    global _type_registry
+    _type_registry = _TypeRegistry()
+
+
+def _get_type_registry():
+    return _type_registry
+
+
 def is_subtype(t1, t2):
+    registry = _get_type_registry()
+    if t1 in registry.known and t2 in registry.known:
+        return (t1, t2) in registry.subtypes
     return issubclass(_get_type(t1), _get_type(t2))
 
 
 def _get_type(t):
-    m = c = ""
     if t and isinstance(t, type):
-        m, c = t.__module__, t.__name__
-    elif t:
-        m, c = CALIPER_CLASSES.get(t, ".").rsplit(".", 1)
-    try:
-        return getattr(importlib.import_module(m), c)
-    except (ImportError, ValueError) as e:
-        raise ValueError("Unknown type: {0}".format(str(t))) from e
+        return t
+    cls = _get_type_registry().classes.get(t) if t else None
+    if cls is None:
+        raise ValueError("Unknown type: {0}".format(str(t)))
+    return cls
+
+
+# json codecs; both backends produce the same canonical json-string (sorted
+# keys, no whitespace, and UTF-8 rather than escaped non-ASCII characters), so
+# choosing between them only changes the speed of encoding and decoding
+class JsonBackend(object):
+    name = None
+
+    def dumps(self, obj):
+        raise NotImplementedError("Instance must implement JsonBackend.dumps()")
+
+    def dumpb(self, obj):
+        raise NotImplementedError("Instance must implement JsonBackend.dumpb()")
+
+    def loads(self, s):
+        raise NotImplementedError("Instance must implement JsonBackend.loads()")
+
+
+class StdlibJsonBackend(JsonBackend):
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+
+    def dumpb(self, obj):
+        return self.dumps(obj).encode("utf-8")
+
+    def loads(self, s):
+        return json.loads(s)
+
+
+class OrjsonJsonBackend(JsonBackend):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ValueError("The orjson JSON backend needs the orjson package")
+        self._fallback = StdlibJsonBackend()
+
+    def dumps(self, obj):
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj):
+        try:
+            r = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            # orjson.JSONEncodeError is a TypeError; orjson raises it for things
+            # the standard library handles, like integers wider than 64 bits
+            return self._fallback.dumpb(obj)
+        if _has_divergent_float(r) or (b"null" in r and _has_non_finite_float(obj)):
+            return self._fallback.dumpb(obj)
+        return r
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # the standard library also reads what orjson rejects, like NaN and
+            # Infinity
+            return self._fallback.loads(s)
+
+
+JSON_BACKENDS = {"json": StdlibJsonBackend, "orjson": OrjsonJsonBackend}
+_json_backend_instances = {}
+
+
+def get_json_backend(backend="auto"):
+    # accepts a backend, or the name of one: "auto" picks orjson when it's
+    # installed, and the standard library otherwise
+    if isinstance(backend, JsonBackend):
+        return backend
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "json"
+    if backend not in JSON_BACKENDS:
+        raise ValueError("Unknown JSON backend: {0}".format(backend))
+    if backend not in _json_backend_instances:
+        _json_backend_instances[backend] = JSON_BACKENDS[backend]()
+    return _json_backend_instances[backend]
+
+
+# id collection for dict-valued properties, skipping over extensions and contexts
+def _collect_mapping_ids(d, ids):
+    for k, v in sorted(d.items()):
+        if k in ("@context", "extensions"):
+            continue
+        elif k == "id" and isinstance(v, str):
+            ids.append(v)
+        elif isinstance(v, MutableMapping):
+            _collect_mapping_ids(v, ids)
+        elif isinstance(v, MutableSequence):
+            for item in v:
+                if isinstance(item, MutableMapping):
+                    _collect_mapping_ids(item, ids)
+
+
+def _dumps(obj, json_backend=None):
+    if json_backend is None:
+        return json.dumps(obj, sort_keys=True)
+    return get_json_backend(json_backend).dumps(obj)
+
+
+# copy a serialized tree; unlike copy.deepcopy, this gives every occurrence of a
+# cached subtree its own copy, rather than preserving the sharing between them
+def _copy_tree(v):
+    if isinstance(v, dict):
+        return {k: _copy_tree(i) for k, i in v.items()}
+    elif isinstance(v, list):
+        return [_copy_tree(i) for i in v]
+    elif isinstance(v, (str, int, float, type(None))):
+        return v
+    return copy.deepcopy(v)
+
+
+# a described-objects set that fills up while serializing: each object serialized
+# in full adds its id, so that later occurrences of the same object (in the same
+# payload) serialize as just their id
+class DescribeOnce(set):
+    pass
+
+
+def serialization_cache_info():
+    return SerializationCacheInfo(
+        CaliperSerializable._cache_hits, CaliperSerializable._cache_misses
+    )
+
+
+def clear_serialization_cache_info():
+    CaliperSerializable._cache_hits = CaliperSerializable._cache_misses = 0
 
 
 # Basic Caliper configuration object
@@ -266,12 +626,41 @@ class Options(object):
     default_options = {
         "API_KEY": "",
         "AUTH_SCHEME": "",
+        "BATCH_DISPATCH": False,
+        "BATCH_MAX_BYTES": 1048576,
+        "BATCH_MAX_EVENTS": 100,
+        "BATCH_MAX_WAIT": 1000,
+        "BATCH_OVERFLOW": "block",
+        "BATCH_QUEUE_SIZE": 10000,
+        "BATCH_SAMPLE_RATE": 0.1,
+        "CIRCUIT_BREAKER": False,
+        "CIRCUIT_FAILURE_RATE": 0.5,
+        "CIRCUIT_FALLBACK": "drop",
+        "CIRCUIT_MIN_CALLS": 10,
+        "CIRCUIT_RESET_TIMEOUT": 30000,
+        "CIRCUIT_SLOW_CALL": None,
+        "CIRCUIT_WINDOW": 20,
+        "COMPRESSION": None,
+        "COMPRESSION_DICTIONARY": None,
+        "COMPRESSION_THRESHOLD": 1024,
         "CONNECTION_REQUEST_TIMEOUT": 1000,
         "CONNECTION_TIMEOUT": 1000,
         "DEBUG": False,
+        "DEDUPLICATE_ENTITIES": False,
         "HOST": None,
+        "JSON_BACKEND": None,
+        "KEEP_ALIVE": True,
         "OPTIMIZE_SERIALIZATION": True,
+        "POOL_MAXSIZE": 10,
+        "RETRY_ATTEMPTS": 3,
+        "RETRY_BACKOFF": 100,
+        "RETRY_BACKOFF_MAX": 10000,
+        "RETRY_EXCEPTIONS": (requests.exceptions.ConnectionError,),
+        "RETRY_STATUS_CODES": frozenset((429, 502, 503, 504)),
         "SOCKET_TIMEOUT": 1000,
+        "SPLIT_PAYLOADS": False,
+        "STREAM_PAYLOAD": False,
+        "VALIDATION_LEVEL": None,
     }
 
     def __init__(self, opts=None):
@@ -304,6 +693,221 @@ class Options(object):
         else:
             raise ValueError("new key value must be a string")
 
+    # with batch dispatch, clients queue the events they send, and a background
+    # thread sends them on in envelopes: when an envelope reaches
+    # BATCH_MAX_EVENTS events or BATCH_MAX_BYTES bytes, or when its oldest
+    # event has waited BATCH_MAX_WAIT milliseconds
+    @property
+    def BATCH_DISPATCH(self):
+        return self._config["BATCH_DISPATCH"]
+
+    @BATCH_DISPATCH.setter
+    def BATCH_DISPATCH(self, batch):
+        if batch:
+            self._config["BATCH_DISPATCH"] = True
+        else:
+            self._config["BATCH_DISPATCH"] = False
+
+    @property
+    def BATCH_MAX_BYTES(self):
+        return self._config["BATCH_MAX_BYTES"]
+
+    @BATCH_MAX_BYTES.setter
+    def BATCH_MAX_BYTES(self, new_size):
+        if int(new_size) >= 1:
+            self._config["BATCH_MAX_BYTES"] = int(new_size)
+        else:
+            raise ValueError("new batch size must be at least 1 byte")
+
+    @property
+    def BATCH_MAX_EVENTS(self):
+        return self._config["BATCH_MAX_EVENTS"]
+
+    @BATCH_MAX_EVENTS.setter
+    def BATCH_MAX_EVENTS(self, new_count):
+        if int(new_count) >= 1:
+            self._config["BATCH_MAX_EVENTS"] = int(new_count)
+        else:
+            raise ValueError("new batch size must be at least 1 event")
+
+    @property
+    def BATCH_MAX_WAIT(self):
+        return self._config["BATCH_MAX_WAIT"]
+
+    @BATCH_MAX_WAIT.setter
+    def BATCH_MAX_WAIT(self, new_wait):
+        if int(new_wait) >= 0:
+            self._config["BATCH_MAX_WAIT"] = int(new_wait)
+        else:
+            raise ValueError("new wait value must be at least 0 milliseconds")
+
+    # what happens to events sent while the queue is full: "block" waits for
+    # room, up to the send's deadline; "drop_newest" drops them; "drop_oldest"
+    # drops the oldest envelope waiting to go, to make room; "spill" spools them
+    # with a requestor that can. "sample" lets only BATCH_SAMPLE_RATE of them in
+    # once the queue is half full, and drops them all once it's full
+    @property
+    def BATCH_OVERFLOW(self):
+        return self._config["BATCH_OVERFLOW"]
+
+    @BATCH_OVERFLOW.setter
+    def BATCH_OVERFLOW(self, policy):
+        if policy in ("block", "drop_newest", "drop_oldest", "sample", "spill"):
+            self._config["BATCH_OVERFLOW"] = policy
+        else:
+            raise ValueError("Unknown batch overflow policy: {0}".format(policy))
+
+    # the most events a client holds queued for sending
+    @property
+    def BATCH_QUEUE_SIZE(self):
+        return self._config["BATCH_QUEUE_SIZE"]
+
+    @BATCH_QUEUE_SIZE.setter
+    def BATCH_QUEUE_SIZE(self, new_size):
+        if int(new_size) >= 1:
+            self._config["BATCH_QUEUE_SIZE"] = int(new_size)
+        else:
+            raise ValueError("new queue size must be at least 1 event")
+
+    @property
+    def BATCH_SAMPLE_RATE(self):
+        return self._config["BATCH_SAMPLE_RATE"]
+
+    @BATCH_SAMPLE_RATE.setter
+    def BATCH_SAMPLE_RATE(self, new_rate):
+        if 0 < float(new_rate) <= 1:
+            self._config["BATCH_SAMPLE_RATE"] = float(new_rate)
+        else:
+            raise ValueError("new sample rate must be above 0, and at most 1")
+
+    # with a circuit breaker, a client that sees CIRCUIT_FAILURE_RATE of its
+    # last CIRCUIT_WINDOW calls (once it has made CIRCUIT_MIN_CALLS) fail, or
+    # take longer than CIRCUIT_SLOW_CALL milliseconds (if set), stops calling
+    # its endpoint for CIRCUIT_RESET_TIMEOUT milliseconds, then tries a single
+    # call before going back to normal. Meanwhile, its events go to the
+    # CIRCUIT_FALLBACK: "spool" them with a requestor that can, or "drop" them
+    @property
+    def CIRCUIT_BREAKER(self):
+        return self._config["CIRCUIT_BREAKER"]
+
+    @CIRCUIT_BREAKER.setter
+    def CIRCUIT_BREAKER(self, breaker):
+        if breaker:
+            self._config["CIRCUIT_BREAKER"] = True
+        else:
+            self._config["CIRCUIT_BREAKER"] = False
+
+    @property
+    def CIRCUIT_FAILURE_RATE(self):
+        return self._config["CIRCUIT_FAILURE_RATE"]
+
+    @CIRCUIT_FAILURE_RATE.setter
+    def CIRCUIT_FAILURE_RATE(self, new_rate):
+        if 0 < float(new_rate) <= 1:
+            self._config["CIRCUIT_FAILURE_RATE"] = float(new_rate)
+        else:
+            raise ValueError("new failure rate must be above 0, and at most 1")
+
+    @property
+    def CIRCUIT_FALLBACK(self):
+        return self._config["CIRCUIT_FALLBACK"]
+
+    @CIRCUIT_FALLBACK.setter
+    def CIRCUIT_FALLBACK(self, fallback):
+        if fallback in ("drop", "spool"):
+            self._config["CIRCUIT_FALLBACK"] = fallback
+        else:
+            raise ValueError("Unknown circuit fallback: {0}".format(fallback))
+
+    @property
+    def CIRCUIT_MIN_CALLS(self):
+        return self._config["CIRCUIT_MIN_CALLS"]
+
+    @CIRCUIT_MIN_CALLS.setter
+    def CIRCUIT_MIN_CALLS(self, new_count):
+        if int(new_count) >= 1:
+            self._config["CIRCUIT_MIN_CALLS"] = int(new_count)
+        else:
+            raise ValueError("new call count must be at least 1")
+
+    @property
+    def CIRCUIT_RESET_TIMEOUT(self):
+        return self._config["CIRCUIT_RESET_TIMEOUT"]
+
+    @CIRCUIT_RESET_TIMEOUT.setter
+    def CIRCUIT_RESET_TIMEOUT(self, new_timeout):
+        if int(new_timeout) >= 0:
+            self._config["CIRCUIT_RESET_TIMEOUT"] = int(new_timeout)
+        else:
+            raise ValueError("new timeout value must be at least 0 milliseconds")
+
+    @property
+    def CIRCUIT_SLOW_CALL(self):
+        return self._config["CIRCUIT_SLOW_CALL"]
+
+    @CIRCUIT_SLOW_CALL.setter
+    def CIRCUIT_SLOW_CALL(self, new_latency):
+        if new_latency is None:
+            self._config["CIRCUIT_SLOW_CALL"] = None
+        elif int(new_latency) >= 0:
+            self._config["CIRCUIT_SLOW_CALL"] = int(new_latency)
+        else:
+            raise ValueError("new latency value must be at least 0 milliseconds")
+
+    @property
+    def CIRCUIT_WINDOW(self):
+        return self._config["CIRCUIT_WINDOW"]
+
+    @CIRCUIT_WINDOW.setter
+    def CIRCUIT_WINDOW(self, new_window):
+        if int(new_window) >= 1:
+            self._config["CIRCUIT_WINDOW"] = int(new_window)
+        else:
+            raise ValueError("new window size must be at least 1")
+
+    # content-coding for payloads: None to send them as they are, or one of
+    # compression.CONTENT_ENCODINGS
+    @property
+    def COMPRESSION(self):
+        return self._config["COMPRESSION"]
+
+    @COMPRESSION.setter
+    def COMPRESSION(self, encoding):
+        if not (encoding is None or encoding in CONTENT_ENCODINGS):
+            raise ValueError("Unknown content encoding: {0}".format(encoding))
+        elif encoding not in (None, "deflate") and self.COMPRESSION_DICTIONARY:
+            raise ValueError("Only the deflate encoding supports a preset dictionary")
+        else:
+            self._config["COMPRESSION"] = encoding
+
+    # preset zlib dictionary (the deflate encoding only, so set the encoding
+    # first); the endpoint must decompress with the same dictionary
+    @property
+    def COMPRESSION_DICTIONARY(self):
+        return self._config["COMPRESSION_DICTIONARY"]
+
+    @COMPRESSION_DICTIONARY.setter
+    def COMPRESSION_DICTIONARY(self, zdict):
+        if not (zdict is None or isinstance(zdict, (bytes, bytearray))):
+            raise ValueError("new dictionary value must be bytes")
+        elif zdict and self.COMPRESSION not in (None, "deflate"):
+            raise ValueError("Only the deflate encoding supports a preset dictionary")
+        else:
+            self._config["COMPRESSION_DICTIONARY"] = zdict
+
+    # payloads smaller than this many bytes go out uncompressed; streamed
+    # payloads, whose size isn't known up front, are always compressed
+    @property
+    def COMPRESSION_THRESHOLD(self):
+        return self._config["COMPRESSION_THRESHOLD"]
+
+    @COMPRESSION_THRESHOLD.setter
+    def COMPRESSION_THRESHOLD(self, new_threshold):
+        if int(new_threshold) >= 0:
+            self._config["COMPRESSION_THRESHOLD"] = int(new_threshold)
+        else:
+            raise ValueError("new threshold value must be at least 0 bytes")
+
     @property
     def CONNECTION_REQUEST_TIMEOUT(self):
         return self._config["CONNECTION_REQUEST_TIMEOUT"]
@@ -337,6 +941,17 @@ class Options(object):
         else:
             self._config["DEBUG"] = False
 
+    @property
+    def DEDUPLICATE_ENTITIES(self):
+        return self._config["DEDUPLICATE_ENTITIES"]
+
+    @DEDUPLICATE_ENTITIES.setter
+    def DEDUPLICATE_ENTITIES(self, dedupe):
+        if dedupe:
+            self._config["DEDUPLICATE_ENTITIES"] = True
+        else:
+            self._config["DEDUPLICATE_ENTITIES"] = False
+
     @property
     def HOST(self):
         return self._config["HOST"]
@@ -346,6 +961,32 @@ class Options(object):
         if is_valid_URI(new_host):
             self._config["HOST"] = str(new_host)
 
+    # None keeps payloads in the same format as_json() produces; a backend name
+    # switches them to the canonical form that backend produces
+    @property
+    def JSON_BACKEND(self):
+        return self._config["JSON_BACKEND"]
+
+    @JSON_BACKEND.setter
+    def JSON_BACKEND(self, backend):
+        if backend is None:
+            self._config["JSON_BACKEND"] = None
+        else:
+            self._config["JSON_BACKEND"] = get_json_backend(backend).name
+
+    # with keep-alive, a requestor keeps a pool of open connections to re-use
+    # across calls; without, each call opens and closes its own
+    @property
+    def KEEP_ALIVE(self):
+        return self._config["KEEP_ALIVE"]
+
+    @KEEP_ALIVE.setter
+    def KEEP_ALIVE(self, keep_alive):
+        if keep_alive:
+            self._config["KEEP_ALIVE"] = True
+        else:
+            self._config["KEEP_ALIVE"] = False
+
     @property
     def OPTIMIZE_SERIALIZATION(self):
         return self._config["OPTIMIZE_SERIALIZATION"]
@@ -357,6 +998,79 @@ class Options(object):
         else:
             self._config["OPTIMIZE_SERIALIZATION"] = False
 
+    # the most connections per host a requestor keeps open for re-use
+    @property
+    def POOL_MAXSIZE(self):
+        return self._config["POOL_MAXSIZE"]
+
+    @POOL_MAXSIZE.setter
+    def POOL_MAXSIZE(self, new_size):
+        if int(new_size) >= 1:
+            self._config["POOL_MAXSIZE"] = int(new_size)
+        else:
+            raise ValueError("new pool size must be at least 1")
+
+    # the most times a requestor tries to post a payload, counting the first; it
+    # tries again after one of the RETRY_EXCEPTIONS, or a response with one of
+    # the RETRY_STATUS_CODES, as long as the call's deadline allows. Posting an
+    # event twice is safe: the endpoint can tell by its id
+    @property
+    def RETRY_ATTEMPTS(self):
+        return self._config["RETRY_ATTEMPTS"]
+
+    @RETRY_ATTEMPTS.setter
+    def RETRY_ATTEMPTS(self, new_attempts):
+        if int(new_attempts) >= 1:
+            self._config["RETRY_ATTEMPTS"] = int(new_attempts)
+        else:
+            raise ValueError("new attempts value must be at least 1")
+
+    # before the nth retry, a requestor waits a random time up to RETRY_BACKOFF
+    # times 2 ** (n - 1) milliseconds, capped at RETRY_BACKOFF_MAX ("full
+    # jitter"), or for as long as the response's Retry-After asks, if longer; a
+    # response asking for longer than RETRY_BACKOFF_MAX doesn't get retried
+    @property
+    def RETRY_BACKOFF(self):
+        return self._config["RETRY_BACKOFF"]
+
+    @RETRY_BACKOFF.setter
+    def RETRY_BACKOFF(self, new_backoff):
+        if int(new_backoff) >= 0:
+            self._config["RETRY_BACKOFF"] = int(new_backoff)
+        else:
+            raise ValueError("new backoff value must be at least 0 milliseconds")
+
+    @property
+    def RETRY_BACKOFF_MAX(self):
+        return self._config["RETRY_BACKOFF_MAX"]
+
+    @RETRY_BACKOFF_MAX.setter
+    def RETRY_BACKOFF_MAX(self, new_backoff):
+        if int(new_backoff) >= 0:
+            self._config["RETRY_BACKOFF_MAX"] = int(new_backoff)
+        else:
+            raise ValueError("new backoff value must be at least 0 milliseconds")
+
+    @property
+    def RETRY_EXCEPTIONS(self):
+        return self._config["RETRY_EXCEPTIONS"]
+
+    @RETRY_EXCEPTIONS.setter
+    def RETRY_EXCEPTIONS(self, new_exceptions):
+        r = tuple(new_exceptions)
+        if all(isinstance(e, type) and issubclass(e, Exception) for e in r):
+            self._config["RETRY_EXCEPTIONS"] = r
+        else:
+            raise ValueError("new exceptions value must hold exception classes")
+
+    @property
+    def RETRY_STATUS_CODES(self):
+        return self._config["RETRY_STATUS_CODES"]
+
+    @RETRY_STATUS_CODES.setter
+    def RETRY_STATUS_CODES(self, new_codes):
+        self._config["RETRY_STATUS_CODES"] = frozenset(int(c) for c in new_codes)
+
     @property
     def SOCKET_TIMEOUT(self):
         return self._config["SOCKET_TIMEOUT"]
@@ -368,6 +1082,44 @@ class Options(object):
         else:
             raise ValueError("new timeout value must be at least 1000 milliseconds")
 
+    # fetch the endpoint's config once, and split sends into as many envelopes as
+    # it takes to keep each under its caliper_maximum_payload_size
+    @property
+    def SPLIT_PAYLOADS(self):
+        return self._config["SPLIT_PAYLOADS"]
+
+    @SPLIT_PAYLOADS.setter
+    def SPLIT_PAYLOADS(self, split):
+        if split:
+            self._config["SPLIT_PAYLOADS"] = True
+        else:
+            self._config["SPLIT_PAYLOADS"] = False
+
+    @property
+    def STREAM_PAYLOAD(self):
+        return self._config["STREAM_PAYLOAD"]
+
+    @STREAM_PAYLOAD.setter
+    def STREAM_PAYLOAD(self, stream):
+        if stream:
+            self._config["STREAM_PAYLOAD"] = True
+        else:
+            self._config["STREAM_PAYLOAD"] = False
+
+    # the validation level for sensors built with these options to build
+    # entities and events at (see Sensor.validation()); None for whatever level
+    # is in effect
+    @property
+    def VALIDATION_LEVEL(self):
+        return self._config["VALIDATION_LEVEL"]
+
+    @VALIDATION_LEVEL.setter
+    def VALIDATION_LEVEL(self, level):
+        if level is None:
+            self._config["VALIDATION_LEVEL"] = None
+        else:
+            self._config["VALIDATION_LEVEL"] = _ensure_validation_level(level)
+
 
 # Cailper configuration for HTTP transport
 class HttpOptions(Options):
@@ -375,22 +1127,80 @@ class HttpOptions(Options):
         self,
         api_key="",
         auth_scheme="",
+        batch_dispatch=False,
+        batch_max_bytes=1048576,
+        batch_max_events=100,
+        batch_max_wait=1000,
+        batch_overflow="block",
+        batch_queue_size=10000,
+        batch_sample_rate=0.1,
+        circuit_breaker=False,
+        circuit_failure_rate=0.5,
+        circuit_fallback="drop",
+        circuit_min_calls=10,
+        circuit_reset_timeout=30000,
+        circuit_slow_call=None,
+        circuit_window=20,
+        compression=None,
+        compression_dictionary=None,
+        compression_threshold=1024,
         connection_request_timeout=10000,
         connection_timeout=10000,
         debug=False,
+        deduplicate_entities=False,
         host="http://httpbin.org/post",
+        json_backend=None,
+        keep_alive=True,
         optimize_serialization=True,
+        pool_maxsize=10,
+        retry_attempts=3,
+        retry_backoff=100,
+        retry_backoff_max=10000,
+        retry_exceptions=(requests.exceptions.ConnectionError,),
+        retry_status_codes=(429, 502, 503, 504),
         socket_timeout=10000,
+        split_payloads=False,
+        stream_payload=False,
+        validation_level=None,
     ):
         Options.__init__(self)
         self.API_KEY = api_key
         self.AUTH_SCHEME = auth_scheme
+        self.BATCH_DISPATCH = batch_dispatch
+        self.BATCH_MAX_BYTES = batch_max_bytes
+        self.BATCH_MAX_EVENTS = batch_max_events
+        self.BATCH_MAX_WAIT = batch_max_wait
+        self.BATCH_OVERFLOW = batch_overflow
+        self.BATCH_QUEUE_SIZE = batch_queue_size
+        self.BATCH_SAMPLE_RATE = batch_sample_rate
+        self.CIRCUIT_BREAKER = circuit_breaker
+        self.CIRCUIT_FAILURE_RATE = circuit_failure_rate
+        self.CIRCUIT_FALLBACK = circuit_fallback
+        self.CIRCUIT_MIN_CALLS = circuit_min_calls
+        self.CIRCUIT_RESET_TIMEOUT = circuit_reset_timeout
+        self.CIRCUIT_SLOW_CALL = circuit_slow_call
+        self.CIRCUIT_WINDOW = circuit_window
+        self.COMPRESSION = compression
+        self.COMPRESSION_DICTIONARY = compression_dictionary
+        self.COMPRESSION_THRESHOLD = compression_threshold
         self.CONNECTION_REQUEST_TIMEOUT = connection_request_timeout
         self.CONNECTION_TIMEOUT = connection_timeout
         self.DEBUG = debug
+        self.DEDUPLICATE_ENTITIES = deduplicate_entities
         self.HOST = host
+        self.JSON_BACKEND = json_backend
+        self.KEEP_ALIVE = keep_alive
         self.OPTIMIZE_SERIALIZATION = optimize_serialization
+        self.POOL_MAXSIZE = pool_maxsize
+        self.RETRY_ATTEMPTS = retry_attempts
+        self.RETRY_BACKOFF = retry_backoff
+        self.RETRY_BACKOFF_MAX = retry_backoff_max
+        self.RETRY_EXCEPTIONS = retry_exceptions
+        self.RETRY_STATUS_CODES = retry_status_codes
         self.SOCKET_TIMEOUT = socket_timeout
+        self.SPLIT_PAYLOADS = split_payloads
+        self.STREAM_PAYLOAD = stream_payload
+        self.VALIDATION_LEVEL = validation_level
 
     def get_auth_header_value(self):
         if self.AUTH_SCHEME:
@@ -399,13 +1209,54 @@ class HttpOptions(Options):
             return None
 
 
+# the keys of an object's None properties, as sets shared between objects:
+# each set, and each step from one set to the next, gets built once
+_NO_NULL_KEYS = frozenset()
+_null_key_steps = {}
+
+
+def _add_null_key(keys, k):
+    step = _null_key_steps.get((keys, k))
+    if step is None:
+        step = _null_key_steps.setdefault((keys, k), keys | {k})
+    return step
+
+
 # Caliper serializable base class for all caliper objects that need serialization
 class CaliperSerializable(object):
+
+    # instances keep their state in slots, so that many of them can be held at
+    # once; subclasses declare empty slots to keep it that way. What's the same
+    # for every instance of a class lives on the class, and None properties
+    # take no room in _props: _nulls holds their keys instead
+    __slots__ = (
+        "_props",
+        "_nulls",
+        "_context_hashes",
+        "_default_profile",
+        "_serialized",
+        "_parents",
+        "__weakref__",
+    )
+
+    # whether instances keep their serialized form around for re-use; worth it for
+    # objects that many others share, like entities, but not for one-off events
+    _cache_serialization = False
+    _cache_hits = 0
+    _cache_misses = 0
+    _classname = "caliper.base.CaliperSerializable"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._classname = ".".join([cls.__module__, cls.__name__])
+
     def __init__(self):
         self._props = {}
-        self._classname = ".".join([self.__class__.__module__, self.__class__.__name__])
-        self._context_hashes = ContextHash(None, None)
+        self._nulls = _NO_NULL_KEYS
+        self._context_hashes = _NO_CONTEXT_HASHES
         self._default_profile = None
+        self._serialized = None
+        self._parents = None
 
     @property
     def context(self):
@@ -428,18 +1279,90 @@ class CaliperSerializable(object):
         if req and (v is None):
             raise ValueError("{0} must have a non-null value".format(str(k)))
         if k:
-            self._props.update({k: v})
+            if v is None:
+                self._props.pop(k, None)
+                self._nulls = _add_null_key(self._nulls, k)
+            else:
+                self._props[k] = v
+                if k in self._nulls:
+                    self._nulls = self._nulls - {k}
+                if self._is_watched() and not isinstance(v, str):
+                    self._adopt(v)
+            self._invalidate_serialization()
+
+    # the object's properties as (key, value) pairs, None properties included
+    def _get_prop_items(self):
+        items = list(self._props.items())
+        items.extend((k, None) for k in self._nulls)
+        return items
+
+    # serialization cache bookkeeping: objects track the objects holding them
+    # (weakly) so that a change to a shared object also invalidates the cached
+    # serializations of every object that holds it. Only objects whose
+    # serialization may get cached, their own or that of an object holding
+    # them, need to be told; others, like events, only start listening to the
+    # objects they hold once something holds them in turn
+    def _is_watched(self):
+        return self._cache_serialization or self._parents is not None
+
+    def _adopt(self, v):
+        if isinstance(v, CaliperSerializable):
+            v._add_parent(self)
+        elif isinstance(v, MutableSequence):
+            for item in v:
+                self._adopt(item)
+
+    def _add_parent(self, parent):
+        if self._parents is None:
+            self._parents = weakref.WeakSet()
+            if not self._cache_serialization:
+                for v in self._props.values():
+                    self._adopt(v)
+        self._parents.add(parent)
+
+    def _invalidate_serialization(self):
+        if self._serialized:
+            self._serialized = None
+        elif self._cache_serialization:
+            # nothing cached here, so nothing holding this object has cached it
+            return
+        if self._parents:
+            for parent in list(self._parents):
+                parent._invalidate_serialization()
+
+    # pickled without the cached serialization and the weak references to the
+    # objects holding it, which can't be pickled; a loaded object starts with
+    # neither, and gets re-attached to the objects it holds, so that they
+    # still invalidate its cache
+    def __getstate__(self):
+        return {
+            "_props": self._props,
+            "_nulls": sorted(self._nulls),
+            "_context_hashes": self._context_hashes,
+            "_default_profile": self._default_profile,
+        }
+
+    def __setstate__(self, state):
+        self._props = state["_props"]
+        self._nulls = _NO_NULL_KEYS
+        for k in state["_nulls"]:
+            self._nulls = _add_null_key(self._nulls, k)
+        self._context_hashes = state["_context_hashes"]
+        self._default_profile = state["_default_profile"]
+        self._serialized = None
+        self._parents = None
+        if self._cache_serialization:
+            for v in self._props.values():
+                self._adopt(v)
 
     def _update_context_hashes(self, ctxt, ctxt_base):
-        self._context_hashes = ContextHash(
-            _get_context_hash(ctxt), _get_context_hash(ctxt_base)
-        )
+        self._context_hashes = _get_context_hashes(ctxt, ctxt_base)
 
     # protected base-type setters that inheriting classes use internally to set
     # underlying state
 
     def _set_typed_prop(self, k, v, t, req=False):
-        if not (v is None or isinstance(v, t)):
+        if not (v is None or isinstance(v, t) or _is_trusted()):
             if hasattr(t, "__name__"):
                 typ_name = t.__name__
             else:
@@ -469,7 +1392,7 @@ class CaliperSerializable(object):
         expected_base_context = _get_root_context_for_profile(profile)
         if not v:
             self._update_props("@context", expected_base_context, req=True)
-        elif is_valid_context(v, expected_base_context):
+        elif _is_trusted() or is_valid_context(v, expected_base_context):
             self._update_props("@context", v, req=True)
         else:
             raise ValueError("Invalid context value: {}".format(str(v)))
@@ -480,11 +1403,16 @@ class CaliperSerializable(object):
         self._set_str_prop("profile", profile)
 
     def _set_type(self, default=None):
-        self._typename = CALIPER_TYPES_FOR_CLASSES.get(self._classname, default)
-        self._set_str_prop("type", self._typename)
+        self._set_str_prop(
+            "type", CALIPER_TYPES_FOR_CLASSES.get(self._classname, default)
+        )
 
     def _set_id(self, v):
-        if self.type in ENTITY_TYPES.values():
+        if _is_trusted():
+            if isinstance(self, BaseEvent):
+                v = v or "urn:uuid:{}".format(uuid.uuid4())
+            self._update_props("id", v, req=True)
+        elif self.type in ENTITY_TYPES.values():
             if not is_valid_URI(v):
                 raise ValueError("Entity ID must be a valid URI")
             self._update_props("id", v, req=True)
@@ -498,17 +1426,17 @@ class CaliperSerializable(object):
             )
 
     def _set_datetime_prop(self, k, v, req=False):
-        if v and not is_valid_datetime(v):
+        if v and not (_is_trusted() or is_valid_datetime(v)):
             raise ValueError("{0} must be a valid date-time".format(str(k)))
         self._update_props(k, v, req=req)
 
     def _set_duration_prop(self, k, v, req=False):
-        if v and not is_valid_duration(v):
+        if v and not (_is_trusted() or is_valid_duration(v)):
             raise ValueError("{0} must be a valid duration".format(str(k)))
         self._update_props(k, v, req=req)
 
     def _set_list_prop(self, k, v, t=None, req=False):
-        if v:
+        if v and not _is_trusted():
             if not (isinstance(v, MutableSequence)):
                 raise ValueError("{0} must be a list".format(str(k)))
             elif t:
@@ -520,6 +1448,9 @@ class CaliperSerializable(object):
         self._update_props(k, v, req=req)
 
     def _set_obj_prop(self, k, v, t=None, req=False):
+        if _is_trusted():
+            self._update_props(k, v, req=req)
+            return
         if isinstance(v, BaseEntity) and t and not (is_subtype(v.type, t)):
             raise TypeError("Provided property is not of required type: {}".format(t))
         if isinstance(v, str) and not is_valid_URI(v):
@@ -533,24 +1464,27 @@ class CaliperSerializable(object):
         self._update_props(k, v, req=req)
 
     def _set_time_prop(self, k, v, req=False):
-        if v and not is_valid_time(v):
+        if v and not (_is_trusted() or is_valid_time(v)):
             raise ValueError("{0} must be a valid time".format(str(k)))
         self._update_props(k, v, req=req)
 
     def _set_uri_prop(self, k, v, req=False):
-        if v and not is_valid_URI(v):
+        if v and not (_is_trusted() or is_valid_URI(v)):
             raise ValueError("{0} must be a valid URI".format(str(k)))
         self._update_props(k, v, req=req)
 
     # protected unpacker methods, used by dict and json-string representation
-    # public functions
+    # public functions; the unpackers build their output tree without copying
+    # and share leaf values (strings, dict-valued properties, contexts) with
+    # this object, so callers that hand the result out must copy it first
     def _unpack_list(
         self,
         l,
-        known_contexts=set(),
-        described_objects=[],
+        known_contexts=frozenset(),
+        described_objects=(),
         thin_context=False,
         thin_props=False,
+        ids=None,
     ):
         r = []
         for item in l:
@@ -562,6 +1496,7 @@ class CaliperSerializable(object):
                         described_objects=described_objects,
                         thin_context=thin_context,
                         thin_props=thin_props,
+                        ids=ids,
                     )
                 )
             elif isinstance(item, CaliperSerializable):
@@ -571,29 +1506,71 @@ class CaliperSerializable(object):
                         described_objects=described_objects,
                         thin_context=thin_context,
                         thin_props=thin_props,
+                        ids=ids,
                     )
                 )
             else:
-                r.append(copy.deepcopy(item))
+                r.append(item)
         return r
 
     def _unpack_object(
         self,
-        known_contexts=set(),
-        described_objects=[],
+        known_contexts=frozenset(),
+        described_objects=(),
         thin_context=False,
         thin_props=False,
+        ids=None,
+    ):
+        # describe-once serializations depend on what came before this object
+        # in the payload, so they bypass the cache; the id joins the set before
+        # recursing, so that an object referring back to itself gets its id
+        if isinstance(described_objects, DescribeOnce):
+            the_id = self._get_prop("id")
+            if the_id:
+                described_objects.add(the_id)
+            return self._unpack_props(
+                known_contexts, described_objects, thin_context, thin_props, ids
+            )
+
+        # serializations that replace described objects with their ids depend
+        # on the caller's list, so they bypass the cache
+        if not self._cache_serialization or described_objects:
+            return self._unpack_props(
+                known_contexts, described_objects, thin_context, thin_props, ids
+            )
+
+        key = (thin_context, thin_props, frozenset(known_contexts))
+        cached = self._serialized and self._serialized.get(key)
+        if cached:
+            CaliperSerializable._cache_hits += 1
+            r, r_ids = cached
+        else:
+            CaliperSerializable._cache_misses += 1
+            r_ids = []
+            r = self._unpack_props(
+                known_contexts, described_objects, thin_context, thin_props, r_ids
+            )
+            if self._serialized is None:
+                self._serialized = {}
+            self._serialized[key] = (r, r_ids)
+        if ids is not None:
+            ids.extend(r_ids)
+        return r
+
+    def _unpack_props(
+        self, known_contexts, described_objects, thin_context, thin_props, ids
     ):
         r = {}
-        kc = copy.deepcopy(known_contexts)
+        kc = known_contexts
         # if this object's context is not already known, then we retain
         # the context, and we add its context hashes to the list of known contexts
         if self._context_hashes.context not in known_contexts:
-            r.update({"@context": self.context})
+            r["@context"] = self.context
             if thin_context:
-                kc.update(set(self._context_hashes))
+                kc = known_contexts.union(self._context_hashes)
 
-        for k, v in sorted(self._props.items()):
+        items = self._props.items() if thin_props else self._get_prop_items()
+        for k, v in sorted(items):
             if k == "@context":
                 continue
 
@@ -607,6 +1584,7 @@ class CaliperSerializable(object):
                     described_objects=described_objects,
                     thin_context=thin_context,
                     thin_props=thin_props,
+                    ids=ids,
                 )
             elif isinstance(v, CaliperSerializable):
                 the_id = v._get_prop("id")
@@ -614,8 +1592,8 @@ class CaliperSerializable(object):
                 if (
                     the_id
                     and the_type
-                    and is_subtype(the_type, CaliperSerializable)
                     and the_id in described_objects
+                    and is_subtype(the_type, CaliperSerializable)
                 ):
                     value = the_id
                 else:
@@ -624,6 +1602,7 @@ class CaliperSerializable(object):
                         described_objects=described_objects,
                         thin_context=thin_context,
                         thin_props=thin_props,
+                        ids=ids,
                     )
             elif isinstance(v, MutableMapping):
                 the_id = v.get("id")
@@ -632,44 +1611,89 @@ class CaliperSerializable(object):
                     value = the_id
                 else:
                     value = v
+                    if ids is not None and k != "extensions":
+                        _collect_mapping_ids(v, ids)
             else:
                 value = v
-            r.update({k: value})
+                if k == "id" and ids is not None and isinstance(v, str):
+                    ids.append(v)
+            r[k] = value
 
-        return copy.deepcopy(r)
+        return r
 
-    # public methods, to repr this event or entity as a dict or as a json-string
-    def as_dict(self, described_objects=None, thin_context=False, thin_props=False):
+    # inheriting classes that serialize differently override this method; it
+    # returns a tree that may share values with this object; when provided a list
+    # of ids, it appends the ids of the objects it serializes in full, in the
+    # order they appear in the json-string representation
+    def _as_dict(
+        self, described_objects=None, thin_context=False, thin_props=False, ids=None
+    ):
         return self._unpack_object(
-            described_objects=described_objects or [],
+            described_objects=() if described_objects is None else described_objects,
+            thin_context=thin_context,
+            thin_props=thin_props,
+            ids=ids,
+        )
+
+    # public methods, to repr this event or entity as a dict or as a json-string;
+    # with deep_copy=False, the caller gets the dict without a defensive copy and
+    # must treat it as read-only
+    def as_dict(
+        self,
+        described_objects=None,
+        thin_context=False,
+        thin_props=False,
+        deep_copy=True,
+    ):
+        r = self._as_dict(
+            described_objects=described_objects,
             thin_context=thin_context,
             thin_props=thin_props,
         )
+        if deep_copy:
+            return _copy_tree(r)
+        return r
 
-    def as_json(self, described_objects=None, thin_context=False, thin_props=False):
+    # without a json_backend, the json-string has the standard library's default
+    # formatting; with one, it's in the backend's canonical form
+    def as_json(
+        self,
+        described_objects=None,
+        thin_context=False,
+        thin_props=False,
+        json_backend=None,
+    ):
         r = self.as_dict(
             described_objects=described_objects,
             thin_context=thin_context,
             thin_props=thin_props,
+            deep_copy=False,
         )
-        return json.dumps(r, sort_keys=True)
+        return _dumps(r, json_backend)
 
     def as_json_with_ids(
-        self, described_objects=None, thin_context=False, thin_props=False
+        self,
+        described_objects=None,
+        thin_context=False,
+        thin_props=False,
+        json_backend=None,
     ):
-        ret = self.as_json(
+        ids = []
+        r = self._as_dict(
             described_objects=described_objects,
             thin_context=thin_context,
             thin_props=thin_props,
+            ids=ids,
         )
-        return (
-            ret,
-            re.findall(r'"id": "(.+?(?="))"', re.sub(r'"@context": \[.+?\],', "", ret)),
-        )
+        return _dumps(r, json_backend), ids
 
 
 # Base classes for Caliper Entity and Event
 class BaseEntity(CaliperSerializable):
+    __slots__ = ()
+
+    _cache_serialization = True
+
     def __init__(self, context=None, profile=None):
         CaliperSerializable.__init__(self)
         self._set_type(default=CALIPER_TYPES["ENTITY"])
@@ -678,6 +1702,8 @@ class BaseEntity(CaliperSerializable):
 
 
 class BaseEvent(CaliperSerializable):
+    __slots__ = ()
+
     def __init__(
         self,
         context=None,
@@ -693,7 +1719,9 @@ class BaseEvent(CaliperSerializable):
         self._set_context(context, self.profile)
         self._set_id(id)
 
-        if action not in CALIPER_PROFILE_ACTIONS[self.profile][self.type]:
+        if not (
+            _is_trusted() or action in CALIPER_PROFILE_ACTIONS[self.profile][self.type]
+        ):
             raise ValueError(
                 "invalid action for profile and event: {} for {}:{}".format(
                     action, self.profile, self.type
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+# Caliper-python package, batching module
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import collections
+import random
+import threading
+import time
+
+from caliper.base import DescribeOnce
+from caliper.request import EnvelopeEncoder
+
+
+# the events bound for one envelope, already encoded, as (fragment, ids) pairs
+class _Batch(object):
+    def __init__(self, sensor_id, envelope_size, separator_size, dedupe=False):
+        self.sensor_id = sensor_id
+        self.described = DescribeOnce() if dedupe else None
+        self.items = []
+        self.envelope_size = envelope_size
+        self.separator_size = separator_size
+        self.size = envelope_size
+        self.started = time.monotonic()
+
+    # described, when deduplicating, is what the batch describes with the item
+    def add(self, fragment, ids, described=None):
+        if self.items:
+            self.size += self.separator_size
+        self.items.append((fragment, ids))
+        self.size += len(fragment)
+        if described is not None:
+            self.described = described
+
+
+# Queue of events that a background thread sends on, in envelopes, through a
+# requestor's send_encoded(). Events get encoded on the sending thread, as they
+# go in, so later changes to their entities don't affect what gets sent, and
+# an envelope's size is known before it goes out; the encoding happens before
+# the queue's lock is taken, and the endpoint's payload limit gets resolved on
+# the background thread, so that neither holds up other threads. on_sent(results, ids,
+# response, elapsed) gets called from the background thread after each
+# envelope, with the milliseconds it took to send. A full queue deals with new
+# events as the BATCH_OVERFLOW option has it; on_dropped(count) gets called
+# when it drops queued events to make room, and on_depth(depth, capacity)
+# whenever events go in or out.
+class BatchingQueue(object):
+    def __init__(
+        self, requestor=None, options=None, on_sent=None, on_dropped=None, on_depth=None
+    ):
+        self._requestor = requestor
+        self._options = options
+        self._on_sent = on_sent
+        self._on_dropped = on_dropped
+        self._on_depth = on_depth
+        self._cond = threading.Condition(threading.Lock())
+        self._open = None
+        self._ready = collections.deque()
+        self._envelope_sizes = {}
+        self._payload_limit = None
+        self._queued = 0
+        # events sent, or dropped from the queue
+        self._sent = 0
+        self._closing = False
+        self._worker = None
+
+    # events queued or on their way, but not yet sent
+    @property
+    def depth(self):
+        return self._queued - self._sent
+
+    def _report_depth(self):
+        if self._on_depth:
+            self._on_depth(self.depth, self._options.BATCH_QUEUE_SIZE)
+
+    # drops the oldest envelope that isn't on its way yet; returns how many
+    # events went with it
+    def _drop_oldest(self):
+        if not self._ready:
+            return 0
+        batch = self._ready.popleft()
+        self._sent += len(batch.items)
+        self._cond.notify_all()
+        return len(batch.items)
+
+    # whether the next item may go in, once there's room for it as the overflow
+    # policy has it, waiting until expires (if given) to block; returns it along
+    # with the number of events dropped to make the room
+    def _admit(self, expires):
+        policy = self._options.BATCH_OVERFLOW
+        size = self._options.BATCH_QUEUE_SIZE
+        if policy == "sample" and self.depth >= size / 2.0:
+            if self.depth >= size:
+                return False, 0
+            return random.random() < self._options.BATCH_SAMPLE_RATE, 0
+        dropped = 0
+        while self.depth >= size:
+            self._cut()
+            if policy == "drop_oldest":
+                count = self._drop_oldest()
+                if not count:
+                    # all that's queued is on its way
+                    return False, dropped
+                dropped += count
+                continue
+            if policy != "block":
+                return False, dropped
+            wait = None if expires is None else expires - time.monotonic()
+            if wait is not None and wait <= 0:
+                return False, dropped
+            self._cond.wait(wait)
+        return True, dropped
+
+    def _get_envelope_size(self, sensor_id, json_backend):
+        key = (sensor_id, json_backend)
+        if key not in self._envelope_sizes:
+            encoder = EnvelopeEncoder(
+                send_time=self._requestor._get_time(),
+                sensor_id=sensor_id,
+                json_backend=json_backend,
+            )
+            self._envelope_sizes[key] = (encoder.envelope_size, encoder.separator_size)
+        return self._envelope_sizes[key]
+
+    # hands the open batch on to the background thread
+    def _cut(self):
+        if self._open is not None:
+            self._ready.append(self._open)
+            self._open = None
+            self._cond.notify_all()
+
+    def _get_open_batch(self, sensor_id, envelope_size, separator_size):
+        if self._open is not None and self._open.sensor_id != sensor_id:
+            self._cut()
+        if self._open is None:
+            self._open = _Batch(
+                sensor_id,
+                envelope_size,
+                separator_size,
+                dedupe=self._options.DEDUPLICATE_ENTITIES,
+            )
+        return self._open
+
+    # batches get cut at BATCH_MAX_BYTES, or at the endpoint's payload limit
+    # once the background thread has it, if that's smaller
+    def _get_max_bytes(self):
+        max_bytes = self._options.BATCH_MAX_BYTES
+        if self._payload_limit is not None:
+            max_bytes = min(max_bytes, self._payload_limit)
+        return max_bytes
+
+    def _encode(self, encoder, item, described_objects):
+        n = len(encoder.ids)
+        fragment = encoder.encode_item(item, described_objects=described_objects)
+        return fragment, encoder.ids[n:]
+
+    # encodes item to follow what described already holds, deduplicating its
+    # entities against those; returns what is described once it's in too
+    def _encode_after(self, encoder, item, described_objects, described):
+        described = DescribeOnce(described)
+        # objects described to the endpoint need no describing in the batch
+        described.update(described_objects or ())
+        fragment, ids = self._encode(encoder, item, described)
+        return fragment, ids, described
+
+    # encodes the items in order, as (item, fragment, ids, described) each;
+    # when deduplicating, they follow on from what described holds, as the
+    # open batch had it
+    def _encode_items(self, encoder, items, described_objects, described):
+        encoded = []
+        for item in items:
+            if described is None:
+                fragment, ids = self._encode(encoder, item, described_objects)
+            else:
+                fragment, ids, described = self._encode_after(
+                    encoder, item, described_objects, described
+                )
+            encoded.append((item, fragment, ids, described))
+        return encoded
+
+    # the open batch, along with how many items it holds and a copy of what it
+    # describes, for items to get encoded against outside the lock
+    def _get_basis(self, sensor_id, envelope_size, separator_size):
+        with self._cond:
+            batch = self._get_open_batch(sensor_id, envelope_size, separator_size)
+            return batch, len(batch.items), DescribeOnce(batch.described)
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    # with the "block" overflow policy, waits at most timeout seconds (if given)
+    # for room in the queue; returns the items that didn't go in, in order.
+    # Items deduplicating their entities get encoded to follow on from the
+    # open batch; should the batch change before one goes in (other threads
+    # added to it, or it got cut), that one gets encoded again under the lock,
+    # and the rest outside it, against the batch as it is by then
+    def put(self, items, described_objects=None, sensor_id=None, timeout=None):
+        expires = None if timeout is None else time.monotonic() + timeout
+        encoder = self._requestor.get_data_encoder()
+        envelope_size, separator_size = self._get_envelope_size(
+            sensor_id, encoder.json_backend
+        )
+        dedupe = self._options.DEDUPLICATE_ENTITIES
+        pending = list(items)
+        left_out = []
+        dropped = 0
+        while pending:
+            basis = count = described = None
+            if dedupe:
+                basis, count, described = self._get_basis(
+                    sensor_id, envelope_size, separator_size
+                )
+            encoded = self._encode_items(encoder, pending, described_objects, described)
+            pending = []
+            with self._cond:
+                self._ensure_worker()
+                max_bytes = self._get_max_bytes()
+                for i, (item, fragment, ids, described) in enumerate(encoded):
+                    admitted, n = self._admit(expires)
+                    dropped += n
+                    if not admitted:
+                        left_out.append(item)
+                        # the items after it took its entities as described
+                        basis = None
+                        continue
+                    batch = self._get_open_batch(
+                        sensor_id, envelope_size, separator_size
+                    )
+                    stale = dedupe and not (
+                        batch is basis and len(batch.items) == count
+                    )
+                    if stale:
+                        fragment, ids, described = self._encode_after(
+                            encoder, item, described_objects, batch.described
+                        )
+                    if batch.items and (
+                        batch.size + separator_size + len(fragment) > max_bytes
+                    ):
+                        self._cut()
+                        batch = self._get_open_batch(
+                            sensor_id, envelope_size, separator_size
+                        )
+                        if dedupe:
+                            # the new batch has yet to describe anything
+                            stale = True
+                            fragment, ids, described = self._encode_after(
+                                encoder, item, described_objects, batch.described
+                            )
+                    batch.add(fragment, ids, described)
+                    basis, count = batch, len(batch.items)
+                    self._queued += 1
+                    if stale:
+                        rest = i + 1
+                        pending = [e[0] for e in encoded[rest:]]
+                    if (
+                        len(batch.items) >= self._options.BATCH_MAX_EVENTS
+                        or batch.size >= max_bytes
+                    ):
+                        self._cut()
+                    if pending:
+                        break
+                self._cond.notify_all()
+        if dropped and self._on_dropped:
+            self._on_dropped(dropped)
+        self._report_depth()
+        return left_out
+
+    def _next_batch(self):
+        while True:
+            if self._ready:
+                return self._ready.popleft()
+            wait = None
+            if self._open is not None:
+                wait = (
+                    self._open.started
+                    + self._options.BATCH_MAX_WAIT / 1000.0
+                    - time.monotonic()
+                )
+                if wait <= 0 or self._closing:
+                    self._cut()
+                    continue
+            elif self._closing:
+                # let the next put() start a new thread
+                self._worker = None
+                return None
+            self._cond.wait(wait)
+
+    # called from the background thread, as finding out may take a request to
+    # the endpoint
+    def _resolve_payload_limit(self):
+        try:
+            self._payload_limit = self._requestor.get_payload_limit()
+        except Exception:
+            pass
+
+    # a batch cut before the endpoint's payload limit was known may not fit in
+    # it; its items then get split over as many envelopes as they need, unless
+    # they deduplicate entities, as only the first envelope would describe them
+    def _split(self, batch):
+        limit = self._payload_limit
+        if limit is None or batch.size <= limit or batch.described is not None:
+            return [batch]
+        parts = []
+        for fragment, ids in batch.items:
+            if not parts or (
+                parts[-1].size + batch.separator_size + len(fragment) > limit
+            ):
+                parts.append(
+                    _Batch(batch.sensor_id, batch.envelope_size, batch.separator_size)
+                )
+            parts[-1].add(fragment, ids)
+        return parts
+
+    def _send(self, batch):
+        start = time.monotonic()
+        try:
+            results, ids, response = self._requestor.send_encoded(
+                fragments=[fragment for fragment, _ in batch.items],
+                ids=[i for _, item_ids in batch.items for i in item_ids],
+                sensor_id=batch.sensor_id,
+                debug=self._options.DEBUG,
+            )
+        except Exception:
+            # nobody is waiting on the background thread to hear about errors,
+            # and it has to keep going; the envelope's events count as failed
+            results, ids, response = len(batch.items) * [False], [], None
+        if self._on_sent:
+            self._on_sent(results, ids, response, (time.monotonic() - start) * 1000.0)
+
+    def _run(self):
+        while True:
+            self._resolve_payload_limit()
+            with self._cond:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+            for part in self._split(batch):
+                self._send(part)
+            with self._cond:
+                self._sent += len(batch.items)
+                self._cond.notify_all()
+            self._report_depth()
+
+    # sends on everything queued so far, waiting at most timeout seconds (if
+    # given) for it to go; returns whether it all went (or got dropped)
+    def flush(self, timeout=None):
+        with self._cond:
+            target = self._queued
+            self._cut()
+            return self._cond.wait_for(lambda: self._sent >= target, timeout)
+
+    # sends on everything queued, then stops the background thread; a queue
+    # starts a new one if used again
+    def close(self, timeout=None):
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        with self._cond:
+            self._closing = False
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Caliper-python package, breaker module
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import collections
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+# Circuit breaker over the calls to one endpoint. It stays closed while fewer
+# than failure_rate of the last window calls went bad: a call goes bad if it
+# fails, or takes longer than slow_call milliseconds (if given), and the rate
+# only counts once min_calls calls are in. Past that, it opens, and turns calls
+# away for reset_timeout milliseconds; then, half-open, it lets one trial call
+# through, which closes it again if it goes well, or re-opens it if not.
+# on_change(old_state, new_state) gets called on each transition, after the
+# breaker's lock is released, so that it may use the breaker; transitions on
+# different threads may get theirs called out of order.
+class CircuitBreaker(object):
+    def __init__(
+        self,
+        failure_rate=0.5,
+        min_calls=10,
+        reset_timeout=30000,
+        slow_call=None,
+        window=20,
+        on_change=None,
+    ):
+        self._failure_rate = failure_rate
+        self._min_calls = min_calls
+        self._reset_timeout = reset_timeout / 1000.0
+        self._slow_call = slow_call
+        self._outcomes = collections.deque(maxlen=window)
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    # call with the lock held; returns the change, for _notify() to report
+    # once the lock is released
+    def _transition(self, state):
+        old, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._trial = False
+        return old, state
+
+    def _notify(self, change):
+        if change is not None and self._on_change:
+            self._on_change(*change)
+
+    # whether a call may go ahead; a caller that gets True must record() how
+    # the call went
+    def allow(self):
+        change = None
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self._reset_timeout:
+                    return False
+                change = self._transition(HALF_OPEN)
+            allowed = self._state == CLOSED or not self._trial
+            if self._state == HALF_OPEN:
+                self._trial = True
+        self._notify(change)
+        return allowed
+
+    # latency in milliseconds
+    def record(self, success, latency=None):
+        bad = not success or (
+            self._slow_call is not None
+            and latency is not None
+            and latency > self._slow_call
+        )
+        change = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                change = self._transition(OPEN if bad else CLOSED)
+            elif self._state == CLOSED:
+                self._outcomes.append(bad)
+                count = len(self._outcomes)
+                if count >= self._min_calls:
+                    if sum(self._outcomes) / count >= self._failure_rate:
+                        change = self._transition(OPEN)
+        self._notify(change)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Caliper-python package, compression module
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import zlib
+
+from caliper.constants import (
+    CALIPER_ACTIONS,
+    CALIPER_CONTEXTS,
+    CALIPER_CORE_CONTEXT,
+    CALIPER_PROFILES,
+    ENTITY_TYPES,
+    EVENT_TYPES,
+)
+
+# HTTP content-codings for payloads, with the zlib window-bits value that selects
+# each one's container format: "gzip" is a gzip stream, and "deflate" (per RFC
+# 9110) is a zlib stream, which can also carry a preset dictionary
+CONTENT_ENCODINGS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+# largest useful preset dictionary: the deflate window
+MAX_ZDICT_SIZE = 32768
+
+# the envelope properties, and the event properties the spec defines for all
+# events, which nearly every payload carries
+_PAYLOAD_KEYS = (
+    "sensor",
+    "sendTime",
+    "dataVersion",
+    "data",
+    "@context",
+    "id",
+    "type",
+    "profile",
+    "actor",
+    "action",
+    "object",
+    "eventTime",
+    "edApp",
+    "generated",
+    "target",
+    "referrer",
+    "group",
+    "membership",
+    "session",
+    "federatedSession",
+    "extensions",
+    "name",
+    "dateCreated",
+    "dateModified",
+)
+
+
+# joins fragments into a preset dictionary, in increasing order of value: zlib
+# encodes matches near the end of the dictionary with the shortest distances,
+# and when the fragments don't all fit, the earliest ones get dropped
+def build_zdict(fragments, size=MAX_ZDICT_SIZE):
+    seen = set()
+    r = []
+    for fragment in reversed(list(fragments)):
+        if isinstance(fragment, str):
+            fragment = fragment.encode("utf-8")
+        if fragment in seen:
+            continue
+        seen.add(fragment)
+        size -= len(fragment)
+        if size < 0:
+            break
+        r.append(fragment)
+    return b"".join(reversed(r))
+
+
+def _caliper_vocabulary():
+    # keys go in with the default as_json() separator; the compact separator
+    # of the JSON backends is a prefix of it, so matches either way
+    yield from ('"{0}"'.format(p) for p in sorted(CALIPER_PROFILES.values()))
+    yield from ('"{0}"'.format(t) for t in sorted(ENTITY_TYPES.values()))
+    yield from ('"{0}"'.format(a) for a in sorted(CALIPER_ACTIONS.values()))
+    yield from ('"{0}"'.format(t) for t in sorted(EVENT_TYPES.values()))
+    yield from ('"{0}": '.format(k) for k in _PAYLOAD_KEYS)
+    for ctxts in CALIPER_CONTEXTS.values():
+        yield from ('"{0}"'.format(c) for c in ctxts if c != CALIPER_CORE_CONTEXT)
+    yield '"@context": "{0}"'.format(CALIPER_CORE_CONTEXT)
+
+
+# built-in preset dictionary of the Caliper vocabulary: contexts, types,
+# actions, profiles and the common event properties; for the deflate encoding
+CALIPER_ZDICT = build_zdict(_caliper_vocabulary())
+
+
+def _get_wbits(encoding, zdict):
+    if encoding not in CONTENT_ENCODINGS:
+        raise ValueError("Unknown content encoding: {0}".format(encoding))
+    if zdict is not None:
+        if not isinstance(zdict, (bytes, bytearray)):
+            raise ValueError("zdict must be bytes; got {0} instead".format(zdict))
+        if encoding != "deflate":
+            raise ValueError("Only the deflate encoding supports a preset dictionary")
+    return CONTENT_ENCODINGS[encoding]
+
+
+class Compressor(object):
+    def __init__(self, encoding="gzip", level=zlib.Z_DEFAULT_COMPRESSION, zdict=None):
+        self._wbits = _get_wbits(encoding, zdict)
+        self._encoding = encoding
+        self._level = level
+        self._zdict = zdict
+
+    @property
+    def encoding(self):
+        return self._encoding
+
+    @property
+    def zdict(self):
+        return self._zdict
+
+    def compressobj(self):
+        if self._zdict is None:
+            return zlib.compressobj(self._level, zlib.DEFLATED, self._wbits)
+        return zlib.compressobj(
+            self._level, zlib.DEFLATED, self._wbits, zdict=self._zdict
+        )
+
+    def compress(self, data):
+        c = self.compressobj()
+        return c.compress(data) + c.flush()
+
+
+# endpoint-side counterpart to Compressor; a payload compressed with a preset
+# dictionary needs the same dictionary to decompress
+def decompress(data, encoding="gzip", zdict=None):
+    wbits = _get_wbits(encoding, zdict)
+    if zdict is None:
+        d = zlib.decompressobj(wbits)
+    else:
+        d = zlib.decompressobj(wbits, zdict=zdict)
+    r = d.decompress(data) + d.flush()
+    if not d.eof:
+        raise ValueError("Truncated {0} payload".format(encoding))
+    return r
@@ -23,7 +23,12 @@ import importlib
 
 from collections.abc import MutableSequence, MutableMapping
 
-from caliper.base import is_valid_context, is_valid_datetime, is_valid_URI
+from caliper.base import (
+    get_json_backend,
+    is_valid_context,
+    is_valid_datetime,
+    is_valid_URI,
+)
 from caliper.constants import (
     CALIPER_CLASSES,
     CALIPER_CORE_CONTEXT,
@@ -43,6 +48,12 @@ def from_caliper_envelope(d, strict=False):
     return r
 
 
+# condense an envelope straight from its json-string (or bytes), decoding it
+# with the given JSON backend
+def from_caliper_envelope_json(s, strict=False, json_backend="auto"):
+    return from_caliper_envelope(get_json_backend(json_backend).loads(s), strict=strict)
+
+
 def from_json_dict(d, strict=False):
     ctxt = d.get("@context")
     id = d.get("id")
@@ -34,6 +34,7 @@ from caliper.base import BaseEntity
 # Fundamental entities
 # Base entity class
 class Entity(BaseEntity):
+    __slots__ = ()
 
     # Use the base context value here, but preserve the context labels
     # in case, in the future, indivdual contexts start getting split out
@@ -91,6 +92,8 @@ class Entity(BaseEntity):
 
 
 class SystemIdentifier(BaseEntity):
+    __slots__ = ()
+
     def __init__(
         self,
         identifier=None,
@@ -130,6 +133,8 @@ class SystemIdentifier(BaseEntity):
 
 # Fundamental entities
 class Collection(Entity):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         Entity.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["ENTITY"])
@@ -142,6 +147,8 @@ class Collection(Entity):
 # Derived entities
 # Membership entities
 class Membership(Entity):
+    __slots__ = ()
+
     def __init__(
         self, member=None, organization=None, roles=None, status=None, **kwargs
     ):
@@ -185,11 +192,15 @@ class Membership(Entity):
 
 # Agent entities
 class Agent(Entity):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Entity.__init__(self, **kwargs)
 
 
 class SoftwareApplication(Agent):
+    __slots__ = ()
+
     def __init__(
         self, host=None, ipAddress=None, userAgent=None, version=None, **kwargs
     ):
@@ -217,12 +228,16 @@ class SoftwareApplication(Agent):
 
 
 class Person(Agent):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Agent.__init__(self, **kwargs)
 
 
 # Organization entities
 class Organization(Agent):
+    __slots__ = ()
+
     def __init__(self, members=None, subOrganizationOf=None, **kwargs):
         Entity.__init__(self, **kwargs)
         self._set_list_prop("members", members, t=ENTITY_TYPES["AGENT"])
@@ -240,6 +255,8 @@ class Organization(Agent):
 
 
 class CourseOffering(Organization):
+    __slots__ = ()
+
     def __init__(self, academicSession=None, courseNumber=None, **kwargs):
         Organization.__init__(self, **kwargs)
         self._set_str_prop("academicSession", academicSession)
@@ -255,6 +272,8 @@ class CourseOffering(Organization):
 
 
 class CourseSection(CourseOffering):
+    __slots__ = ()
+
     def __init__(self, category=None, **kwargs):
         CourseOffering.__init__(self, **kwargs)
         self._set_str_prop("category", category)
@@ -265,6 +284,8 @@ class CourseSection(CourseOffering):
 
 
 class Group(Organization):
+    __slots__ = ()
+
     def __init__(self, members=None, **kwargs):
         Organization.__init__(self, **kwargs)
         self._set_list_prop("members", members, t=ENTITY_TYPES["PERSON"])
@@ -272,12 +293,16 @@ class Group(Organization):
 
 # Learning objective
 class LearningObjective(Entity):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Entity.__init__(self, **kwargs)
 
 
 # Aggregate measures
 class AggregateMeasure(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         endedAtTime=None,
@@ -324,6 +349,8 @@ class AggregateMeasure(Entity):
 
 
 class AggregateMeasureCollection(Collection):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         Collection.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["AGGREGATE_MEASURE"])
@@ -331,6 +358,8 @@ class AggregateMeasureCollection(Collection):
 
 # Creative works
 class DigitalResource(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         learningObjectives=None,
@@ -395,12 +424,16 @@ class DigitalResource(Entity):
 
 
 class DigitalResourceCollection(DigitalResource, Collection):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["DIGITAL_RESOURCE"])
 
 
 class Frame(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, index=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_int_prop("index", index)
@@ -411,17 +444,23 @@ class Frame(DigitalResource):
 
 
 class Reading(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 # not a digital resource, just a web endpoint
 class Link(Entity):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Entity.__init__(self, **kwargs)
 
 
 class LtiLink(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, messageType=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
@@ -432,47 +471,65 @@ class LtiLink(DigitalResource):
 
 
 class WebPage(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class Document(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class Chapter(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class Page(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class EpubChapter(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class EpubPart(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class EpubSubChapter(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 class EpubVolume(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         DigitalResource.__init__(self, **kwargs)
 
 
 # Annotation entities
 class Annotation(Entity):
+    __slots__ = ()
+
     def __init__(self, annotated=None, annotator=None, **kwargs):
         Entity.__init__(self, **kwargs)
         self._set_obj_prop(
@@ -490,6 +547,8 @@ class Annotation(Entity):
 
 
 class BookmarkAnnotation(Annotation):
+    __slots__ = ()
+
     def __init__(self, bookmarkNotes=None, **kwargs):
         Annotation.__init__(self, **kwargs)
         self._set_str_prop("bookmarkNotes", bookmarkNotes)
@@ -500,6 +559,8 @@ class BookmarkAnnotation(Annotation):
 
 
 class HighlightAnnotation(Annotation):
+    __slots__ = ()
+
     def __init__(self, selection=None, selectionText=None, **kwargs):
         Annotation.__init__(self, **kwargs)
         self._set_obj_prop(
@@ -517,6 +578,8 @@ class HighlightAnnotation(Annotation):
 
 
 class SharedAnnotation(Annotation):
+    __slots__ = ()
+
     def __init__(self, withAgents=None, **kwargs):
         Annotation.__init__(self, **kwargs)
         self._set_list_prop("withAgents", withAgents, t=ENTITY_TYPES["AGENT"])
@@ -527,6 +590,8 @@ class SharedAnnotation(Annotation):
 
 
 class TagAnnotation(Annotation):
+    __slots__ = ()
+
     def __init__(self, tags=None, **kwargs):
         Annotation.__init__(self, **kwargs)
         self._set_list_prop("tags", tags, t=str)
@@ -537,6 +602,8 @@ class TagAnnotation(Annotation):
 
 
 class TextPositionSelector(BaseEntity):
+    __slots__ = ()
+
     def __init__(self, start=None, end=None, extensions=None, **kwargs):
         BaseEntity.__init__(self, **kwargs)
         self._set_int_prop("end", end, req=True)
@@ -566,6 +633,8 @@ class TextPositionSelector(BaseEntity):
 
 # Assessment entities
 class AssignableDigitalResource(DigitalResource):
+    __slots__ = ()
+
     def __init__(
         self,
         dateToActivate=None,
@@ -616,12 +685,16 @@ class AssignableDigitalResource(DigitalResource):
 
 
 class Assessment(AssignableDigitalResource, DigitalResourceCollection):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         AssignableDigitalResource.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["ASSESSMENT_ITEM"])
 
 
 class AssessmentItem(AssignableDigitalResource):
+    __slots__ = ()
+
     def __init__(self, isTimeDependent=None, **kwargs):
         AssignableDigitalResource.__init__(self, **kwargs)
         self._set_bool_prop("isTimeDependent", isTimeDependent)
@@ -633,6 +706,8 @@ class AssessmentItem(AssignableDigitalResource):
 
 # Attempt and Response entities
 class Attempt(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         assignable=None,
@@ -695,6 +770,8 @@ class Attempt(Entity):
 
 
 class Response(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         attempt=None,
@@ -735,6 +812,8 @@ class Response(Entity):
 
 
 class DateTimeResponse(Response):
+    __slots__ = ()
+
     def __init__(self, dateTimeSelected=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_datetime_prop("dateTimeSelected", dateTimeSelected)
@@ -745,6 +824,8 @@ class DateTimeResponse(Response):
 
 
 class FillinBlankResponse(Response):
+    __slots__ = ()
+
     def __init__(self, values=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_list_prop("values", values, t=str)
@@ -755,6 +836,8 @@ class FillinBlankResponse(Response):
 
 
 class MultipleChoiceResponse(Response):
+    __slots__ = ()
+
     def __init__(self, value=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_str_prop("value", value)
@@ -765,6 +848,8 @@ class MultipleChoiceResponse(Response):
 
 
 class MultipleResponseResponse(Response):
+    __slots__ = ()
+
     def __init__(self, values=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_list_prop("values", values, t=str)
@@ -775,6 +860,8 @@ class MultipleResponseResponse(Response):
 
 
 class MultiselectResponse(Response):
+    __slots__ = ()
+
     def __init__(self, selections=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_list_prop("selections", selections, t=str)
@@ -785,6 +872,8 @@ class MultiselectResponse(Response):
 
 
 class OpenEndedResponse(Response):
+    __slots__ = ()
+
     def __init__(self, value, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_str_prop("value", value)
@@ -795,6 +884,8 @@ class OpenEndedResponse(Response):
 
 
 class RatingScaleResponse(Response):
+    __slots__ = ()
+
     def __init__(self, selections=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_list_prop("selections", selections, t=[str, float])
@@ -805,6 +896,8 @@ class RatingScaleResponse(Response):
 
 
 class SelectTextResponse(Response):
+    __slots__ = ()
+
     def __init__(self, values=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_list_prop("values", values, t=str)
@@ -815,6 +908,8 @@ class SelectTextResponse(Response):
 
 
 class TrueFalseResponse(Response):
+    __slots__ = ()
+
     def __init__(self, value=None, **kwargs):
         Response.__init__(self, **kwargs)
         self._set_str_prop("value", value)
@@ -826,18 +921,24 @@ class TrueFalseResponse(Response):
 
 # Discussion forum entities
 class Forum(DigitalResourceCollection):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         DigitalResourceCollection.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["THREAD"])
 
 
 class Thread(DigitalResourceCollection):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         DigitalResourceCollection.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["MESSAGE"])
 
 
 class Message(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, body=None, replyTo=None, attachments=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_str_prop("body", body)
@@ -861,6 +962,8 @@ class Message(DigitalResource):
 
 # Feedback entities
 class Rating(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         rater=None,
@@ -899,6 +1002,8 @@ class Rating(Entity):
 
 
 class Comment(Entity):
+    __slots__ = ()
+
     def __init__(self, commenter=None, commentedOn=None, value=None, **kwargs):
         Entity.__init__(self, **kwargs)
         self._set_obj_prop("commenter", commenter, t=ENTITY_TYPES["PERSON"])
@@ -919,6 +1024,8 @@ class Comment(Entity):
 
 
 class Question(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, questionPosed=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_str_prop("questionPosed", questionPosed)
@@ -929,6 +1036,8 @@ class Question(DigitalResource):
 
 
 class DateTimeQuestion(Question):
+    __slots__ = ()
+
     def __init__(
         self, maxDateTime=None, maxLabel=None, minDateTime=None, minLabel=None, **kwargs
     ):
@@ -956,6 +1065,8 @@ class DateTimeQuestion(Question):
 
 
 class MultiselectQuestion(Question):
+    __slots__ = ()
+
     def __init__(self, itemLabels=None, itemValues=None, points=None, **kwargs):
         Question.__init__(self, **kwargs)
         self._set_list_prop("itemLabels", itemLabels, t=str)
@@ -976,11 +1087,15 @@ class MultiselectQuestion(Question):
 
 
 class OpenEndedQuestion(Question):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Question.__init__(self, **kwargs)
 
 
 class RatingScaleQuestion(Question):
+    __slots__ = ()
+
     def __init__(self, scale=None, **kwargs):
         Question.__init__(self, **kwargs)
         self._set_obj_prop("scale", scale, t=ENTITY_TYPES["SCALE"])
@@ -991,11 +1106,15 @@ class RatingScaleQuestion(Question):
 
 
 class Scale(Entity):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Entity.__init__(self, **kwargs)
 
 
 class LikertScale(Scale):
+    __slots__ = ()
+
     def __init__(self, itemLabels=None, itemValues=None, scalePoints=None, **kwargs):
         Scale.__init__(self, **kwargs)
         self._set_list_prop("itemLabels", itemLabels, t=str)
@@ -1016,6 +1135,8 @@ class LikertScale(Scale):
 
 
 class MultiselectScale(Scale):
+    __slots__ = ()
+
     def __init__(
         self,
         itemLabels=None,
@@ -1060,6 +1181,8 @@ class MultiselectScale(Scale):
 
 
 class NumericScale(Scale):
+    __slots__ = ()
+
     def __init__(
         self,
         maxLabel=None,
@@ -1099,12 +1222,16 @@ class NumericScale(Scale):
 
 # Survey entities
 class Survey(Collection):
+    __slots__ = ()
+
     def __init__(self, items=None, **kwargs):
         Collection.__init__(self, **kwargs)
         self._set_list_prop("items", items, t=ENTITY_TYPES["QUESTIONNAIRE"])
 
 
 class SurveyInvitation(DigitalResource):
+    __slots__ = ()
+
     def __init__(
         self, rater=None, sentCount=None, dateSent=None, survey=None, **kwargs
     ):
@@ -1132,6 +1259,8 @@ class SurveyInvitation(DigitalResource):
 
 
 class Questionnaire(DigitalResourceCollection):
+    __slots__ = ()
+
     def __init(self, items=None, **kwargs):
         DigitalResourceCollection.__init__(self, **kwargs)
         self._set_list_prop(
@@ -1140,6 +1269,8 @@ class Questionnaire(DigitalResourceCollection):
 
 
 class QuestionnaireItem(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, categories=None, question=None, weight=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_list_prop("categories", categories, t=str)
@@ -1161,6 +1292,8 @@ class QuestionnaireItem(DigitalResource):
 
 # Media entities
 class MediaObject(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, duration=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_duration_prop("duration", duration)
@@ -1171,6 +1304,8 @@ class MediaObject(DigitalResource):
 
 
 class MediaLocation(DigitalResource):
+    __slots__ = ()
+
     def __init__(self, currentTime=None, **kwargs):
         DigitalResource.__init__(self, **kwargs)
         self._set_duration_prop("currentTime", currentTime)
@@ -1181,6 +1316,8 @@ class MediaLocation(DigitalResource):
 
 
 class AudioObject(MediaObject):
+    __slots__ = ()
+
     def __init__(
         self, muted=None, volumeLevel=None, volumeMax=None, volumeMin=None, **kwargs
     ):
@@ -1208,17 +1345,23 @@ class AudioObject(MediaObject):
 
 
 class ImageObject(MediaObject):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         MediaObject.__init__(self, **kwargs)
 
 
 class VideoObject(MediaObject):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         MediaObject.__init__(self, **kwargs)
 
 
 # Outcome entities
 class Result(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         attempt=None,
@@ -1257,6 +1400,8 @@ class Result(Entity):
 
 
 class Score(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         attempt=None,
@@ -1296,6 +1441,8 @@ class Score(Entity):
 
 # Search entities
 class Query(Entity):
+    __slots__ = ()
+
     def __init__(self, creator=None, searchTarget=None, searchTerms=None, **kwargs):
         Entity.__init__(self, **kwargs)
         self._set_obj_prop("creator", creator, t=ENTITY_TYPES["PERSON"])
@@ -1316,6 +1463,8 @@ class Query(Entity):
 
 
 class SearchResponse(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         searchProvider=None,
@@ -1355,6 +1504,8 @@ class SearchResponse(Entity):
 
 # Session entities
 class Session(Entity):
+    __slots__ = ()
+
     def __init__(
         self,
         client=None,
@@ -1401,6 +1552,8 @@ class Session(Entity):
 
 
 class LtiSession(Session):
+    __slots__ = ()
+
     def __init__(self, messageParameters=None, **kwargs):
         Session.__init__(self, **kwargs)
         self._set_dict_prop("messageParameters", messageParameters)
@@ -20,11 +20,13 @@
 
 from caliper.constants import CALIPER_ACTIONS, CALIPER_PROFILES
 from caliper.constants import ENTITY_TYPES
-from caliper.base import BaseEvent, ensure_type, ensure_types
+from caliper.base import BaseEvent, _build_type_registry, ensure_type, ensure_types
 
 
 # Base event class
 class Event(BaseEvent):
+    __slots__ = ()
+
     def __init__(
         self,
         id=None,
@@ -117,6 +119,8 @@ class Event(BaseEvent):
 
 
 class MinimalEvent(BaseEvent):
+    __slots__ = ()
+
     def __init__(self, id=None, action=None, actor=None, object=None, eventTime=None):
         BaseEvent.__init__(
             self, id=id, action=action, object=object, eventTime=eventTime
@@ -130,6 +134,8 @@ class MinimalEvent(BaseEvent):
 
 # Derived Events
 class AnnotationEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -139,6 +145,8 @@ class AnnotationEvent(Event):
 
 
 class AssessmentEvent(Event):
+    __slots__ = ()
+
     def __init__(self, target=None, **kwargs):
         Event.__init__(self, target=None, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -147,6 +155,8 @@ class AssessmentEvent(Event):
 
 
 class AssessmentItemEvent(Event):
+    __slots__ = ()
+
     def __init__(self, target=None, **kwargs):
         Event.__init__(self, target=None, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -157,6 +167,8 @@ class AssessmentItemEvent(Event):
 
 
 class AssignableEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -166,6 +178,8 @@ class AssignableEvent(Event):
 
 
 class FeedbackEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -178,6 +192,8 @@ class FeedbackEvent(Event):
 
 
 class ForumEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -185,6 +201,8 @@ class ForumEvent(Event):
 
 
 class GradeEvent(Event):
+    __slots__ = ()
+
     def __init__(self, target=None, **kwargs):
         Event.__init__(self, target=None, **kwargs)
         ensure_type(self.object, ENTITY_TYPES["ATTEMPT"])
@@ -192,6 +210,8 @@ class GradeEvent(Event):
 
 
 class MediaEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -200,6 +220,8 @@ class MediaEvent(Event):
 
 
 class MessageEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -207,6 +229,8 @@ class MessageEvent(Event):
 
 
 class NavigationEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -234,6 +258,8 @@ class NavigationEvent(Event):
 
 
 class QuestionnaireEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -241,6 +267,8 @@ class QuestionnaireEvent(Event):
 
 
 class QuestionnaireItemEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -249,6 +277,8 @@ class QuestionnaireItemEvent(Event):
 
 
 class ResourceManagementEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -260,6 +290,8 @@ class ResourceManagementEvent(Event):
 
 
 class SearchEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -268,6 +300,8 @@ class SearchEvent(Event):
 
 
 class SessionEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         if self.action == CALIPER_ACTIONS["LOGGED_IN"]:
@@ -290,6 +324,8 @@ class SessionEvent(Event):
 
 
 class SurveyEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -297,6 +333,8 @@ class SurveyEvent(Event):
 
 
 class SurveyInvitationEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -304,6 +342,8 @@ class SurveyInvitationEvent(Event):
 
 
 class ThreadEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -311,6 +351,8 @@ class ThreadEvent(Event):
 
 
 class ToolLaunchEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -324,6 +366,8 @@ class ToolLaunchEvent(Event):
 
 
 class ToolUseEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -335,6 +379,8 @@ class ToolUseEvent(Event):
 
 
 class ViewEvent(Event):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         Event.__init__(self, **kwargs)
         ensure_type(self.actor, ENTITY_TYPES["PERSON"])
@@ -346,3 +392,7 @@ class ViewEvent(Event):
         else:
             ensure_type(self.object, ENTITY_TYPES["DIGITAL_RESOURCE"])
             ensure_type(self.target, ENTITY_TYPES["FRAME"], optional=True)
+
+
+# with the entities and events all defined, Caliper types can get looked up
+_build_type_registry()
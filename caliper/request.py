@@ -18,17 +18,76 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program. If not, see http://www.gnu.org/licenses/.
 
-import copy
+import asyncio
+import contextlib
 import datetime
+import email.utils
+import json
+import random
 import requests
+import threading
+import time
 
 from collections.abc import MutableSequence
+from requests.adapters import HTTPAdapter
 
-from caliper.base import CaliperSerializable, HttpOptions
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from caliper.base import (
+    CaliperSerializable,
+    DescribeOnce,
+    HttpOptions,
+    ensure_type,
+    get_json_backend,
+    is_valid_datetime,
+)
+from caliper.compression import Compressor
 from caliper.constants import CALIPER_CORE_CONTEXT
 
 
+# seconds a response's Retry-After header asks the client to wait, or None
+def _get_retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((when - now).total_seconds(), 0.0)
+
+
+# a requests.Response holding what an aiohttp response brought, so that results
+# and debug output look the same whichever requestor sent them
+def _as_response(r, body):
+    response = requests.Response()
+    response.status_code = r.status
+    response.headers = requests.structures.CaseInsensitiveDict(r.headers)
+    response.url = str(r.url)
+    response.reason = r.reason
+    response.encoding = r.charset
+    response._content = body
+    return response
+
+
+async def _iter_async(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
 class Envelope(CaliperSerializable):
+    __slots__ = ()
+
     def __init__(
         self,
         data=None,
@@ -73,23 +132,150 @@ class Envelope(CaliperSerializable):
 
     # override because Envelopes should only specially serialize
     # their data property's contents
-    def as_dict(self, described_objects=None, thin_context=False, thin_props=False):
-        return copy.deepcopy(
-            {
-                "sendTime": self.sendTime,
-                "sensor": self.sensor,
-                "dataVersion": self.dataVersion,
-                "data": self._unpack_list(
-                    self.data,
-                    described_objects=described_objects or [],
-                    thin_context=thin_context,
-                    thin_props=thin_props,
-                ),
-            }
+    def _as_dict(
+        self, described_objects=None, thin_context=False, thin_props=False, ids=None
+    ):
+        if described_objects is None:
+            described_objects = ()
+        return {
+            "sendTime": self.sendTime,
+            "sensor": self.sensor,
+            "dataVersion": self.dataVersion,
+            "data": self._unpack_list(
+                self.data,
+                described_objects=described_objects,
+                thin_context=thin_context,
+                thin_props=thin_props,
+                ids=ids,
+            ),
+        }
+
+
+# Encoder for envelope data items, one at a time, in the form EnvelopeEncoder
+# gives them; envelopes can be assembled later from items encoded ahead of time,
+# by an EnvelopeEncoder with the same settings
+class DataEncoder(object):
+    def __init__(
+        self,
+        described_objects=None,
+        thin_context=False,
+        thin_props=False,
+        json_backend=None,
+    ):
+        if described_objects is None:
+            described_objects = ()
+        self._described_objects = described_objects
+        self._thin_context = thin_context
+        self._thin_props = thin_props
+        self._json_backend = json_backend
+        self._ids = []
+        if json_backend is None:
+            self._dumpb = self._dumpb_default
+        else:
+            self._dumpb = get_json_backend(json_backend).dumpb
+
+    @staticmethod
+    def _dumpb_default(obj):
+        return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+    @property
+    def json_backend(self):
+        return self._json_backend
+
+    # ids of the objects encoded so far, in payload order; for streams, fills up
+    # as the encoded stream gets consumed
+    @property
+    def ids(self):
+        return self._ids
+
+    # described_objects, when given, stands in for the encoder's own for this item
+    def encode_item(self, item, described_objects=None):
+        ensure_type(item, CaliperSerializable)
+        if described_objects is None:
+            described_objects = self._described_objects
+        if isinstance(item, CaliperSerializable):
+            item = item._unpack_object(
+                described_objects=described_objects,
+                thin_context=self._thin_context,
+                thin_props=self._thin_props,
+                ids=self._ids,
+            )
+        return self._dumpb(item)
+
+
+# Streaming encoder for envelopes: produces the same json-string as
+# Envelope.as_json(), but one data item at a time, so that a payload never
+# needs to exist in memory all at once
+class EnvelopeEncoder(DataEncoder):
+    def __init__(
+        self,
+        dataVersion=CALIPER_CORE_CONTEXT,
+        send_time=None,
+        sensor_id=None,
+        described_objects=None,
+        thin_context=False,
+        thin_props=False,
+        json_backend=None,
+    ):
+        for k, v in (("dataVersion", dataVersion), ("sensor", sensor_id)):
+            if not isinstance(v, str):
+                raise ValueError("{0} must be a str; got {1} instead".format(k, v))
+        if not is_valid_datetime(send_time):
+            raise ValueError("sendTime must be a valid date-time")
+        DataEncoder.__init__(
+            self,
+            described_objects=described_objects,
+            thin_context=thin_context,
+            thin_props=thin_props,
+            json_backend=json_backend,
         )
+        # the envelope's other properties all sort after "data"
+        tail = {"dataVersion": dataVersion, "sendTime": send_time, "sensor": sensor_id}
+        if json_backend is None:
+            self._head, self._sep = b'{"data": [', b", "
+            self._tail = b"], " + json.dumps(tail, sort_keys=True)[1:].encode("utf-8")
+        else:
+            self._head, self._sep = b'{"data":[', b","
+            self._tail = b"]," + self._dumpb(tail)[1:]
+
+    # bytes an encoded item adds to an envelope, beyond its own length
+    @property
+    def separator_size(self):
+        return len(self._sep)
+
+    # bytes an envelope takes before any items go in
+    @property
+    def envelope_size(self):
+        return len(self._head) + len(self._tail)
+
+    # assembles an envelope from items already encoded with the same settings
+    def iter_join(self, fragments):
+        yield self._head
+        sep = b""
+        for fragment in fragments:
+            yield sep + fragment
+            sep = self._sep
+        yield self._tail
+
+    def iter_encode(self, data):
+        return self.iter_join(self.encode_item(item) for item in data)
+
+    def encode(self, data):
+        return b"".join(self.iter_encode(data)).decode("utf-8")
+
+    def write(self, data, sink):
+        # sink is any object with a write(bytes) method, like an open binary
+        # file or io.BytesIO; returns the number of bytes written
+        written = 0
+        for chunk in self.iter_encode(data):
+            sink.write(chunk)
+            written += len(chunk)
+        return written
 
 
 class EndpointConfig(CaliperSerializable):
+    __slots__ = ()
+
     def __init__(
         self,
         caliper_maximum_payload_size=None,
@@ -126,18 +312,37 @@ class EndpointConfig(CaliperSerializable):
         return self._get_prop("caliper_supported_versions")
 
     # override because EndpointConfig should not specially serialize any of its properties
-    def as_dict(self, described_objects=None, thin_context=False, thin_props=False):
-        return copy.deepcopy(
-            {
-                "caliper_maximum_payload_size": self.caliper_maximum_payload_size,
-                "caliper_supported_extensions": self.caliper_supported_extensions,
-                "caliper_supported_versions": self.caliper_supported_versions,
-            }
-        )
+    def _as_dict(
+        self, described_objects=None, thin_context=False, thin_props=False, ids=None
+    ):
+        return {
+            "caliper_maximum_payload_size": self.caliper_maximum_payload_size,
+            "caliper_supported_extensions": self.caliper_supported_extensions,
+            "caliper_supported_versions": self.caliper_supported_versions,
+        }
 
 
 class EventStoreRequestor(object):
-    def describe(self, caliper_entity_list=None, sensor_id=None, debug=False):
+
+    # statistics the requestor records transport measurements into, if any;
+    # the client that owns the requestor sets this
+    _stats = None
+
+    @property
+    def stats(self):
+        return self._stats
+
+    @stats.setter
+    def stats(self, new_stats):
+        self._stats = new_stats
+
+    # releases whatever the requestor holds open, like pooled connections
+    def close(self):
+        pass
+
+    def describe(
+        self, caliper_entity_list=None, sensor_id=None, debug=False, deadline=None
+    ):
         raise NotImplementedError(
             "Instance must implement EventStoreRequester.describe()"
         )
@@ -147,12 +352,57 @@ class EventStoreRequestor(object):
             "Instance must implement EventStoreRequester.get_config()"
         )
 
+    # the most bytes the endpoint takes in one payload, or None for no limit
+    def get_payload_limit(self):
+        return None
+
+    # requestors that can keep events to send later take them here, and return
+    # how many they kept
+    def spool(self, caliper_event_list=None, described_objects=None, sensor_id=None):
+        return 0
+
+    # requestors that can send data items encoded ahead of time (by the encoder
+    # they provide) implement these two methods
+    def get_data_encoder(self, described_objects=None):
+        raise NotImplementedError(
+            "Instance must implement EventStoreRequester.get_data_encoder()"
+        )
+
+    def send_encoded(
+        self, fragments=None, ids=None, sensor_id=None, debug=False, deadline=None
+    ):
+        raise NotImplementedError(
+            "Instance must implement EventStoreRequester.send_encoded()"
+        )
+
+    # requestors whose data items can get encoded once and sent through other
+    # requestors too return a key that tells their serialization settings apart:
+    # items from encode_items() may go to send_items() of any requestor with the
+    # same key. None means the requestor encodes only for itself
+    def get_encoding_key(self):
+        return None
+
+    # data items encoded ahead of time, as (fragment, ids) pairs, one per item
+    def encode_items(self, caliper_objects=None, described_objects=None):
+        encoder = self.get_data_encoder(described_objects)
+        items = []
+        for item in caliper_objects:
+            n = len(encoder.ids)
+            items.append((encoder.encode_item(item), encoder.ids[n:]))
+        return items
+
+    def send_items(self, items=None, sensor_id=None, debug=False, deadline=None):
+        raise NotImplementedError(
+            "Instance must implement EventStoreRequester.send_items()"
+        )
+
     def send(
         self,
         caliper_event_list=None,
         described_objects=None,
         sensor_id=None,
         debug=False,
+        deadline=None,
     ):
         raise NotImplementedError("Instance must implement EventStoreRequester.send()")
 
@@ -166,13 +416,41 @@ class EventStoreRequestor(object):
         optimize=False,
         send_time=None,
         sensor_id=None,
+        json_backend=None,
     ):
         st = send_time if send_time else self._get_time()
         payload, ids = self._get_payload_json(
-            caliper_objects, described_objects, optimize, st, sensor_id
+            caliper_objects, described_objects, optimize, st, sensor_id, json_backend
         )
         return {"type": "{}".format("application/json"), "data": payload}, ids
 
+    # like _generate_payload, but the payload's data is an iterator of byte
+    # chunks, and the id list fills up as the iterator gets consumed
+    def _generate_payload_stream(
+        self,
+        caliper_objects=None,
+        described_objects=None,
+        optimize=False,
+        send_time=None,
+        sensor_id=None,
+        json_backend=None,
+    ):
+        encoder = EnvelopeEncoder(
+            send_time=send_time if send_time else self._get_time(),
+            sensor_id=sensor_id,
+            described_objects=described_objects,
+            thin_context=optimize,
+            thin_props=optimize,
+            json_backend=json_backend,
+        )
+        return (
+            {
+                "type": "{}".format("application/json"),
+                "data": encoder.iter_encode(caliper_objects),
+            },
+            encoder.ids,
+        )
+
     def _get_payload_json(
         self,
         caliper_objects=None,
@@ -180,16 +458,29 @@ class EventStoreRequestor(object):
         optimize=False,
         send_time=None,
         sensor_id=None,
+        json_backend=None,
     ):
         envelope = Envelope(
             data=caliper_objects, send_time=send_time, sensor_id=sensor_id
         )
 
-        return envelope.as_json_with_ids(
+        if json_backend is None:
+            return envelope.as_json_with_ids(
+                described_objects=described_objects,
+                thin_context=optimize,
+                thin_props=optimize,
+            )
+
+        # backend payloads may hold non-ASCII characters, so they go out as
+        # UTF-8 bytes rather than as a string
+        ids = []
+        r = envelope._as_dict(
             described_objects=described_objects,
             thin_context=optimize,
             thin_props=optimize,
+            ids=ids,
         )
+        return get_json_backend(json_backend).dumpb(r), ids
 
 
 class HttpRequestor(EventStoreRequestor):
@@ -200,71 +491,761 @@ class HttpRequestor(EventStoreRequestor):
             raise TypeError("options must implement base.HttpOptions")
         else:
             self._options = options
+        self._session = None
+        self._session_slots = None
+        self._session_lock = threading.Lock()
+        self._payload_limit = None
+        self._payload_limit_fetched = False
+        self._payload_limit_failures = 0
+        self._payload_limit_retry_at = None
+        self._config_lock = threading.Lock()
+
+    # the requestor's pooled session, created on first use and kept until
+    # close(); requests sessions, and the urllib3 connection pools under them,
+    # are safe to share between threads for sending requests like these. Calls
+    # wait (up to CONNECTION_REQUEST_TIMEOUT) for one of the pool's slots. Pool
+    # option changes apply to the next session, after a close()
+    def _get_session(self):
+        with self._session_lock:
+            if self._session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=self._options.POOL_MAXSIZE)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                self._session = s
+                self._session_slots = threading.BoundedSemaphore(
+                    self._options.POOL_MAXSIZE
+                )
+            return self._session, self._session_slots
+
+    # seconds left before a call's deadline (a time.monotonic() value) runs out
+    def _time_left(self, expires):
+        if expires is None:
+            return None
+        left = expires - time.monotonic()
+        if left <= 0:
+            raise requests.exceptions.Timeout("Deadline exceeded")
+        return left
 
+    # the (connect, read) timeouts for a request, in seconds, cut short by the
+    # time left before the call's deadline; requests applies the read timeout
+    # to each socket read rather than the whole response, so a response that
+    # keeps trickling in can still outlast the deadline
+    def _get_timeout(self, expires):
+        timeout = (
+            self._options.CONNECTION_TIMEOUT / 1000.0,
+            self._options.SOCKET_TIMEOUT / 1000.0,
+        )
+        left = self._time_left(expires)
+        if left is None:
+            return timeout
+        return tuple(min(t, left) for t in timeout)
+
+    @contextlib.contextmanager
+    def _connect(self, expires=None):
+        if self._options.KEEP_ALIVE:
+            s, slots = self._get_session()
+            wait = self._options.CONNECTION_REQUEST_TIMEOUT / 1000.0
+            left = self._time_left(expires)
+            if not slots.acquire(timeout=wait if left is None else min(wait, left)):
+                raise requests.exceptions.Timeout("Timed out waiting for a connection")
+            try:
+                yield s
+            finally:
+                slots.release()
+        else:
+            s = requests.Session()
+            try:
+                yield s
+            finally:
+                s.close()
+
+    def close(self):
+        with self._session_lock:
+            s, self._session = self._session, None
+        if s is not None:
+            s.close()
+
+    def _record_timeout(self):
+        if self._stats is not None:
+            self._stats.update_timeouts(1)
+
+    def _get_compressor(self):
+        if not self._options.COMPRESSION:
+            return None
+        return Compressor(
+            encoding=self._options.COMPRESSION,
+            zdict=self._options.COMPRESSION_DICTIONARY,
+        )
+
+    def _record_compression(self, size, compressed_size, cpu_time):
+        if self._stats is not None:
+            self._stats.update_compression_ratio(size / max(compressed_size, 1))
+            self._stats.update_compression_time(cpu_time * 1000)
+
+    # returns the payload data compressed, or None when it's below the threshold
+    def _compress(self, compressor, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if len(data) < self._options.COMPRESSION_THRESHOLD:
+            return None
+        start = time.thread_time()
+        r = compressor.compress(data)
+        self._record_compression(len(data), len(r), time.thread_time() - start)
+        return r
+
+    # compresses a streamed payload chunk by chunk; the time spent producing the
+    # chunks doesn't count as compression time
+    def _compress_stream(self, compressor, chunks):
+        c = compressor.compressobj()
+        size = compressed_size = 0
+        cpu_time = 0.0
+        for chunk in chunks:
+            start = time.thread_time()
+            out = c.compress(chunk)
+            cpu_time += time.thread_time() - start
+            size += len(chunk)
+            if out:
+                compressed_size += len(out)
+                yield out
+        start = time.thread_time()
+        out = c.flush()
+        cpu_time += time.thread_time() - start
+        compressed_size += len(out)
+        yield out
+        self._record_compression(size, compressed_size, cpu_time)
+
+    # the data to post for a payload, and the headers to post it with
+    def _prepare_post(self, payload):
+        hdrs = {"Content-Type": payload["type"]}
+        data = payload["data"]
+        compressor = self._get_compressor()
+        if compressor and self._options.STREAM_PAYLOAD:
+            data = self._compress_stream(compressor, data)
+            hdrs.update({"Content-Encoding": compressor.encoding})
+        elif compressor:
+            compressed = self._compress(compressor, data)
+            if compressed is not None:
+                data = compressed
+                hdrs.update({"Content-Encoding": compressor.encoding})
+        if self._options.get_auth_header_value():
+            hdrs.update({"Authorization": self._options.get_auth_header_value()})
+        return data, hdrs
+
+    def _post_payload(self, payload, expires=None):
+        data, hdrs = self._prepare_post(payload)
+        with self._connect(expires) as s:
+            return s.post(
+                self._options.HOST,
+                data=data,
+                headers=hdrs,
+                timeout=self._get_timeout(expires),
+            )
+
+    def _record_attempts(self, attempts):
+        if self._stats is not None:
+            self._stats.update_attempts(attempts)
+
+    # seconds to wait before trying a post again, or None to stop trying
+    def _get_retry_wait(self, attempt, r, error, expires):
+        if attempt >= self._options.RETRY_ATTEMPTS:
+            return None
+        if error is not None:
+            if not isinstance(error, self._options.RETRY_EXCEPTIONS):
+                return None
+        elif r.status_code not in self._options.RETRY_STATUS_CODES:
+            return None
+        cap = min(
+            self._options.RETRY_BACKOFF * 2 ** (attempt - 1),
+            self._options.RETRY_BACKOFF_MAX,
+        )
+        wait = random.uniform(0, cap / 1000.0)
+        if r is not None:
+            retry_after = _get_retry_after(r) or 0.0
+            # a server asking for longer than the longest backoff gets no retry
+            # rather than one sooner than it asked for
+            if retry_after * 1000.0 > self._options.RETRY_BACKOFF_MAX:
+                return None
+            wait = max(wait, retry_after)
+        if expires is not None and time.monotonic() + wait >= expires:
+            return None
+        return wait
+
+    # posts the payload make_payload() returns, as (payload, ids), trying again
+    # with a fresh one as RETRY_ATTEMPTS and the others allow; returns the last
+    # response, or None for a post that timed out, and the last payload's ids
+    def _post_with_retries(self, make_payload, expires=None):
+        attempt = 0
+        while True:
+            attempt += 1
+            payload, ids = make_payload()
+            r = error = None
+            try:
+                r = self._post_payload(payload, expires)
+            except (requests.exceptions.Timeout,) + self._options.RETRY_EXCEPTIONS as e:
+                error = e
+            wait = self._get_retry_wait(attempt, r, error, expires)
+            if wait is None:
+                break
+            time.sleep(wait)
+        self._record_attempts(attempt)
+        if isinstance(error, requests.exceptions.Timeout):
+            self._record_timeout()
+            return None, ids
+        if error is not None:
+            raise error
+        return r, ids
+
+    def _get_results(self, r, count, ids, debug=False):
+        if r is not None and (
+            (r.status_code is requests.codes.ok)
+            or (r.status_code is requests.codes.created)
+        ):
+            v = True
+            identifiers = list(ids)
+        else:
+            v = False
+            identifiers = []
+        return count * [v], identifiers, r if debug else None
+
+    # deadline is the milliseconds the call has, from start to finish; it's
+    # checked between requests and caps each one's timeouts (see _get_timeout),
+    # and a call that runs out of time, or whose connect or read times out, fails
     def _dispatch(
-        self, caliper_objects=None, described_objects=None, sensor_id=None, debug=False
+        self,
+        caliper_objects=None,
+        described_objects=None,
+        sensor_id=None,
+        debug=False,
+        deadline=None,
     ):
         results = []
         identifiers = []
         response = None
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
 
         if isinstance(caliper_objects, MutableSequence):
-            s = requests.Session()
-            payload, ids = self._generate_payload(
+            limit = self._get_payload_limit(expires)
+            if limit is not None:
+                return self._dispatch_split(
+                    caliper_objects, described_objects, sensor_id, debug, expires, limit
+                )
+            make_payload = self._get_payload_maker(
+                caliper_objects, described_objects, sensor_id
+            )
+            r, ids = self._post_with_retries(make_payload, expires)
+            results, identifiers, response = self._get_results(
+                r, len(caliper_objects), ids, debug
+            )
+
+        return results, identifiers, response
+
+    # a function that returns a fresh (payload, ids) for the objects each call
+    def _get_payload_maker(self, caliper_objects, described_objects, sensor_id):
+        if self._options.STREAM_PAYLOAD:
+            # a generator body makes requests send with chunked transfer encoding
+            generate = self._generate_payload_stream
+        else:
+            generate = self._generate_payload
+        dedupe = self._options.DEDUPLICATE_ENTITIES
+
+        def make_payload():
+            described = described_objects
+            if dedupe:
+                # entities repeated across the payload go out in full only once
+                described = DescribeOnce(described_objects or ())
+            return generate(
                 caliper_objects=caliper_objects,
-                described_objects=described_objects,
+                described_objects=described,
                 optimize=self._options.OPTIMIZE_SERIALIZATION,
                 sensor_id=sensor_id,
+                json_backend=self._options.JSON_BACKEND,
             )
-            hdrs = {"Content-Type": payload["type"]}
-            if self._options.get_auth_header_value():
-                hdrs.update({"Authorization": self._options.get_auth_header_value()})
-            r = s.post(self._options.HOST, data=payload["data"], headers=hdrs)
-            if (r.status_code is requests.codes.ok) or (
-                r.status_code is requests.codes.created
-            ):
-                v = True
-                identifiers += ids
-            else:
-                v = False
-            results += len(caliper_objects) * [v]
-            if debug:
-                response = r
-            s.close()
 
+        return make_payload
+
+    def _encode_item(self, encoder, item, described_objects):
+        n = len(encoder.ids)
+        fragment = encoder.encode_item(item, described_objects=described_objects)
+        return fragment, encoder.ids[n:]
+
+    # splits data items, in order, into the fewest envelopes that each fit in
+    # limit bytes (before any compression), as (fragments, ids) pairs; an item
+    # too large for any envelope goes in one by itself
+    def _split_encoded(self, caliper_objects, described_objects, sensor_id, limit):
+        envelope = EnvelopeEncoder(
+            send_time=self._get_time(),
+            sensor_id=sensor_id,
+            json_backend=self._options.JSON_BACKEND,
+        )
+        encoder = self.get_data_encoder(described_objects)
+        dedupe = self._options.DEDUPLICATE_ENTITIES
+        described = DescribeOnce(described_objects or ()) if dedupe else None
+        chunks = []
+        fragments, ids, size = [], [], envelope.envelope_size
+        for item in caliper_objects:
+            fragment, item_ids = self._encode_item(encoder, item, described)
+            if fragments and size + envelope.separator_size + len(fragment) > limit:
+                chunks.append((fragments, ids))
+                fragments, ids, size = [], [], envelope.envelope_size
+                if dedupe:
+                    # entities described in the last envelope need describing
+                    # again in the next
+                    described = DescribeOnce(described_objects or ())
+                    fragment, item_ids = self._encode_item(encoder, item, described)
+            if fragments:
+                size += envelope.separator_size
+            fragments.append(fragment)
+            ids.extend(item_ids)
+            size += len(fragment)
+        if fragments:
+            chunks.append((fragments, ids))
+        return chunks
+
+    # sends each envelope in turn, within the one deadline, and merges their
+    # results in order; the response is the first failed envelope's, or else
+    # the last one's
+    def _dispatch_split(
+        self, caliper_objects, described_objects, sensor_id, debug, expires, limit
+    ):
+        chunks = self._split_encoded(
+            caliper_objects, described_objects, sensor_id, limit
+        )
+        return self._post_chunks(chunks, sensor_id, debug, expires)
+
+    def _post_chunks(self, chunks, sensor_id, debug, expires):
+        results = []
+        identifiers = []
+        response = None
+        for fragments, ids in chunks:
+            r, i, resp = self._post_encoded(fragments, ids, sensor_id, debug, expires)
+            if all(results):
+                response = resp
+            results.extend(r)
+            identifiers.extend(i)
         return results, identifiers, response
 
-    def _get_config(self):
-        s = requests.Session()
+    def _post_encoded(self, fragments, ids, sensor_id, debug, expires):
+        make_payload = self._get_encoded_payload_maker(fragments, ids, sensor_id)
+        r, ids = self._post_with_retries(make_payload, expires)
+        return self._get_results(r, len(fragments), ids, debug)
+
+    def _get_encoded_payload_maker(self, fragments, ids, sensor_id):
+        def make_payload():
+            encoder = EnvelopeEncoder(
+                send_time=self._get_time(),
+                sensor_id=sensor_id,
+                json_backend=self._options.JSON_BACKEND,
+            )
+            data = encoder.iter_join(fragments)
+            if not self._options.STREAM_PAYLOAD:
+                data = b"".join(data)
+            return {"type": "application/json", "data": data}, ids or ()
+
+        return make_payload
+
+    # like _split_encoded, for items encoded ahead of time by encode_items()
+    def _split_items(self, items, sensor_id, limit):
+        envelope = EnvelopeEncoder(
+            send_time=self._get_time(),
+            sensor_id=sensor_id,
+            json_backend=self._options.JSON_BACKEND,
+        )
+        chunks = []
+        fragments, ids, size = [], [], envelope.envelope_size
+        for fragment, item_ids in items:
+            if fragments and size + envelope.separator_size + len(fragment) > limit:
+                chunks.append((fragments, ids))
+                fragments, ids, size = [], [], envelope.envelope_size
+            if fragments:
+                size += envelope.separator_size
+            fragments.append(fragment)
+            ids.extend(item_ids)
+            size += len(fragment)
+        if fragments:
+            chunks.append((fragments, ids))
+        return chunks
+
+    def get_data_encoder(self, described_objects=None):
+        return DataEncoder(
+            described_objects=described_objects,
+            thin_context=self._options.OPTIMIZE_SERIALIZATION,
+            thin_props=self._options.OPTIMIZE_SERIALIZATION,
+            json_backend=self._options.JSON_BACKEND,
+        )
+
+    # sends an envelope of data items encoded ahead of time, by an encoder from
+    # get_data_encoder(); ids are the ids the encoder collected for them
+    def send_encoded(
+        self, fragments=None, ids=None, sensor_id=None, debug=False, deadline=None
+    ):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        return self._post_encoded(fragments, ids, sensor_id, debug, expires)
+
+    # entities deduplicated across a payload depend on where its envelopes get
+    # split, so requestors that deduplicate encode only for themselves
+    def get_encoding_key(self):
+        if self._options.DEDUPLICATE_ENTITIES:
+            return None
+        return (self._options.OPTIMIZE_SERIALIZATION, self._options.JSON_BACKEND)
+
+    def send_items(self, items=None, sensor_id=None, debug=False, deadline=None):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        chunks = self._chunk_items(items, sensor_id, self._get_payload_limit(expires))
+        return self._post_chunks(chunks, sensor_id, debug, expires)
+
+    def _chunk_items(self, items, sensor_id, limit):
+        if limit is not None:
+            return self._split_items(items, sensor_id, limit)
+        return [([f for f, _ in items], [i for _, ids in items for i in ids])]
+
+    def _get_config_headers(self):
         hdrs = {}
         if self._options.get_auth_header_value():
             hdrs.update({"Authorization": self._options.get_auth_header_value()})
-        r = s.get(self._options.HOST, headers=hdrs)
+        return hdrs
+
+    def _get_config_response(self, expires=None):
+        hdrs = self._get_config_headers()
+        with self._connect(expires) as s:
+            return s.get(
+                self._options.HOST, headers=hdrs, timeout=self._get_timeout(expires)
+            )
+
+    @staticmethod
+    def _read_config(r):
         if r.status_code is requests.codes.ok:
             return r.json()
         else:
             return None
 
-    def describe(self, caliper_entity_list=None, sensor_id=None, debug=False):
+    def _request_config(self, expires=None):
+        return self._read_config(self._get_config_response(expires))
+
+    def _get_config(self):
+        try:
+            return self._request_config()
+        except requests.exceptions.Timeout:
+            self._record_timeout()
+            return None
+
+    def describe(
+        self, caliper_entity_list=None, sensor_id=None, debug=False, deadline=None
+    ):
         results, ids, response = self._dispatch(
-            caliper_objects=caliper_entity_list, sensor_id=sensor_id, debug=debug
+            caliper_objects=caliper_entity_list,
+            sensor_id=sensor_id,
+            debug=debug,
+            deadline=deadline,
         )
         return results, ids, response
 
     def get_config(self):
         return self._get_config()
 
+    def get_payload_limit(self):
+        return self._get_payload_limit()
+
+    # fetched from the endpoint on first use, and kept once the endpoint
+    # answers; one that answers without a valid config sets no limit. A fetch
+    # that fails (it times out, can't connect, or gets one of the
+    # RETRY_STATUS_CODES) leaves the limit unknown, and sends go unsplit until
+    # a later fetch succeeds; fetches after a failure wait out a backoff that
+    # doubles from RETRY_BACKOFF up to RETRY_BACKOFF_MAX
+    def _get_payload_limit(self, expires=None):
+        if not self._options.SPLIT_PAYLOADS:
+            return None
+        with self._config_lock:
+            if not (self._payload_limit_fetched or self._payload_limit_due()):
+                return None
+            if not self._payload_limit_fetched:
+                try:
+                    r = self._get_config_response(expires)
+                except requests.exceptions.RequestException:
+                    self._record_payload_limit_failure()
+                    return None
+                self._record_payload_limit_response(r)
+            return self._payload_limit
+
+    def _payload_limit_due(self):
+        retry_at = self._payload_limit_retry_at
+        return retry_at is None or time.monotonic() >= retry_at
+
+    def _record_payload_limit_failure(self):
+        backoff = min(
+            self._options.RETRY_BACKOFF * 2**self._payload_limit_failures,
+            self._options.RETRY_BACKOFF_MAX,
+        )
+        self._payload_limit_failures += 1
+        self._payload_limit_retry_at = time.monotonic() + backoff / 1000.0
+
+    def _record_payload_limit_response(self, r):
+        if r.status_code in self._options.RETRY_STATUS_CODES:
+            self._record_payload_limit_failure()
+            return
+        try:
+            cfg = self._read_config(r)
+        except ValueError:
+            cfg = None
+        self._payload_limit = self._read_payload_limit(cfg)
+        self._payload_limit_fetched = True
+
+    @staticmethod
+    def _read_payload_limit(cfg):
+        if not isinstance(cfg, dict):
+            return None
+        try:
+            limit = EndpointConfig(**cfg).caliper_maximum_payload_size
+        except (TypeError, ValueError):
+            return None
+        return limit if limit and limit > 0 else None
+
     def send(
         self,
         caliper_event_list=None,
         described_objects=None,
         sensor_id=None,
         debug=False,
+        deadline=None,
     ):
         results, ids, response = self._dispatch(
             caliper_objects=caliper_event_list,
             described_objects=described_objects,
             sensor_id=sensor_id,
             debug=debug,
+            deadline=deadline,
         )
         return results, ids, response
+
+
+# Requestor for asyncio applications: describe(), get_config(), send(),
+# send_encoded(), send_items() and aclose() are coroutines. It posts through an
+# aiohttp session, created on first use in the running event loop, that keeps
+# up to POOL_MAXSIZE connections to the endpoint; calls that find them all in
+# flight wait their turn, up to CONNECTION_REQUEST_TIMEOUT. Payloads get encoded,
+# compressed, split and retried as with HttpRequestor, and aiohttp's errors come
+# out as their requests.exceptions counterparts
+class AsyncHttpRequestor(HttpRequestor):
+    def __init__(self, options=None, **kwargs):
+        if aiohttp is None:
+            raise ValueError("AsyncHttpRequestor needs the aiohttp package")
+        HttpRequestor.__init__(self, options=options, **kwargs)
+        self._async_session = None
+        self._async_session_loop = None
+
+    # a session belongs to the event loop it was made in, so a requestor used
+    # from a new loop starts a new one, closing the old one first
+    def _get_async_session(self):
+        loop = asyncio.get_running_loop()
+        if self._async_session is None or self._async_session_loop is not loop:
+            self._release_async_session()
+            connector = aiohttp.TCPConnector(
+                limit=self._options.POOL_MAXSIZE,
+                force_close=not self._options.KEEP_ALIVE,
+            )
+            self._async_session = aiohttp.ClientSession(connector=connector)
+            self._async_session_loop = loop
+        return self._async_session
+
+    def _get_client_timeout(self, expires):
+        connect, read = self._get_timeout(expires)
+        wait = self._options.CONNECTION_REQUEST_TIMEOUT / 1000.0
+        return aiohttp.ClientTimeout(
+            total=self._time_left(expires),
+            connect=wait + connect,
+            sock_connect=connect,
+            sock_read=read,
+        )
+
+    async def _request_async(self, method, expires=None, **kwargs):
+        timeout = self._get_client_timeout(expires)
+        try:
+            async with self._get_async_session().request(
+                method, self._options.HOST, timeout=timeout, **kwargs
+            ) as r:
+                return _as_response(r, await r.read())
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except aiohttp.ClientConnectionError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+
+    # takes the aiohttp session off the requestor; it can only be closed in its
+    # own event loop, so this returns the coroutine that closes it when that is
+    # the running loop, and otherwise closes it there: scheduled, if that loop
+    # is running in another thread, or run to completion in a helper thread (a
+    # thread already running a loop can't run another), if it is idle. A closed
+    # loop has taken the session's connections with it
+    def _release_async_session(self):
+        s, loop = self._async_session, self._async_session_loop
+        self._async_session = self._async_session_loop = None
+        if s is None or loop.is_closed():
+            return None
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is running:
+            return s.close()
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(s.close(), loop)
+        else:
+            closer = threading.Thread(target=loop.run_until_complete, args=(s.close(),))
+            closer.start()
+            closer.join()
+        return None
+
+    async def aclose(self):
+        closing = self._release_async_session()
+        if closing is not None:
+            await closing
+        HttpRequestor.close(self)
+
+    # as aclose(), for callers outside a coroutine; called from within the
+    # session's loop, the session gets closed in a task
+    def close(self):
+        closing = self._release_async_session()
+        if closing is not None:
+            asyncio.ensure_future(closing)
+        HttpRequestor.close(self)
+
+    async def _post_payload_async(self, payload, expires=None):
+        data, hdrs = self._prepare_post(payload)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif not isinstance(data, bytes):
+            # an async iterable body makes aiohttp send with chunked transfer
+            # encoding
+            data = _iter_async(data)
+        return await self._request_async("POST", expires, data=data, headers=hdrs)
+
+    async def _post_with_retries_async(self, make_payload, expires=None):
+        attempt = 0
+        while True:
+            attempt += 1
+            payload, ids = make_payload()
+            r = error = None
+            try:
+                r = await self._post_payload_async(payload, expires)
+            except (requests.exceptions.Timeout,) + self._options.RETRY_EXCEPTIONS as e:
+                error = e
+            wait = self._get_retry_wait(attempt, r, error, expires)
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+        self._record_attempts(attempt)
+        if isinstance(error, requests.exceptions.Timeout):
+            self._record_timeout()
+            return None, ids
+        if error is not None:
+            raise error
+        return r, ids
+
+    async def _dispatch_async(
+        self,
+        caliper_objects=None,
+        described_objects=None,
+        sensor_id=None,
+        debug=False,
+        deadline=None,
+    ):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        if not isinstance(caliper_objects, MutableSequence):
+            return [], [], None
+        limit = await self._get_payload_limit_async(expires)
+        if limit is not None:
+            chunks = self._split_encoded(
+                caliper_objects, described_objects, sensor_id, limit
+            )
+            return await self._post_chunks_async(chunks, sensor_id, debug, expires)
+        make_payload = self._get_payload_maker(
+            caliper_objects, described_objects, sensor_id
+        )
+        r, ids = await self._post_with_retries_async(make_payload, expires)
+        return self._get_results(r, len(caliper_objects), ids, debug)
+
+    async def _post_chunks_async(self, chunks, sensor_id, debug, expires):
+        results = []
+        identifiers = []
+        response = None
+        for fragments, ids in chunks:
+            make_payload = self._get_encoded_payload_maker(fragments, ids, sensor_id)
+            r, ids = await self._post_with_retries_async(make_payload, expires)
+            r, i, resp = self._get_results(r, len(fragments), ids, debug)
+            if all(results):
+                response = resp
+            results.extend(r)
+            identifiers.extend(i)
+        return results, identifiers, response
+
+    async def send_encoded(
+        self, fragments=None, ids=None, sensor_id=None, debug=False, deadline=None
+    ):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        return await self._post_chunks_async(
+            [(fragments, ids)], sensor_id, debug, expires
+        )
+
+    async def send_items(self, items=None, sensor_id=None, debug=False, deadline=None):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        limit = await self._get_payload_limit_async(expires)
+        chunks = self._chunk_items(items, sensor_id, limit)
+        return await self._post_chunks_async(chunks, sensor_id, debug, expires)
+
+    async def _get_config_response_async(self, expires=None):
+        return await self._request_async(
+            "GET", expires, headers=self._get_config_headers()
+        )
+
+    async def _request_config_async(self, expires=None):
+        return self._read_config(await self._get_config_response_async(expires))
+
+    async def get_config(self):
+        try:
+            return await self._request_config_async()
+        except requests.exceptions.Timeout:
+            self._record_timeout()
+            return None
+
+    # as _get_payload_limit; calls that start before the first fetch finishes
+    # may each fetch the limit
+    async def _get_payload_limit_async(self, expires=None):
+        if not self._options.SPLIT_PAYLOADS:
+            return None
+        if not (self._payload_limit_fetched or self._payload_limit_due()):
+            return None
+        if not self._payload_limit_fetched:
+            try:
+                r = await self._get_config_response_async(expires)
+            except requests.exceptions.RequestException:
+                self._record_payload_limit_failure()
+                return None
+            self._record_payload_limit_response(r)
+        return self._payload_limit
+
+    async def describe(
+        self, caliper_entity_list=None, sensor_id=None, debug=False, deadline=None
+    ):
+        return await self._dispatch_async(
+            caliper_objects=caliper_entity_list,
+            sensor_id=sensor_id,
+            debug=debug,
+            deadline=deadline,
+        )
+
+    async def send(
+        self,
+        caliper_event_list=None,
+        described_objects=None,
+        sensor_id=None,
+        debug=False,
+        deadline=None,
+    ):
+        return await self._dispatch_async(
+            caliper_objects=caliper_event_list,
+            described_objects=described_objects,
+            sensor_id=sensor_id,
+            debug=debug,
+            deadline=deadline,
+        )
@@ -18,23 +18,130 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program. If not, see http://www.gnu.org/licenses/.
 
+import asyncio
+import concurrent.futures
+import threading
+import time
+
 from collections.abc import MutableSequence
 
 from caliper.base import (
+    VALIDATION_LEVELS,
     CaliperSerializable,
     Options,
     HttpOptions,
     deprecation,
     ensure_list_type,
+    get_validation_level,
+    validation_level,
 )
+from caliper.batching import BatchingQueue
+from caliper.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
 from caliper.entities import Entity
 from caliper.events import Event
-from caliper.request import EventStoreRequestor, HttpRequestor
+from caliper.request import AsyncHttpRequestor, EventStoreRequestor, HttpRequestor
 from caliper.util.stats import Statistics, SimpleStatistics
 
 
+# deadlines are in milliseconds; a sensor with several clients shares its call's
+# deadline between them, giving each the time left when its call starts
+def _get_expiry(deadline):
+    if deadline is None:
+        return None
+    return time.monotonic() + deadline / 1000.0
+
+
+def _get_time_left(expires):
+    if expires is None:
+        return None
+    return (expires - time.monotonic()) * 1000.0
+
+
+def _get_timeout(deadline):
+    if deadline is None:
+        return None
+    return max(deadline, 0) / 1000.0
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# the thread pool that sensors share to call their clients concurrently
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="caliper-sensor"
+            )
+        return _executor
+
+
+# Sensor.send_async() runs sends on a pool of its own, so that they never wait
+# on the pool they fan out to; it takes up to _SEND_BACKLOG sends at a time
+_SEND_WORKERS = 8
+_SEND_BACKLOG = 1024
+
+_send_executor = None
+_send_slots = threading.BoundedSemaphore(_SEND_BACKLOG)
+
+
+def _get_send_executor():
+    global _send_executor
+    with _executor_lock:
+        if _send_executor is None:
+            _send_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_SEND_WORKERS, thread_name_prefix="caliper-send"
+            )
+        return _send_executor
+
+
+# a future of call()'s result, run on the send pool once it has room; one that
+# finds no room within timeout seconds fails with a TimeoutError
+def _submit_send(call, timeout=None):
+    slots = _send_slots
+    if not slots.acquire(timeout=timeout):
+        future = concurrent.futures.Future()
+        future.set_exception(
+            concurrent.futures.TimeoutError("Timed out waiting to queue the send")
+        )
+        return future
+    try:
+        future = _get_send_executor().submit(call)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda f: slots.release())
+    return future
+
+
+def _add_callbacks(future, on_success=None, on_failure=None):
+    def done(f):
+        if f.cancelled():
+            return
+        error = f.exception()
+        if error is None:
+            if on_success is not None:
+                on_success(f.result())
+        elif on_failure is not None:
+            on_failure(error)
+
+    future.add_done_callback(done)
+
+
+# on_queue_depth(depth, capacity), if given, gets called as events go in and
+# out of the client's batch dispatch queue, from whichever thread moved them, so
+# that the application can shed load before the queue overflows
 class Client(object):
-    def __init__(self, config_options=None, requestor=None, stats=None, **kwargs):
+    def __init__(
+        self,
+        config_options=None,
+        requestor=None,
+        stats=None,
+        on_queue_depth=None,
+        **kwargs
+    ):
 
         self._debug = []
 
@@ -48,17 +155,167 @@ class Client(object):
         if requestor and not (isinstance(requestor, EventStoreRequestor)):
             raise TypeError("requestor must implement request.EventStoreRequestor")
         else:
-            self._requestor = HttpRequestor(options=self._config)
+            self._requestor = requestor or HttpRequestor(options=self._config)
 
         if stats and not (isinstance(stats, Statistics)):
             raise TypeError("stats must implement stats.Stats")
         else:
-            self._stats = Statistics()
+            self._stats = stats or Statistics()
+        self._requestor.stats = self._stats
+
+        self._queue = None
+        self._queue_lock = threading.Lock()
+        self._on_queue_depth = on_queue_depth
+
+        self._breaker = None
+        if self._config.CIRCUIT_BREAKER:
+            self._breaker = CircuitBreaker(
+                failure_rate=self._config.CIRCUIT_FAILURE_RATE,
+                min_calls=self._config.CIRCUIT_MIN_CALLS,
+                reset_timeout=self._config.CIRCUIT_RESET_TIMEOUT,
+                slow_call=self._config.CIRCUIT_SLOW_CALL,
+                window=self._config.CIRCUIT_WINDOW,
+                on_change=self._record_transition,
+            )
 
     def _reset(self):
         self._stats = Statistics()
+        self._requestor.stats = self._stats
         self._debug = []
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # with batch dispatch, sends everything queued before closing
+    def close(self):
+        if self._queue is not None:
+            self._queue.close()
+        self._requestor.close()
+
+    # with batch dispatch, sends everything queued so far, waiting up to deadline
+    # milliseconds (if given); returns whether it all went
+    def flush(self, deadline=None):
+        if self._queue is None:
+            return True
+        return self._queue.flush(timeout=_get_timeout(deadline))
+
+    def _get_queue(self):
+        with self._queue_lock:
+            if self._queue is None:
+                self._queue = BatchingQueue(
+                    requestor=self._requestor,
+                    options=self._config,
+                    on_sent=self._process_sent,
+                    on_dropped=self._process_dropped,
+                    on_depth=self._on_queue_depth,
+                )
+            return self._queue
+
+    # events queued for batch dispatch, and not yet sent
+    @property
+    def queue_depth(self):
+        if self._queue is None:
+            return 0
+        return self._queue.depth
+
+    # called from the batching queue's thread, after each envelope
+    def _process_sent(self, results, identifiers, debug, elapsed=None):
+        if self._breaker is not None:
+            self._breaker.record(all(results), elapsed)
+        self._process_results(results, self.stats.update_measures)
+        if self._config.DEBUG:
+            self.debug.append(debug)
+
+    # queued events the "drop_oldest" overflow policy dropped
+    def _process_dropped(self, count):
+        self._stats.update_dropped_oldest(count)
+        self._process_results(count * [False], self.stats.update_measures)
+
+    def _record_transition(self, old_state, new_state):
+        update = {
+            CLOSED: self._stats.update_circuit_closed,
+            HALF_OPEN: self._stats.update_circuit_half_opened,
+            OPEN: self._stats.update_circuit_opened,
+        }[new_state]
+        update(1)
+
+    # the circuit breaker's state ("closed", "open" or "half-open"), or None for
+    # a client without one
+    @property
+    def circuit_state(self):
+        if self._breaker is None:
+            return None
+        return self._breaker.state
+
+    # runs call(), which returns (results, identifiers, debug), past the circuit
+    # breaker; returns None when the breaker turns the call away
+    def _call_endpoint(self, call):
+        if self._breaker is None:
+            return call()
+        if not self._breaker.allow():
+            return None
+        start = time.monotonic()
+        try:
+            r = call()
+        except Exception:
+            self._breaker.record(False)
+            raise
+        self._breaker.record(all(r[0]), (time.monotonic() - start) * 1000.0)
+        return r
+
+    # what an open circuit turns away fails
+    def _reject(self, caliper_objects, update_func):
+        self._stats.update_circuit_rejected(len(caliper_objects))
+        self._process_results(len(caliper_objects) * [False], update_func)
+
+    # events go to the fallback first, and get spooled if the fallback and the
+    # requestor allow
+    def _reject_events(self, events, described_objects, sensor_id):
+        if self._config.CIRCUIT_FALLBACK == "spool":
+            self._requestor.spool(
+                caliper_event_list=events,
+                described_objects=described_objects,
+                sensor_id=sensor_id,
+            )
+        self._reject(events, self.stats.update_measures)
+
+    # events that find no room in the queue fail, though a requestor that spools
+    # may keep those that time out, or spill, to send later
+    def _queue_events(self, events, described_objects, sensor_id, deadline):
+        left_out = self._get_queue().put(
+            events,
+            described_objects=described_objects,
+            sensor_id=sensor_id,
+            timeout=_get_timeout(deadline),
+        )
+        if not left_out:
+            return
+        policy = self._config.BATCH_OVERFLOW
+        if policy == "block" and self._breaker is not None:
+            # events that waited out their deadline for room mean the endpoint
+            # can't keep up; as good as a failed call. The other policies shed
+            # events on purpose, whatever state the endpoint is in
+            self._breaker.record(False)
+        if policy in ("block", "spill"):
+            kept = self._requestor.spool(
+                caliper_event_list=left_out,
+                described_objects=described_objects,
+                sensor_id=sensor_id,
+            )
+        if policy == "block":
+            self._stats.update_timeouts(1)
+            self._stats.update_queue_timed_out(len(left_out))
+        elif policy == "spill":
+            self._stats.update_spilled(kept)
+        elif policy == "sample":
+            self._stats.update_sampled_out(len(left_out))
+        else:
+            self._stats.update_dropped_newest(len(left_out))
+        self._process_results(len(left_out) * [False], self.stats.update_measures)
+
     @property
     def config(self):
         return self._config
@@ -87,14 +344,22 @@ class Client(object):
                 self._stats.update_failed(1)
             update_func(1)
 
-    def describe(self, entities=None, sensor_id=None):
+    def describe(self, entities=None, sensor_id=None, deadline=None):
         identifiers = None
+        debug = None
         if ensure_list_type(entities, Entity):
-            results, identifiers, debug = self._requestor.describe(
-                caliper_entity_list=entities,
-                sensor_id=sensor_id,
-                debug=self._config.DEBUG,
+            r = self._call_endpoint(
+                lambda: self._requestor.describe(
+                    caliper_entity_list=entities,
+                    sensor_id=sensor_id,
+                    debug=self._config.DEBUG,
+                    deadline=deadline,
+                )
             )
+            if r is None:
+                self._reject(entities, self.stats.update_describes)
+                return []
+            results, identifiers, debug = r
             self._process_results(results, self.stats.update_describes)
         if self._config.DEBUG:
             self.debug.append(debug)
@@ -103,20 +368,180 @@ class Client(object):
     def get_config(self):
         return self._requestor.get_config()
 
-    def send(self, events=None, described_objects=None, sensor_id=None):
-        identifiers = None
-        if ensure_list_type(events, Event):
-            results, identifiers, debug = self._requestor.send(
+    # with batch dispatch, the events go in the client's queue, and the call
+    # returns None, as no identifiers have been sent yet
+    def send(self, events=None, described_objects=None, sensor_id=None, deadline=None):
+        ensure_list_type(events, Event)
+        return self._send_checked(events, described_objects, sensor_id, deadline)
+
+    # like send(), for events already checked, by it or by a sensor
+    def _send_checked(self, events, described_objects, sensor_id, deadline):
+        if self._config.BATCH_DISPATCH:
+            if self._breaker is not None and not self._breaker.allow():
+                self._reject_events(events, described_objects, sensor_id)
+            else:
+                self._queue_events(events, described_objects, sensor_id, deadline)
+            return None
+        return self._send_events(
+            events,
+            described_objects,
+            sensor_id,
+            lambda: self._requestor.send(
                 caliper_event_list=events,
                 described_objects=described_objects,
                 sensor_id=sensor_id,
                 debug=self._config.DEBUG,
+                deadline=deadline,
+            ),
+        )
+
+    # sends events by way of call(), which returns (results, identifiers, debug)
+    def _send_events(self, events, described_objects, sensor_id, call):
+        r = self._call_endpoint(call)
+        if r is None:
+            self._reject_events(events, described_objects, sensor_id)
+            return []
+        results, identifiers, debug = r
+        self._process_results(results, self.stats.update_measures)
+        if self._config.DEBUG:
+            self.debug.append(debug)
+        return identifiers
+
+    # clients with the same key can send the same encoded events; None for a
+    # client that has to encode its own, like one that queues them to batch
+    def _get_encoding_key(self):
+        if self._config.BATCH_DISPATCH:
+            return None
+        return self._requestor.get_encoding_key()
+
+    # like send(), for events a sensor has already checked and encoded into
+    # items, by the requestor of a client with the same encoding key
+    def _send_items(self, events, items, described_objects, sensor_id, deadline):
+        return self._send_events(
+            events,
+            described_objects,
+            sensor_id,
+            lambda: self._requestor.send_items(
+                items=items,
+                sensor_id=sensor_id,
+                debug=self._config.DEBUG,
+                deadline=deadline,
+            ),
+        )
+
+
+# Client for asyncio applications, sending through an AsyncHttpRequestor:
+# describe(), get_config(), send() and close() are coroutines. Its calls go past
+# the circuit breaker, if it has one, as a Client's do; it can't batch dispatch
+class AsyncClient(Client):
+    def __init__(self, config_options=None, requestor=None, stats=None, **kwargs):
+        if config_options is None:
+            config_options = HttpOptions()
+        if requestor is None:
+            requestor = AsyncHttpRequestor(options=config_options)
+        elif not (isinstance(requestor, AsyncHttpRequestor)):
+            raise TypeError("requestor must implement request.AsyncHttpRequestor")
+        if config_options.BATCH_DISPATCH:
+            raise ValueError("AsyncClient can't batch dispatch")
+        Client.__init__(
+            self,
+            config_options=config_options,
+            requestor=requestor,
+            stats=stats,
+            **kwargs
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._requestor.aclose()
+
+    async def _call_endpoint_async(self, call):
+        if self._breaker is None:
+            return await call()
+        if not self._breaker.allow():
+            return None
+        start = time.monotonic()
+        try:
+            r = await call()
+        except Exception:
+            self._breaker.record(False)
+            raise
+        self._breaker.record(all(r[0]), (time.monotonic() - start) * 1000.0)
+        return r
+
+    async def describe(self, entities=None, sensor_id=None, deadline=None):
+        identifiers = None
+        debug = None
+        if ensure_list_type(entities, Entity):
+            r = await self._call_endpoint_async(
+                lambda: self._requestor.describe(
+                    caliper_entity_list=entities,
+                    sensor_id=sensor_id,
+                    debug=self._config.DEBUG,
+                    deadline=deadline,
+                )
             )
-            self._process_results(results, self.stats.update_measures)
+            if r is None:
+                self._reject(entities, self.stats.update_describes)
+                return []
+            results, identifiers, debug = r
+            self._process_results(results, self.stats.update_describes)
         if self._config.DEBUG:
             self.debug.append(debug)
         return identifiers
 
+    async def get_config(self):
+        return await self._requestor.get_config()
+
+    async def send(
+        self, events=None, described_objects=None, sensor_id=None, deadline=None
+    ):
+        ensure_list_type(events, Event)
+        return await self._send_checked(events, described_objects, sensor_id, deadline)
+
+    async def _send_checked(self, events, described_objects, sensor_id, deadline):
+        return await self._send_events_async(
+            events,
+            described_objects,
+            sensor_id,
+            lambda: self._requestor.send(
+                caliper_event_list=events,
+                described_objects=described_objects,
+                sensor_id=sensor_id,
+                debug=self._config.DEBUG,
+                deadline=deadline,
+            ),
+        )
+
+    async def _send_events_async(self, events, described_objects, sensor_id, call):
+        r = await self._call_endpoint_async(call)
+        if r is None:
+            self._reject_events(events, described_objects, sensor_id)
+            return []
+        results, identifiers, debug = r
+        self._process_results(results, self.stats.update_measures)
+        if self._config.DEBUG:
+            self.debug.append(debug)
+        return identifiers
+
+    async def _send_items(self, events, items, described_objects, sensor_id, deadline):
+        return await self._send_events_async(
+            events,
+            described_objects,
+            sensor_id,
+            lambda: self._requestor.send_items(
+                items=items,
+                sensor_id=sensor_id,
+                debug=self._config.DEBUG,
+                deadline=deadline,
+            ),
+        )
+
 
 class SimpleSensor(object):
     def __init__(self, config_options=None, sensor_id=None):
@@ -129,6 +554,7 @@ class SimpleSensor(object):
         self._id = sensor_id
         self._requestor = HttpRequestor(options=self._config)
         self._stats = SimpleStatistics()
+        self._requestor.stats = self._stats
         self._status_code = None
         self._debug = []
 
@@ -139,10 +565,20 @@ class SimpleSensor(object):
 
     def _reset(self):
         self._stats = SimpleStatistics()
+        self._requestor.stats = self._stats
         self._status_code = None
         self._debug = []
 
-    def _dispatch(self, caliper_objects, sensor_id, described_objects):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._requestor.close()
+
+    def _dispatch(self, caliper_objects, sensor_id, described_objects, deadline=None):
         identifiers = []
         if ensure_list_type(caliper_objects, CaliperSerializable):
             results, identifiers, debug = self._requestor.send(
@@ -150,9 +586,11 @@ class SimpleSensor(object):
                 described_objects=described_objects,
                 sensor_id=sensor_id,
                 debug=True,
+                deadline=deadline,
             )
             self._process_results(results, self._stats.update_sent)
-            self._status_code = debug.status_code
+            # a call that timed out has no response
+            self._status_code = debug.status_code if debug is not None else None
             if self._config.DEBUG:
                 self._debug.append(debug)
         return identifiers
@@ -168,11 +606,11 @@ class SimpleSensor(object):
     def get_config(self):
         return self._requestor.get_config()
 
-    def send(self, caliper_objects, described_objects=None):
+    def send(self, caliper_objects, described_objects=None, deadline=None):
         v = caliper_objects
         if not isinstance(v, MutableSequence):
             v = [v]
-        identifiers = self._dispatch(v, self.id, described_objects)
+        identifiers = self._dispatch(v, self.id, described_objects, deadline=deadline)
         return identifiers
 
     @property
@@ -205,9 +643,11 @@ class SimpleSensor(object):
 
 
 class Sensor(object):
-    def __init__(self, sensor_id=None):
+    def __init__(self, sensor_id=None, client_timeout=None, validation_level=None):
         self._id = sensor_id
         self._clients = {}
+        self.client_timeout = client_timeout
+        self.validation_level = validation_level
 
     @staticmethod
     def fashion_default_sensor_with_client(client=None, sensor_id=None):
@@ -221,12 +661,91 @@ class Sensor(object):
     def fashion_sensor_with_config(config_options=None, sensor_id=None):
         if not (isinstance(config_options, HttpOptions)):
             raise TypeError("config_options must implement HttpOptions")
-        s = Sensor(sensor_id=sensor_id)
+        s = Sensor(
+            sensor_id=sensor_id, validation_level=config_options.VALIDATION_LEVEL
+        )
         s.register_client("default", Client(config_options=config_options))
         return s
 
-    def describe(self, entities=None, entity=None):
-        identifiers = {}
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # closes every registered client; they stay registered, and re-open their
+    # connections if used again
+    def close(self):
+        for client in self.client_registry.values():
+            client.close()
+
+    # sends everything the clients have queued, for those with batch dispatch
+    def flush(self, deadline=None):
+        expires = _get_expiry(deadline)
+        flushed = True
+        for client in self.client_registry.values():
+            flushed = client.flush(deadline=_get_time_left(expires)) and flushed
+        return flushed
+
+    # the most milliseconds any one client's send or describe may take, on top
+    # of the call's own deadline; None for no limit
+    @property
+    def client_timeout(self):
+        return self._client_timeout
+
+    @client_timeout.setter
+    def client_timeout(self, new_timeout):
+        if new_timeout is None:
+            self._client_timeout = None
+        elif int(new_timeout) >= 0:
+            self._client_timeout = int(new_timeout)
+        else:
+            raise ValueError("new timeout value must be at least 0 milliseconds")
+
+    # the validation level to build entities and events at, within validation();
+    # None for whatever level is in effect
+    @property
+    def validation_level(self):
+        return self._validation_level
+
+    @validation_level.setter
+    def validation_level(self, new_level):
+        if new_level is None or new_level in VALIDATION_LEVELS:
+            self._validation_level = new_level
+        else:
+            raise ValueError("Unknown validation level: {0}".format(new_level))
+
+    # scopes the sensor's validation level to a with block, for building the
+    # entities and events it sends
+    def validation(self):
+        return validation_level(self._validation_level or get_validation_level())
+
+    def _get_client_deadline(self, expires):
+        left = _get_time_left(expires)
+        if self._client_timeout is None:
+            return left
+        if left is None:
+            return self._client_timeout
+        return min(left, self._client_timeout)
+
+    # calls call(client, deadline) for every registered client, concurrently on
+    # the shared thread pool when there are several, and returns their results
+    # by client key once all are done; re-raises the first client's error, if
+    # any, after the others have finished
+    def _fan_out(self, call, deadline):
+        expires = _get_expiry(deadline)
+
+        def call_client(client):
+            return call(client, self._get_client_deadline(expires))
+
+        clients = list(self.client_registry.items())
+        if len(clients) < 2:
+            return {k: call_client(client) for k, client in clients}
+        futures = [(k, _get_executor().submit(call_client, c)) for k, c in clients]
+        concurrent.futures.wait([f for _, f in futures])
+        return {k: f.result() for k, f in futures}
+
+    def describe(self, entities=None, entity=None, deadline=None):
         v = entities
         if entity and not entities:
             deprecation(
@@ -235,9 +754,12 @@ class Sensor(object):
             v = entity
         if not isinstance(v, MutableSequence):
             v = [v]
-        for k, client in self.client_registry.items():
-            identifiers.update({k: client.describe(entities=v, sensor_id=self.id)})
-        return identifiers
+        return self._fan_out(
+            lambda client, left: client.describe(
+                entities=v, sensor_id=self.id, deadline=left
+            ),
+            deadline,
+        )
 
     def get_config(self):
         cfgs = {}
@@ -245,23 +767,66 @@ class Sensor(object):
             cfgs.update({k: client.get_config()})
         return cfgs
 
-    def send(self, events=None, event=None, described_objects=None):
-        identifiers = {}
+    # events, already checked, encoded once for each encoding key that several
+    # clients share, as {encoding_key: items}
+    def _encode_shared(self, events, described_objects):
+        groups = {}
+        for client in self.client_registry.values():
+            key = client._get_encoding_key()
+            if key is not None:
+                groups.setdefault(key, []).append(client)
+        shared = {}
+        for key, clients in groups.items():
+            if len(clients) > 1:
+                shared[key] = clients[0]._requestor.encode_items(
+                    caliper_objects=events, described_objects=described_objects
+                )
+        return shared
+
+    # clients that share serialization settings share the one encoding of the
+    # events, rather than each encoding them again
+    def send(self, events=None, event=None, described_objects=None, deadline=None):
         v = events
         if event and not events:
             deprecation("Sensor.send(event=e) deprecated; use Sensor.send(events=e).")
             v = event
         if not isinstance(v, MutableSequence):
             v = [v]
-        for k, client in self.client_registry.items():
-            identifiers.update(
-                {
-                    k: client.send(
-                        events=v, described_objects=described_objects, sensor_id=self.id
-                    )
-                }
-            )
-        return identifiers
+        ensure_list_type(v, Event)
+        shared = self._encode_shared(v, described_objects)
+
+        def send(client, left):
+            items = shared.get(client._get_encoding_key())
+            if items is None:
+                return client._send_checked(v, described_objects, self.id, left)
+            return client._send_items(v, items, described_objects, self.id, left)
+
+        return self._fan_out(send, deadline)
+
+    # sends in the background, and returns a concurrent.futures.Future of what
+    # send() returns; on_success(identifiers) or on_failure(exception) gets
+    # called once it's done, from the thread that finished it. Sends share a
+    # bounded pool: when it's full, the call waits for room, up to deadline, and
+    # the deadline covers both the wait and the send
+    def send_async(
+        self,
+        events=None,
+        described_objects=None,
+        deadline=None,
+        on_success=None,
+        on_failure=None,
+    ):
+        expires = _get_expiry(deadline)
+        future = _submit_send(
+            lambda: self.send(
+                events=events,
+                described_objects=described_objects,
+                deadline=_get_time_left(expires),
+            ),
+            timeout=_get_timeout(deadline),
+        )
+        _add_callbacks(future, on_success=on_success, on_failure=on_failure)
+        return future
 
     def describe_batch(self, entity_list=None):
         deprecation(
@@ -299,3 +864,113 @@ class Sensor(object):
     def unregister_client(self, key):
         if key in self._clients:
             del self._clients[key]
+
+
+# Sensor for asyncio applications, over AsyncClients: describe(), get_config(),
+# send() and aclose() are coroutines, and call the clients concurrently
+class AsyncSensor(Sensor):
+    @staticmethod
+    def fashion_default_sensor_with_client(client=None, sensor_id=None):
+        if not (isinstance(client, AsyncClient)):
+            raise TypeError("client must implement AsyncClient")
+        s = AsyncSensor(sensor_id=sensor_id)
+        s.register_client("default", client)
+        return s
+
+    @staticmethod
+    def fashion_sensor_with_config(config_options=None, sensor_id=None):
+        if not (isinstance(config_options, HttpOptions)):
+            raise TypeError("config_options must implement HttpOptions")
+        s = AsyncSensor(
+            sensor_id=sensor_id, validation_level=config_options.VALIDATION_LEVEL
+        )
+        s.register_client("default", AsyncClient(config_options=config_options))
+        return s
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        for client in self.client_registry.values():
+            await client.aclose()
+
+    # as Sensor._fan_out, with call(client, deadline) a coroutine function
+    async def _fan_out_async(self, call, deadline):
+        expires = _get_expiry(deadline)
+        clients = list(self.client_registry.items())
+        results = await asyncio.gather(
+            *(call(c, self._get_client_deadline(expires)) for _, c in clients),
+            return_exceptions=True,
+        )
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+        return {k: r for (k, _), r in zip(clients, results)}
+
+    async def describe(self, entities=None, deadline=None):
+        v = entities
+        if not isinstance(v, MutableSequence):
+            v = [v]
+        return await self._fan_out_async(
+            lambda client, left: client.describe(
+                entities=v, sensor_id=self.id, deadline=left
+            ),
+            deadline,
+        )
+
+    async def get_config(self):
+        return await self._fan_out_async(lambda client, left: client.get_config(), None)
+
+    async def send(self, events=None, described_objects=None, deadline=None):
+        v = events
+        if not isinstance(v, MutableSequence):
+            v = [v]
+        ensure_list_type(v, Event)
+        shared = self._encode_shared(v, described_objects)
+
+        def send(client, left):
+            items = shared.get(client._get_encoding_key())
+            if items is None:
+                return client._send_checked(v, described_objects, self.id, left)
+            return client._send_items(v, items, described_objects, self.id, left)
+
+        return await self._fan_out_async(send, deadline)
+
+    # as Sensor.send_async, but in the running event loop: sends in a task, and
+    # returns it, with the callbacks called from the loop once it is done
+    def send_async(
+        self,
+        events=None,
+        described_objects=None,
+        deadline=None,
+        on_success=None,
+        on_failure=None,
+    ):
+        loop = asyncio.get_running_loop()
+        task = loop.create_task(
+            self.send(
+                events=events, described_objects=described_objects, deadline=deadline
+            )
+        )
+        _add_callbacks(task, on_success=on_success, on_failure=on_failure)
+        return task
+
+    async def describe_batch(self, entity_list=None):
+        deprecation(
+            "Sensor.describe_batch(entity_list=e) deprecated; use Sensor.describe(entities=e)."
+        )
+        await self.describe(entities=entity_list)
+
+    async def send_batch(self, event_list=None, described_objects=None):
+        deprecation(
+            "Sensor.send_batch(event_list=e) deprecated; use Sensor.send(events=e)."
+        )
+        await self.send(events=event_list, described_objects=described_objects)
+
+    def register_client(self, key, client):
+        if not (isinstance(client, AsyncClient)):
+            raise TypeError("client must implement AsyncClient")
+        Sensor.register_client(self, key, client)
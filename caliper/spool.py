@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+# Caliper-python package, spool module
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import json
+import mmap
+import os
+import requests
+import struct
+import threading
+import time
+import zlib
+
+from collections.abc import MutableSequence
+
+from caliper.request import EnvelopeEncoder, EventStoreRequestor
+
+# each record in a segment file is its payload's length and CRC-32, then the
+# payload: a json header line, then the record's encoded data items, one per
+# line (the JSON backends never write raw newlines)
+_HEADER = struct.Struct("<II")
+_SEGMENT_SUFFIX = ".seg"
+_OFFSET_FILE = "offset"
+
+
+def _encode_record(sensor_id, fragments, ids):
+    head = json.dumps({"ids": list(ids), "sensor": sensor_id}, sort_keys=True)
+    payload = b"\n".join([head.encode("utf-8")] + list(fragments))
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_record(payload):
+    head, *fragments = payload.split(b"\n")
+    head = json.loads(head)
+    return head["sensor"], fragments, head["ids"]
+
+
+# yields (end, payload) for each intact record in buf, from position on; stops
+# at the end of buf, or at the first torn or corrupt record
+def _iter_records(buf, position=0):
+    size = len(buf)
+    while position + _HEADER.size <= size:
+        length, crc = _HEADER.unpack_from(buf, position)
+        start = position + _HEADER.size
+        end = start + length
+        if end > size:
+            return
+        payload = buf[start:end]
+        if zlib.crc32(payload) != crc:
+            return
+        yield end, payload
+        position = end
+
+
+# Write-ahead log of encoded envelopes, kept in a directory as numbered segment
+# files, plus an offset file recording how far replay has got. Appends go
+# straight to the OS, so they outlive the process crashing. There is no timer:
+# the append that comes sync_interval milliseconds or more after the last
+# fsync does the next one, as do moving on to a new segment and close(), so a
+# power loss can cost the records appended since the last fsync, however long
+# ago that was. The offset gets saved (atomically) by the replay progress that
+# comes sync_interval or more after the last save, and at the end of each
+# replay and on close(), so a crash can mean re-sending, but never skipping,
+# records. The segments use at most max_bytes of disk: appending beyond that
+# drops the oldest whole segments.
+class Spool(object):
+    def __init__(
+        self,
+        directory,
+        max_bytes=1073741824,
+        segment_size=16777216,
+        sync_interval=1000,
+    ):
+        if int(segment_size) < 1 or int(max_bytes) < int(segment_size):
+            raise ValueError(
+                "segment_size must be at least 1, and max_bytes at least segment_size"
+            )
+        if int(sync_interval) < 0:
+            raise ValueError("sync_interval must be at least 0 milliseconds")
+        self._directory = directory
+        self._max_bytes = int(max_bytes)
+        self._segment_size = int(segment_size)
+        self._sync_interval = int(sync_interval) / 1000.0
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._file = None
+        self._last_sync = self._last_save = time.monotonic()
+        self._dropped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {}
+        for name in os.listdir(directory):
+            if name.endswith(_SEGMENT_SUFFIX):
+                seq = int(name[: -len(_SEGMENT_SUFFIX)])
+                self._sizes[seq] = os.path.getsize(self._path(seq))
+        self._offset = self._read_offset()
+        self._recover()
+
+    # events dropped for want of disk space, or found corrupt
+    @property
+    def dropped(self):
+        return self._dropped
+
+    # whether any records wait to be replayed
+    @property
+    def pending(self):
+        with self._lock:
+            return bool(self._sizes) and self._offset < self._end()
+
+    # whether the record whose append() returned token has been replayed
+    def delivered(self, token):
+        with self._lock:
+            return token is not None and token <= self._offset
+
+    def _path(self, seq):
+        return os.path.join(self._directory, "{:020d}{}".format(seq, _SEGMENT_SUFFIX))
+
+    def _segments(self):
+        return sorted(self._sizes)
+
+    def _end(self):
+        last = self._segments()[-1]
+        return (last, self._sizes[last])
+
+    def _read_offset(self):
+        try:
+            with open(os.path.join(self._directory, _OFFSET_FILE)) as f:
+                seq, position = json.load(f)
+            return (int(seq), int(position))
+        except (OSError, TypeError, ValueError):
+            return (0, 0)
+
+    def _save_offset(self):
+        path = os.path.join(self._directory, _OFFSET_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(list(self._offset), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self._last_save = time.monotonic()
+
+    # drops segments already replayed, and cuts off a record torn by a crash
+    # part way through its append
+    def _recover(self):
+        for seq in self._segments():
+            if seq < self._offset[0]:
+                self._remove(seq)
+        segments = self._segments()
+        if not segments:
+            self._offset = (self._offset[0], 0)
+            return
+        last = segments[-1]
+        end = 0
+        if self._sizes[last]:
+            with open(self._path(last), "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for end, _ in _iter_records(mm):
+                        pass
+        if end < self._sizes[last]:
+            with open(self._path(last), "r+b") as f:
+                f.truncate(end)
+            self._sizes[last] = end
+        first = segments[0]
+        if self._offset[0] != first or self._offset[1] > self._sizes[first]:
+            self._offset = (first, 0)
+
+    def _remove(self, seq):
+        del self._sizes[seq]
+        os.remove(self._path(seq))
+
+    def _count_events(self, seq, position):
+        count = 0
+        with open(self._path(seq), "rb") as f:
+            if os.fstat(f.fileno()).st_size <= position:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for _, payload in _iter_records(mm, position):
+                    count += payload.count(b"\n")
+        return count
+
+    def _sync(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    # the segment to append size bytes to, rolling over to a new one when full
+    def _get_segment(self, size):
+        segments = self._segments()
+        seq = segments[-1] if segments else self._offset[0]
+        if (
+            segments
+            and self._sizes[seq]
+            and self._sizes[seq] + size > self._segment_size
+        ):
+            self._close_segment()
+            seq += 1
+        if self._file is None or seq not in self._sizes:
+            self._file = open(self._path(seq), "ab", buffering=0)
+            self._sizes.setdefault(seq, 0)
+        return seq
+
+    # drops the oldest segments, all but the one being written, until size more
+    # bytes fit; returns whether they do
+    def _make_room(self, size):
+        while sum(self._sizes.values()) + size > self._max_bytes:
+            segments = self._segments()
+            if len(segments) < 2:
+                return False
+            oldest = segments[0]
+            position = self._offset[1] if self._offset[0] == oldest else 0
+            self._dropped += self._count_events(oldest, position)
+            self._remove(oldest)
+            self._offset = max(self._offset, (segments[1], 0))
+            self._save_offset()
+        return True
+
+    # returns a token for delivered(), or None when the record can't fit
+    def append(self, sensor_id, fragments, ids):
+        record = _encode_record(sensor_id, fragments, ids)
+        with self._lock:
+            if len(record) > self._segment_size or not self._make_room(len(record)):
+                self._dropped += len(fragments)
+                return None
+            seq = self._get_segment(len(record))
+            self._file.write(record)
+            self._sizes[seq] += len(record)
+            if time.monotonic() - self._last_sync >= self._sync_interval:
+                self._sync()
+            return (seq, self._sizes[seq])
+
+    def _advance(self, seq, position):
+        with self._lock:
+            if (seq, position) > self._offset:
+                self._offset = (seq, position)
+                if time.monotonic() - self._last_save >= self._sync_interval:
+                    self._save_offset()
+
+    def _replay_segment(self, seq, position, size, send):
+        with open(self._path(seq), "rb") as f:
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                for end, payload in _iter_records(mm, position):
+                    if self._offset[0] != seq:
+                        # dropped for room while we were at it
+                        return True
+                    if not send(*_decode_record(payload)):
+                        return False
+                    self._advance(seq, end)
+                    position = end
+        if position < size:
+            # a corrupt record; nothing after it in the segment can be framed,
+            # so the rest of the segment counts as (at least) one lost event
+            with self._lock:
+                self._dropped += 1
+            self._advance(seq, size)
+        return True
+
+    # sends on the records in order, through send(sensor_id, fragments, ids),
+    # which returns whether it worked, until one fails; returns whether the
+    # spool is empty. Only one thread replays at a time; others return at once
+    def replay(self, send):
+        if not self._replay_lock.acquire(blocking=False):
+            return False
+        try:
+            while True:
+                with self._lock:
+                    if not self._sizes:
+                        return True
+                    seq, position = self._offset
+                    size = self._sizes.get(seq, 0)
+                    last = seq == self._segments()[-1]
+                    if position >= size:
+                        if last:
+                            return True
+                        # a segment replayed in full goes; the offset moves on
+                        # before it does, in case of a crash in between
+                        self._offset = (self._segments()[1], 0)
+                        self._save_offset()
+                        self._remove(seq)
+                        continue
+                if not self._replay_segment(seq, position, size, send):
+                    return False
+        finally:
+            with self._lock:
+                self._save_offset()
+            self._replay_lock.release()
+
+    def close(self):
+        with self._lock:
+            self._close_segment()
+            self._save_offset()
+
+
+# Requestor that wraps another, keeping the events it fails to deliver (or the
+# events a client's full queue turns away) in a Spool, and replaying them, in
+# order, ahead of later sends, once the endpoint takes them again; nothing
+# replays them in between, short of calling replay(). While the
+# spool holds anything, new events go through it too, so they keep their order;
+# their results say whether they got delivered during the call. Events are
+# spooled encoded, as the wrapped requestor's get_data_encoder() encodes them,
+# and replayed through its send_encoded(); re-sending an event is safe, as the
+# endpoint can tell it by its id. Entities go straight to the wrapped requestor.
+class SpoolingRequestor(EventStoreRequestor):
+    def __init__(
+        self,
+        requestor=None,
+        directory=None,
+        max_bytes=1073741824,
+        segment_size=16777216,
+        sync_interval=1000,
+    ):
+        if not isinstance(requestor, EventStoreRequestor):
+            raise TypeError("requestor must implement request.EventStoreRequestor")
+        self._requestor = requestor
+        self._spool = Spool(
+            directory,
+            max_bytes=max_bytes,
+            segment_size=segment_size,
+            sync_interval=sync_interval,
+        )
+        self._dropped = 0
+
+    @property
+    def stats(self):
+        return self._stats
+
+    @stats.setter
+    def stats(self, new_stats):
+        self._stats = new_stats
+        self._requestor.stats = new_stats
+
+    def close(self):
+        self._spool.close()
+        self._requestor.close()
+
+    def describe(
+        self, caliper_entity_list=None, sensor_id=None, debug=False, deadline=None
+    ):
+        return self._requestor.describe(
+            caliper_entity_list=caliper_entity_list,
+            sensor_id=sensor_id,
+            debug=debug,
+            deadline=deadline,
+        )
+
+    def get_config(self):
+        return self._requestor.get_config()
+
+    def get_payload_limit(self):
+        return self._requestor.get_payload_limit()
+
+    def get_data_encoder(self, described_objects=None):
+        return self._requestor.get_data_encoder(described_objects=described_objects)
+
+    def _record(self, spooled=0, replayed=0):
+        dropped = self._spool.dropped - self._dropped
+        self._dropped += dropped
+        if self._stats is not None:
+            if spooled:
+                self._stats.update_spooled(spooled)
+            if replayed:
+                self._stats.update_replayed(replayed)
+            if dropped:
+                self._stats.update_spool_dropped(dropped)
+
+    def _append(self, fragments, ids, sensor_id):
+        token = self._spool.append(sensor_id, fragments, ids)
+        self._record(spooled=len(fragments) if token else 0)
+        return token
+
+    # encodes the events into records that each fit in one payload
+    def _append_events(self, events, described_objects, sensor_id):
+        encoder = self.get_data_encoder(described_objects)
+        envelope = EnvelopeEncoder(
+            send_time=self._get_time(),
+            sensor_id=sensor_id,
+            json_backend=encoder.json_backend,
+        )
+        limit = self.get_payload_limit()
+        records = []
+        fragments, ids, size = [], [], envelope.envelope_size
+        for event in events:
+            n = len(encoder.ids)
+            fragment = encoder.encode_item(event)
+            if limit is not None and fragments:
+                if size + envelope.separator_size + len(fragment) > limit:
+                    records.append((fragments, ids))
+                    fragments, ids, size = [], [], envelope.envelope_size
+            if fragments:
+                size += envelope.separator_size
+            fragments.append(fragment)
+            ids.extend(encoder.ids[n:])
+            size += len(fragment)
+        if fragments:
+            records.append((fragments, ids))
+        return [(self._append(f, i, sensor_id), f, i) for f, i in records]
+
+    # sends on the spool's records, within deadline milliseconds (if given);
+    # returns whether the spool is now empty
+    def replay(self, deadline=None):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        return self._replay(expires)
+
+    def _replay(self, expires=None):
+        def send(sensor_id, fragments, ids):
+            left = None if expires is None else (expires - time.monotonic()) * 1000
+            if left is not None and left <= 0:
+                return False
+            try:
+                results, _, _ = self._requestor.send_encoded(
+                    fragments=fragments, ids=ids, sensor_id=sensor_id, deadline=left
+                )
+            except requests.exceptions.RequestException:
+                return False
+            if not (results and all(results)):
+                return False
+            self._record(replayed=len(fragments))
+            return True
+
+        return self._spool.replay(send)
+
+    # queues records behind the spool's backlog and replays it; the records'
+    # events succeed if they got through
+    def _send_spooled(self, records, expires):
+        self._replay(expires)
+        results, identifiers = [], []
+        for token, fragments, ids in records:
+            delivered = self._spool.delivered(token)
+            results.extend(len(fragments) * [delivered])
+            if delivered:
+                identifiers.extend(ids)
+        return results, identifiers, None
+
+    # spools events without trying to send them first; returns how many it kept
+    def spool(self, caliper_event_list=None, described_objects=None, sensor_id=None):
+        records = self._append_events(caliper_event_list, described_objects, sensor_id)
+        return sum(len(fragments) for token, fragments, _ in records if token)
+
+    def send_encoded(
+        self, fragments=None, ids=None, sensor_id=None, debug=False, deadline=None
+    ):
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        if self._spool.pending:
+            token = self._append(fragments, ids or (), sensor_id)
+            return self._send_spooled([(token, fragments, ids or ())], expires)
+        try:
+            results, identifiers, response = self._requestor.send_encoded(
+                fragments=fragments,
+                ids=ids,
+                sensor_id=sensor_id,
+                debug=debug,
+                deadline=deadline,
+            )
+        except requests.exceptions.RequestException:
+            results, identifiers, response = len(fragments) * [False], [], None
+        if not all(results):
+            self._append(fragments, ids or (), sensor_id)
+        return results, identifiers, response
+
+    def send(
+        self,
+        caliper_event_list=None,
+        described_objects=None,
+        sensor_id=None,
+        debug=False,
+        deadline=None,
+    ):
+        events = caliper_event_list
+        if not isinstance(events, MutableSequence) or not events:
+            return self._requestor.send(
+                caliper_event_list=events,
+                described_objects=described_objects,
+                sensor_id=sensor_id,
+                debug=debug,
+                deadline=deadline,
+            )
+        expires = None if deadline is None else time.monotonic() + deadline / 1000.0
+        if self._spool.pending:
+            records = self._append_events(events, described_objects, sensor_id)
+            return self._send_spooled(records, expires)
+        try:
+            results, identifiers, response = self._requestor.send(
+                caliper_event_list=events,
+                described_objects=described_objects,
+                sensor_id=sensor_id,
+                debug=debug,
+                deadline=deadline,
+            )
+        except requests.exceptions.RequestException:
+            results, identifiers, response = len(events) * [False], [], None
+        failed = [event for event, ok in zip(events, results) if not ok]
+        if failed:
+            self._append_events(failed, described_objects, sensor_id)
+        return results, identifiers, response
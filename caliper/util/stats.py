@@ -18,6 +18,8 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program. If not, see http://www.gnu.org/licenses/.
 
+import threading
+
 from math import sqrt
 
 
@@ -28,6 +30,8 @@ class Statistic(object):
     )
 
     def __init__(self):
+        # updates come from the fan-out, batching and async send threads
+        self._lock = threading.Lock()
         self._sum = 0.0
         self._count = 0
         self._last = 0.0
@@ -51,32 +55,34 @@ class Statistic(object):
             )
 
     def clear(self):
-        self._sum = 0.0
-        self._count = 0
-        self._last = 0.0
-        self._oldM = 0.0
-        self._newM = 0.0
-        self._oldS = 0.0
-        self._newS = 0.0
-        self._min = 0.0
-        self._max = 0.0
+        with self._lock:
+            self._sum = 0.0
+            self._count = 0
+            self._last = 0.0
+            self._oldM = 0.0
+            self._newM = 0.0
+            self._oldS = 0.0
+            self._newS = 0.0
+            self._min = 0.0
+            self._max = 0.0
 
     def update(self, val):
-        if not self._count:
-            self._count += 1
-            self._min = self._max = self._oldM = self._newM = val
-            self.oldS = 0.0
-        else:
-            self._count += 1
-            self._newM = self._oldM + ((val - self._oldM) / self._count)
-            self._newS = self._oldS + ((val - self._oldM) * (val * self._newM))
-            self._oldM = self._newM
-            self._oldS = self._newS
-
-        self._min = min(val, self._min)
-        self._max = max(val, self._max)
-        self._sum += val
-        self._last = val
+        with self._lock:
+            if not self._count:
+                self._count += 1
+                self._min = self._max = self._oldM = self._newM = val
+                self.oldS = 0.0
+            else:
+                self._count += 1
+                self._newM = self._oldM + ((val - self._oldM) / self._count)
+                self._newS = self._oldS + ((val - self._oldM) * (val * self._newM))
+                self._oldM = self._newM
+                self._oldS = self._newS
+
+            self._min = min(val, self._min)
+            self._max = max(val, self._max)
+            self._sum += val
+            self._last = val
 
     @property
     def sum(self):
@@ -118,7 +124,26 @@ class Statistic(object):
 
 
 class BaseStatistics(object):
-    _keys = {"SUCCESSFUL": "Successful", "FAILED": "Failed"}
+    _keys = {
+        "SUCCESSFUL": "Successful",
+        "FAILED": "Failed",
+        "COMPRESSION_RATIO": "Compression Ratio",
+        "COMPRESSION_TIME": "Compression Time",
+        "TIMEOUT": "Timeouts",
+        "ATTEMPT": "Attempts",
+        "SPOOLED": "Spooled",
+        "REPLAYED": "Replayed",
+        "SPOOL_DROPPED": "Spool Dropped",
+        "CIRCUIT_OPENED": "Circuit Opened",
+        "CIRCUIT_HALF_OPENED": "Circuit Half-Opened",
+        "CIRCUIT_CLOSED": "Circuit Closed",
+        "CIRCUIT_REJECTED": "Circuit Rejected",
+        "QUEUE_TIMED_OUT": "Queue Timed Out",
+        "DROPPED_NEWEST": "Dropped Newest",
+        "DROPPED_OLDEST": "Dropped Oldest",
+        "SPILLED": "Spilled",
+        "SAMPLED_OUT": "Sampled Out",
+    }
 
     def __init__(self):
         self._map = {}
@@ -153,9 +178,138 @@ class BaseStatistics(object):
     def update_failed(self, val):
         self._map[self._keys["FAILED"]].update(val)
 
+    # uncompressed size over compressed size, one update per compressed payload
+    @property
+    def compression_ratio(self):
+        return self._map[self._keys["COMPRESSION_RATIO"]]
+
+    def update_compression_ratio(self, val):
+        self._map[self._keys["COMPRESSION_RATIO"]].update(val)
+
+    # CPU time spent compressing, in milliseconds, per compressed payload
+    @property
+    def compression_time(self):
+        return self._map[self._keys["COMPRESSION_TIME"]]
+
+    def update_compression_time(self, val):
+        self._map[self._keys["COMPRESSION_TIME"]].update(val)
+
+    # calls that timed out, whether connecting, reading, waiting for a pooled
+    # connection, or against their deadline
+    @property
+    def timeouts(self):
+        return self._map[self._keys["TIMEOUT"]]
+
+    def update_timeouts(self, val):
+        self._map[self._keys["TIMEOUT"]].update(val)
+
+    # HTTP requests it took to post each payload, retries included
+    @property
+    def attempts(self):
+        return self._map[self._keys["ATTEMPT"]]
+
+    def update_attempts(self, val):
+        self._map[self._keys["ATTEMPT"]].update(val)
+
+    # events written to a spool.SpoolingRequestor's spool, per write
+    @property
+    def spooled(self):
+        return self._map[self._keys["SPOOLED"]]
+
+    def update_spooled(self, val):
+        self._map[self._keys["SPOOLED"]].update(val)
+
+    # events delivered from the spool, per envelope
+    @property
+    def replayed(self):
+        return self._map[self._keys["REPLAYED"]]
+
+    def update_replayed(self, val):
+        self._map[self._keys["REPLAYED"]].update(val)
+
+    # spooled events lost to the spool's disk limit, or to corruption
+    @property
+    def spool_dropped(self):
+        return self._map[self._keys["SPOOL_DROPPED"]]
+
+    def update_spool_dropped(self, val):
+        self._map[self._keys["SPOOL_DROPPED"]].update(val)
+
+    # circuit breaker transitions, one update each, into the open, half-open
+    # and closed states
+    @property
+    def circuit_opened(self):
+        return self._map[self._keys["CIRCUIT_OPENED"]]
+
+    def update_circuit_opened(self, val):
+        self._map[self._keys["CIRCUIT_OPENED"]].update(val)
+
+    @property
+    def circuit_half_opened(self):
+        return self._map[self._keys["CIRCUIT_HALF_OPENED"]]
+
+    def update_circuit_half_opened(self, val):
+        self._map[self._keys["CIRCUIT_HALF_OPENED"]].update(val)
+
+    @property
+    def circuit_closed(self):
+        return self._map[self._keys["CIRCUIT_CLOSED"]]
+
+    def update_circuit_closed(self, val):
+        self._map[self._keys["CIRCUIT_CLOSED"]].update(val)
+
+    # events (or entities) an open circuit breaker sent to the fallback
+    @property
+    def circuit_rejected(self):
+        return self._map[self._keys["CIRCUIT_REJECTED"]]
+
+    def update_circuit_rejected(self, val):
+        self._map[self._keys["CIRCUIT_REJECTED"]].update(val)
+
+    # events a full batching queue turned away, by overflow policy: "block"
+    # ones that found no room before their deadline, ...
+    @property
+    def queue_timed_out(self):
+        return self._map[self._keys["QUEUE_TIMED_OUT"]]
+
+    def update_queue_timed_out(self, val):
+        self._map[self._keys["QUEUE_TIMED_OUT"]].update(val)
+
+    # ... "drop_newest" ones dropped on the way in, ...
+    @property
+    def dropped_newest(self):
+        return self._map[self._keys["DROPPED_NEWEST"]]
+
+    def update_dropped_newest(self, val):
+        self._map[self._keys["DROPPED_NEWEST"]].update(val)
+
+    # ... queued ones "drop_oldest" dropped to make room, ...
+    @property
+    def dropped_oldest(self):
+        return self._map[self._keys["DROPPED_OLDEST"]]
+
+    def update_dropped_oldest(self, val):
+        self._map[self._keys["DROPPED_OLDEST"]].update(val)
+
+    # ... "spill" ones kept in the spool instead, ...
+    @property
+    def spilled(self):
+        return self._map[self._keys["SPILLED"]]
+
+    def update_spilled(self, val):
+        self._map[self._keys["SPILLED"]].update(val)
+
+    # ... and "sample" ones left out
+    @property
+    def sampled_out(self):
+        return self._map[self._keys["SAMPLED_OUT"]]
+
+    def update_sampled_out(self, val):
+        self._map[self._keys["SAMPLED_OUT"]].update(val)
+
 
 class SimpleStatistics(BaseStatistics):
-    _keys = {"SENT": "Sent", "SUCCESSFUL": "Successful", "FAILED": "Failed"}
+    _keys = dict({"SENT": "Sent"}, **BaseStatistics._keys)
 
     def __init__(self):
         BaseStatistics.__init__(self)
@@ -169,12 +323,7 @@ class SimpleStatistics(BaseStatistics):
 
 
 class Statistics(BaseStatistics):
-    _keys = {
-        "MEASURE": "Measure",
-        "DESCRIBE": "Describe",
-        "SUCCESSFUL": "Successful",
-        "FAILED": "Failed",
-    }
+    _keys = dict({"MEASURE": "Measure", "DESCRIBE": "Describe"}, **BaseStatistics._keys)
 
     def __init__(self):
         BaseStatistics.__init__(self)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Caliper-python package, util/zdict module
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+"""
+Train a preset zlib dictionary from a sample of your own Caliper traffic, one
+envelope or event json-string per line (NDJSON):
+
+    python -m caliper.util.zdict traffic.ndjson -o caliper.zdict
+
+Use the result on both sides: as the sensor's
+``HttpOptions(compression="deflate", compression_dictionary=...)``, and as the
+``zdict`` the endpoint passes to ``caliper.compression.decompress()``.
+"""
+
+import argparse
+import json
+import sys
+
+from collections import Counter
+from collections.abc import MutableSequence, MutableMapping
+
+from caliper.compression import CALIPER_ZDICT, MAX_ZDICT_SIZE, build_zdict
+
+# a deflate match costs about this many bytes, so shorter fragments don't pay
+_MATCH_COST = 3
+
+
+# the fragments of a parsed json value worth having in a dictionary: quoted
+# keys (with the default as_json() separator), quoted string values, and the
+# leading path segments of string values like IRIs, which share prefixes
+def _fragments(v):
+    if isinstance(v, MutableMapping):
+        for k, i in v.items():
+            yield "{0}: ".format(json.dumps(k))
+            yield from _fragments(i)
+    elif isinstance(v, MutableSequence):
+        for i in v:
+            yield from _fragments(i)
+    elif isinstance(v, str):
+        s = json.dumps(v)
+        yield s
+        i = s.find("/", s.find("//") + 2 if "//" in s else 0)
+        while 0 < i < len(s) - 2:
+            yield s[: i + 1]
+            i = s.find("/", i + 1)
+
+
+def train_zdict(samples, size=MAX_ZDICT_SIZE, min_count=2, base=CALIPER_ZDICT):
+    # a fragment scores the number of samples it appears in, times the bytes
+    # that a match on it saves
+    samples_seen = 0
+    counts = Counter()
+    for sample in samples:
+        if isinstance(sample, bytes):
+            sample = sample.decode("utf-8")
+        if not sample.strip():
+            continue
+        samples_seen += 1
+        counts.update(set(_fragments(json.loads(sample))))
+    if not samples_seen:
+        raise ValueError("No samples to train a dictionary from")
+
+    ranked = sorted(
+        (
+            (count * (len(f) - _MATCH_COST), f)
+            for f, count in counts.items()
+            if count >= min_count and len(f) > _MATCH_COST
+        ),
+        reverse=True,
+    )
+
+    # greedily take the best fragments, skipping those already covered by a
+    # better one; fragments never hold raw newlines, so a newline-separated
+    # blob is enough for the containment check
+    chosen = []
+    blob = "\n"
+    remaining = size
+    for _, f in ranked:
+        if remaining <= 0:
+            break
+        if f in blob:
+            continue
+        chosen.append(f)
+        blob += f + "\n"
+        remaining -= len(f.encode("utf-8"))
+
+    r = build_zdict(reversed(chosen), size=size)
+    room = size - len(r)
+    if base and room > 0:
+        # keep the most valuable end of the base dictionary, ahead of the
+        # (more valuable) trained fragments
+        r = base[-room:] + r
+    return r
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Train a preset zlib dictionary from NDJSON Caliper traffic."
+    )
+    parser.add_argument("sample", help="NDJSON file, one payload per line; - for stdin")
+    parser.add_argument("-o", "--output", help="dictionary file to write")
+    parser.add_argument("--size", type=int, default=MAX_ZDICT_SIZE)
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument(
+        "--no-base",
+        action="store_true",
+        help="leave out the built-in Caliper vocabulary dictionary",
+    )
+    args = parser.parse_args(argv)
+
+    if args.sample == "-":
+        lines = sys.stdin.buffer.readlines()
+    else:
+        with open(args.sample, "rb") as f:
+            lines = f.readlines()
+    try:
+        zdict = train_zdict(
+            lines,
+            size=args.size,
+            min_count=args.min_count,
+            base=None if args.no_base else CALIPER_ZDICT,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(zdict)
+    else:
+        sys.stdout.buffer.write(zdict)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -51,7 +51,12 @@ setup(
     packages=_packages,
     python_requires=">=3",
     install_requires=_install_requirements,
-    extras_require={"dev": _test_requirements, "test": _test_requirements},
+    extras_require={
+        "aiohttp": ["aiohttp"],
+        "dev": _test_requirements,
+        "orjson": ["orjson"],
+        "test": _test_requirements,
+    },
     project_urls={
         "Homepage": "https://www.imsglobal.org/activity/caliper",
         "Source": "https://github.com/IMSGlobal/caliper-python",
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing the asyncio sensor)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+from . import util
+
+
+@unittest.skipIf(util.caliper.request.aiohttp is None, "aiohttp not installed")
+class TestAsyncSensor(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(3)
+
+    def _options(self, url, **kwargs):
+        return util.caliper.base.HttpOptions(host=url, **kwargs)
+
+    def _run(self, closing, call):
+        async def run():
+            async with closing:
+                return await call()
+
+        return asyncio.run(run())
+
+    def _sensor(self, urls, **kwargs):
+        sensor = util.caliper.sensor.AsyncSensor(sensor_id=util._SENSOR_ID)
+        for i, url in enumerate(urls):
+            sensor.register_client(
+                "client{}".format(i),
+                util.caliper.sensor.AsyncClient(
+                    config_options=self._options(url, **kwargs)
+                ),
+            )
+        return sensor
+
+    def testSendAndDescribe(self):
+        async def run(sensor):
+            async with sensor:
+                sent = await sensor.send(self.events)
+                described = await sensor.describe(util.build_sample_entities()["actor"])
+                return sent, described
+
+        with util.LocalEndpoint() as endpoint:
+            sensor = util.caliper.build_async_sensor_from_config(
+                config_options=self._options(endpoint.url, debug=True),
+                sensor_id=util._SENSOR_ID,
+            )
+            sent, described = asyncio.run(run(sensor))
+        for event in self.events:
+            self.assertIn(event.id, sent["default"])
+        self.assertTrue(described["default"])
+        client = sensor.client_registry["default"]
+        self.assertEqual(client.stats.measures.count, 3)
+        self.assertEqual(client.stats.describes.count, 1)
+        self.assertEqual(client.stats.successful.count, 4)
+        self.assertEqual(client.debug[0].status_code, 201)
+        data = json.loads(endpoint.received[0][2])["data"]
+        self.assertEqual([e["id"] for e in data], [e.id for e in self.events])
+
+    def testGetConfig(self):
+        config = {"caliper_maximum_payload_size": 2048}
+        with util.LocalEndpoint(config=config) as endpoint:
+            sensor = self._sensor([endpoint.url])
+            self.assertEqual(self._run(sensor, sensor.get_config), {"client0": config})
+
+    def testClientsCalledConcurrently(self):
+        delay = 0.3
+
+        def respond(body):
+            time.sleep(delay)
+            return 201
+
+        async def run(sensor):
+            async with sensor:
+                start = time.monotonic()
+                identifiers = await sensor.send(self.events)
+                return identifiers, time.monotonic() - start
+
+        with util.LocalEndpoint(respond=respond) as first:
+            with util.LocalEndpoint(respond=respond) as second:
+                sensor = self._sensor([first.url, second.url])
+                identifiers, elapsed = asyncio.run(run(sensor))
+        self.assertLess(elapsed, 2 * delay)
+        self.assertEqual(list(identifiers), ["client0", "client1"])
+        self.assertEqual(identifiers["client0"], identifiers["client1"])
+
+    def testInFlightBounded(self):
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def respond(body):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return 201
+
+        async def run(client):
+            async with client:
+                await asyncio.gather(
+                    *(
+                        client.send(self.events[:1], sensor_id=util._SENSOR_ID)
+                        for i in range(8)
+                    )
+                )
+
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            client = util.caliper.sensor.AsyncClient(
+                config_options=self._options(endpoint.url, pool_maxsize=2)
+            )
+            asyncio.run(run(client))
+        self.assertEqual(len(endpoint.received), 8)
+        self.assertLessEqual(in_flight[1], 2)
+        # connections get reused
+        self.assertLessEqual(len(endpoint.client_addresses), 2)
+        self.assertEqual(client.stats.successful.count, 8)
+
+    def testRetriesAndDeadline(self):
+        statuses = [503, 201]
+
+        def respond(body):
+            if statuses:
+                return statuses.pop(0)
+            time.sleep(0.5)
+            return 201
+
+        async def run(client):
+            async with client:
+                first = await client.send(self.events, sensor_id=util._SENSOR_ID)
+                second = await client.send(
+                    self.events, sensor_id=util._SENSOR_ID, deadline=100
+                )
+                return first, second
+
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            client = util.caliper.sensor.AsyncClient(
+                config_options=self._options(endpoint.url, retry_backoff=1)
+            )
+            first, second = asyncio.run(run(client))
+        self.assertTrue(first)
+        self.assertEqual(second, [])
+        self.assertEqual(client.stats.attempts.sum, 3)
+        self.assertEqual(client.stats.timeouts.count, 1)
+        self.assertEqual(client.stats.successful.count, 3)
+        self.assertEqual(client.stats.failed.count, 3)
+
+    def testConnectionError(self):
+        with util.LocalEndpoint() as endpoint:
+            url = endpoint.url
+        client = util.caliper.sensor.AsyncClient(
+            config_options=self._options(url, retry_attempts=1)
+        )
+        with self.assertRaises(util.caliper.request.requests.ConnectionError):
+            self._run(
+                client, lambda: client.send(self.events, sensor_id=util._SENSOR_ID)
+            )
+
+    def testSplitsToEndpointLimit(self):
+        config = {
+            "caliper_maximum_payload_size": 2048,
+            "caliper_supported_versions": [util.caliper.constants.CALIPER_CORE_CONTEXT],
+        }
+        events = util.build_sample_events(10)
+        with util.LocalEndpoint(config=config) as endpoint:
+            sensor = self._sensor([endpoint.url, endpoint.url], split_payloads=True)
+            identifiers = self._run(sensor, lambda: sensor.send(events))
+        self.assertGreater(len(endpoint.received), 2)
+        for _, _, body in endpoint.received:
+            self.assertLessEqual(len(body), 2048)
+        for event in events:
+            self.assertIn(event.id, identifiers["client1"])
+
+    def testBatchAndSendAsync(self):
+        successes = []
+
+        async def run(sensor):
+            async with sensor:
+                await sensor.send_batch(event_list=self.events[:1])
+                await sensor.describe_batch(
+                    entity_list=[util.build_sample_entities()["actor"]]
+                )
+                task = sensor.send_async(self.events[1:], on_success=successes.append)
+                sent = await task
+                await asyncio.sleep(0)
+                return sent
+
+        with util.LocalEndpoint() as endpoint:
+            sensor = self._sensor([endpoint.url])
+            sent = asyncio.run(run(sensor))
+        self.assertEqual(len(endpoint.received), 3)
+        self.assertEqual(successes, [sent])
+        for event in self.events[1:]:
+            self.assertIn(event.id, sent["client0"])
+
+    def testCloseKeepsSyncForm(self):
+        with util.LocalEndpoint() as endpoint:
+            sensor = self._sensor([endpoint.url])
+            requestor = sensor.client_registry["client0"]._requestor
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(sensor.send(self.events))
+                session = requestor._async_session
+                self.assertFalse(session.closed)
+                sensor.close()
+                self.assertTrue(session.closed)
+                self.assertIsNone(requestor._async_session)
+            finally:
+                loop.close()
+
+    def testNewLoopClosesOldSession(self):
+        with util.LocalEndpoint() as endpoint:
+            sensor = self._sensor([endpoint.url])
+            requestor = sensor.client_registry["client0"]._requestor
+            first = asyncio.new_event_loop()
+            try:
+                first.run_until_complete(sensor.send(self.events))
+                session = requestor._async_session
+                self._run(sensor, lambda: sensor.send(self.events))
+                self.assertTrue(session.closed)
+            finally:
+                first.close()
+
+    def testRejectsSyncParts(self):
+        options = util.get_testing_options()
+        with self.assertRaises(TypeError):
+            util.caliper.sensor.AsyncClient(
+                config_options=options,
+                requestor=util.caliper.request.HttpRequestor(options=options),
+            )
+        with self.assertRaises(TypeError):
+            util.caliper.sensor.AsyncSensor().register_client(
+                "default", util.caliper.sensor.Client(config_options=options)
+            )
+        with self.assertRaises(ValueError):
+            util.caliper.sensor.AsyncClient(
+                config_options=util.caliper.base.HttpOptions(batch_dispatch=True)
+            )
@@ -0,0 +1,582 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing base serialization behaviour)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import json
+import math
+import pickle
+import random
+import re
+import threading
+import unittest
+import weakref
+
+import aniso8601
+
+from . import util
+
+
+class TestCaliperSerialization(unittest.TestCase):
+    def setUp(self):
+        self.event = util.build_sample_event()
+        self.envelope = util.build_sample_envelope(3)
+
+    def tearDown(self):
+        pass
+
+    def testCopyFreeDictMatchesCopiedDict(self):
+        for thin in (True, False):
+            self.assertEqual(
+                self.event.as_dict(thin_context=thin, thin_props=thin),
+                self.event.as_dict(thin_context=thin, thin_props=thin, deep_copy=False),
+            )
+            self.assertEqual(
+                self.envelope.as_dict(thin_context=thin, thin_props=thin),
+                self.envelope.as_dict(
+                    thin_context=thin, thin_props=thin, deep_copy=False
+                ),
+            )
+
+    def testCopiedDictIsIndependent(self):
+        d = self.event.as_dict()
+        d["object"]["extensions"]["pages"].append(4)
+        self.assertEqual(self.event.object.extensions["pages"], [1, 2, 3])
+
+    def testCopyFreeDictSharesValues(self):
+        d = self.event.as_dict(deep_copy=False)
+        self.assertIs(d["object"]["extensions"], self.event.object.extensions)
+
+    def testJsonMatchesDict(self):
+        self.assertEqual(
+            self.envelope.as_json(thin_context=True, thin_props=True),
+            json.dumps(
+                self.envelope.as_dict(thin_context=True, thin_props=True),
+                sort_keys=True,
+            ),
+        )
+
+    def testThinContextOnlyAtTopLevel(self):
+        d = self.envelope.as_dict(thin_context=True, thin_props=True)
+        for event in d["data"]:
+            self.assertIn("@context", event)
+            self.assertNotIn("@context", event["actor"])
+            self.assertNotIn("@context", event["object"])
+
+    def testCollectedIdsMatchScannedIds(self):
+        for thin in (True, False):
+            for described in (None, [util.build_sample_entities()["edApp"].id]):
+                payload, ids = self.envelope.as_json_with_ids(
+                    described_objects=described, thin_context=thin, thin_props=thin
+                )
+                self.assertEqual(util.scan_ids(payload), ids)
+
+    def testCollectedIdsSkipExtensions(self):
+        event = util.build_sample_event(extensions={"id": "https://example.edu/x"})
+        _, ids = event.as_json_with_ids()
+        self.assertNotIn("https://example.edu/x", ids)
+        self.assertIn(event.id, ids)
+        self.assertIn(event.actor.id, ids)
+
+
+class TestJsonBackends(unittest.TestCase):
+    def setUp(self):
+        self.envelope = util.build_sample_envelope(3)
+        self.envelope.data[0].object.extensions.update(
+            {"score": 0.75, "rank": 10.0, "title": "Café — 日本"}
+        )
+
+    def tearDown(self):
+        pass
+
+    def testStdlibCanonicalForm(self):
+        d = self.envelope.as_dict(thin_context=True, thin_props=True)
+        self.assertEqual(
+            self.envelope.as_json(
+                thin_context=True, thin_props=True, json_backend="json"
+            ),
+            json.dumps(d, sort_keys=True, separators=(",", ":"), ensure_ascii=False),
+        )
+
+    def testDefaultFormatUnchanged(self):
+        d = self.envelope.as_dict(thin_context=True, thin_props=True)
+        self.assertEqual(
+            self.envelope.as_json(thin_context=True, thin_props=True),
+            json.dumps(d, sort_keys=True),
+        )
+
+    @unittest.skipIf(util.caliper.base.orjson is None, "orjson not installed")
+    def testBackendsByteIdentical(self):
+        std = util.caliper.base.get_json_backend("json")
+        fast = util.caliper.base.get_json_backend("orjson")
+        values = [
+            self.envelope.as_dict(thin_context=True, thin_props=True),
+            {"b": [1e16, 1e-07, 0.00001, -1e-05, 1e-10, 0.1, -0.0], "a": "1e16"},
+            {"big": 2**70, "ctl": '\x00\x1f\x7f "\\/'},
+            {"none": None, "b": [1.5, {"c": (float("inf"), -float("inf"))}]},
+        ]
+        for v in values:
+            self.assertEqual(std.dumpb(v), fast.dumpb(v))
+            self.assertEqual(std.loads(fast.dumpb(v)), fast.loads(std.dumpb(v)))
+        nan = fast.loads(fast.dumpb({"a": float("nan"), "b": None}))
+        self.assertTrue(math.isnan(nan["a"]))
+        self.assertIsNone(nan["b"])
+        with self.assertRaises(ValueError):
+            fast.loads(b"{")
+
+    def testGetJsonBackend(self):
+        backend = util.caliper.base.get_json_backend("auto")
+        self.assertIs(util.caliper.base.get_json_backend(backend), backend)
+        with self.assertRaises(ValueError):
+            util.caliper.base.get_json_backend("simplejson")
+        with self.assertRaises(ValueError):
+            util.caliper.base.HttpOptions(json_backend="simplejson")
+
+
+class TestSerializationCache(unittest.TestCase):
+    def setUp(self):
+        self.entities = util.build_sample_entities()
+        self.envelope = util.build_sample_envelope(5, entities=self.entities)
+        util.caliper.base.clear_serialization_cache_info()
+
+    def tearDown(self):
+        util.caliper.base.clear_serialization_cache_info()
+
+    def testSharedEntitiesHitCache(self):
+        first = self.envelope.as_json(thin_context=True, thin_props=True)
+        info = util.caliper.base.serialization_cache_info()
+        # each of the four shared entities misses once, then hits for every
+        # following event
+        self.assertEqual(info.hits, 4 * 4)
+        self.assertEqual(
+            self.envelope.as_json(thin_context=True, thin_props=True), first
+        )
+        self.assertGreater(util.caliper.base.serialization_cache_info().hits, 16)
+
+    def testDescribedObjectsBypassCache(self):
+        described = [self.entities["actor"].id]
+        self.envelope.as_json(described_objects=described)
+        self.assertEqual(
+            util.caliper.base.serialization_cache_info(),
+            util.caliper.base.SerializationCacheInfo(0, 0),
+        )
+
+    def testSetterInvalidatesCache(self):
+        session = self.entities["session"]
+        self.envelope.as_json()
+        session.endedAtTime = "2016-11-15T11:05:00.000Z"
+        for event in self.envelope.as_dict()["data"]:
+            self.assertEqual(
+                event["session"]["endedAtTime"], "2016-11-15T11:05:00.000Z"
+            )
+
+    def testSetterInvalidatesHolders(self):
+        chapter = util.caliper.entities.Chapter(id="https://example.edu/etexts/1/2")
+        book = util.caliper.entities.Document(id="https://example.edu/etexts/1")
+        page = util.caliper.entities.Page(
+            id="https://example.edu/etexts/1/2/3", isPartOf=chapter
+        )
+        self.assertNotIn("isPartOf", page.as_dict(thin_props=True)["isPartOf"])
+        chapter.isPartOf = book
+        self.assertEqual(
+            page.as_dict(thin_props=True)["isPartOf"]["isPartOf"]["id"], book.id
+        )
+
+    def testPickleRoundTrip(self):
+        chapter = util.caliper.entities.Chapter(id="https://example.edu/etexts/1/2")
+        page = util.caliper.entities.Page(
+            id="https://example.edu/etexts/1/2/3", isPartOf=chapter
+        )
+        first = self.envelope.as_json(thin_context=True, thin_props=True)
+        page.as_dict()
+        self.assertIsNotNone(chapter._parents)
+        loaded = pickle.loads(pickle.dumps(self.envelope))
+        self.assertEqual(loaded.as_json(thin_context=True, thin_props=True), first)
+        loaded_page = pickle.loads(pickle.dumps(page))
+        self.assertIsNone(loaded_page._serialized)
+        self.assertEqual(
+            loaded_page.as_dict(thin_props=True), page.as_dict(thin_props=True)
+        )
+        # the loaded objects still invalidate the caches of their holders
+        book = util.caliper.entities.Document(id="https://example.edu/etexts/1")
+        loaded_page.isPartOf.isPartOf = book
+        self.assertEqual(
+            loaded_page.as_dict(thin_props=True)["isPartOf"]["isPartOf"]["id"], book.id
+        )
+
+    def testCopiesDoNotShareCachedSubtrees(self):
+        d = self.envelope.as_dict(thin_props=True)
+        self.assertIsNot(d["data"][0]["actor"], d["data"][1]["actor"])
+        d["data"][0]["actor"]["name"] = "changed"
+        self.assertNotIn("name", d["data"][1]["actor"])
+        self.assertNotIn(
+            "name", self.envelope.as_dict(thin_props=True)["data"][0]["actor"]
+        )
+
+
+class TestDescribeOnce(unittest.TestCase):
+    def setUp(self):
+        self.entities = util.build_sample_entities()
+        self.envelope = util.build_sample_envelope(3, entities=self.entities)
+
+    def tearDown(self):
+        pass
+
+    def testRepeatedEntitiesSerializeAsIds(self):
+        described = util.caliper.base.DescribeOnce()
+        d = self.envelope.as_dict(
+            described_objects=described, thin_context=True, thin_props=True
+        )
+        first, rest = d["data"][0], d["data"][1:]
+        for k, entity in self.entities.items():
+            self.assertEqual(first[k]["id"], entity.id)
+            self.assertIn(entity.id, described)
+            for event in rest:
+                self.assertEqual(event[k], entity.id)
+        # documents differ between events, so they all go out in full
+        for event, sent in zip(self.envelope.data, d["data"]):
+            self.assertEqual(sent["object"]["id"], event.object.id)
+
+    def testIdsListFullDescriptionsOnce(self):
+        payload, ids = self.envelope.as_json_with_ids(
+            described_objects=util.caliper.base.DescribeOnce(),
+            thin_context=True,
+            thin_props=True,
+        )
+        self.assertEqual(util.scan_ids(payload), ids)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def testSeededWithDescribedObjects(self):
+        actor = self.entities["actor"]
+        d = self.envelope.as_dict(
+            described_objects=util.caliper.base.DescribeOnce([actor.id])
+        )
+        for event in d["data"]:
+            self.assertEqual(event["actor"], actor.id)
+
+
+class TestTypeRegistry(unittest.TestCase):
+    def setUp(self):
+        self.base = util.caliper.base
+        self.classes = self.base._get_type_registry().classes
+
+    def testSubtypesMatchClassHierarchy(self):
+        for n1, c1 in self.classes.items():
+            for n2, c2 in self.classes.items():
+                expected = issubclass(c1, c2)
+                self.assertEqual(self.base.is_subtype(n1, n2), expected)
+                self.assertEqual(self.base.is_subtype(c1, n2), expected)
+                self.assertEqual(self.base.is_subtype(n1, c2), expected)
+
+    def testTypesOutsideRegistry(self):
+        entities = util.caliper.entities
+        self.assertIs(self.base._get_type("Person"), entities.Person)
+        self.assertTrue(self.base.is_subtype("Person", self.base.CaliperSerializable))
+        self.assertTrue(self.base.is_subtype(dict, dict))
+        self.assertFalse(self.base.is_subtype(dict, "Person"))
+        for t in (None, "", "NotAType"):
+            with self.assertRaises(ValueError):
+                self.base._get_type(t)
+
+    def testBuiltOnImport(self):
+        self.assertIs(self.classes["Event"], util.caliper.events.Event)
+        for t in ("AggregateProgress", "AggregateTimeOnTask"):
+            self.assertNotIn(t, self.classes)
+            with self.assertRaises(ValueError):
+                self.base._get_type(t)
+
+    def testUnresolvedClass(self):
+        classes = self.base.CALIPER_CLASSES
+        self.addCleanup(setattr, self.base, "CALIPER_CLASSES", classes)
+        self.base.CALIPER_CLASSES = dict(classes, Missing="caliper.entities.Missing")
+        with self.assertRaises(ImportError):
+            self.base._TypeRegistry()
+
+    def testEnsureType(self):
+        person = util.caliper.entities.Person(id="https://example.edu/users/554433")
+        self.assertTrue(self.base.ensure_type(person, "Agent"))
+        self.assertTrue(self.base.ensure_type(person.id, "Agent"))
+        with self.assertRaises(TypeError):
+            self.base.ensure_type(person, "DigitalResource")
+
+
+class TestUriCache(unittest.TestCase):
+    def setUp(self):
+        self.base = util.caliper.base
+        self.addCleanup(self.base.set_uri_cache_size, self.base.URI_CACHE_SIZE)
+        self.base.set_uri_cache_size(2)
+
+    def testVerdictsUnchanged(self):
+        for uri in (
+            "https://example.edu/users/554433",
+            "urn:uuid:ff9ec22a-fc59-4ae1-ae8d-2c9463ee2f8f",
+            "not a uri",
+            "",
+            None,
+            42,
+        ):
+            expected = self.base._check_URI(uri)
+            self.assertEqual(self.base.is_valid_URI(uri), expected)
+            self.assertEqual(self.base.is_valid_URI(uri), expected)
+
+    def testBoundedWithHitRate(self):
+        uris = ["https://example.edu/{}".format(i) for i in range(3)]
+        for uri in uris[:2] + uris[:2]:
+            self.base.is_valid_URI(uri)
+        info = self.base.get_uri_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 2, 2))
+        self.assertEqual(info.hit_rate, 0.5)
+        self.base.is_valid_URI(uris[2])
+        self.base.is_valid_URI(uris[0])
+        info = self.base.get_uri_cache_info()
+        self.assertEqual((info.misses, info.currsize, info.maxsize), (4, 2, 2))
+
+    def testInvalidIdStillRaises(self):
+        with self.assertRaises(ValueError):
+            util.caliper.entities.Person(id="not a uri")
+        with self.assertRaises(ValueError):
+            util.caliper.entities.Person(id="not a uri")
+
+    def testCacheSize(self):
+        self.base.set_uri_cache_size(0)
+        self.assertTrue(self.base.is_valid_URI("https://example.edu"))
+        self.assertEqual(self.base.get_uri_cache_info().currsize, 0)
+        with self.assertRaises(ValueError):
+            self.base.set_uri_cache_size(-1)
+
+
+class TestDatetimeValidation(unittest.TestCase):
+    # the verdicts as they were before the fast path: a loose shape match,
+    # then a full aniso8601 parse
+    _shape = re.compile(r"\A\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d.\d{3}Z\Z", re.ASCII)
+
+    def _reference(self, dt):
+        try:
+            assert self._shape.match(dt)
+            aniso8601.parse_datetime(dt)
+            return True
+        except Exception:
+            return False
+
+    def _random_datetime(self, rnd):
+        return "{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}{}{:03d}Z".format(
+            rnd.choice((0, 1, 1900, 2000, 2015, 2016, 9999, rnd.randrange(10000))),
+            rnd.randrange(14),
+            rnd.randrange(33),
+            rnd.randrange(26),
+            rnd.randrange(62),
+            rnd.randrange(62),
+            rnd.choice(".....,:x\u3002"),
+            rnd.choice((0, 0, 1, 999, rnd.randrange(1000))),
+        )
+
+    def _mutate(self, rnd, dt):
+        chars = list(dt)
+        chars[rnd.randrange(len(chars))] = rnd.choice("0123456789-:.,TZ \u0661")
+        return "".join(chars)
+
+    def testFuzzMatchesReference(self):
+        rnd = random.Random(20161115)
+        for i in range(20000):
+            dt = self._random_datetime(rnd)
+            if i % 4 == 0:
+                dt = self._mutate(rnd, dt)
+            self.assertEqual(
+                util.caliper.base.is_valid_datetime(dt), self._reference(dt), dt
+            )
+
+    def testEdgeCases(self):
+        for dt, expected in (
+            ("2016-11-15T10:15:00.000Z", True),
+            ("2016-11-15T10:15:00,000Z", True),
+            ("2016-02-29T00:00:00.000Z", True),
+            ("2015-02-29T00:00:00.000Z", False),
+            ("1900-02-29T00:00:00.000Z", False),
+            ("2000-02-29T00:00:00.000Z", True),
+            ("0000-01-01T00:00:00.000Z", False),
+            ("2016-11-15T24:00:00.000Z", False),
+            ("2016-11-15T10:15:60.000Z", True),
+            ("2016-11-15T10:15:60.001Z", False),
+            ("2016-11-15T10:15:00.000+00:00", False),
+            ("2016-11-15", False),
+            ("", False),
+            (None, False),
+            (20161115, False),
+        ):
+            self.assertEqual(util.caliper.base.is_valid_datetime(dt), expected, dt)
+            self.assertEqual(self._reference(dt), expected, dt)
+
+
+class TestValidationLevels(unittest.TestCase):
+    def setUp(self):
+        self.base = util.caliper.base
+        self.entities = util.build_sample_entities()
+
+    def _event(self, **kwargs):
+        props = dict(
+            self.entities,
+            action=util.caliper.constants.CALIPER_ACTIONS["VIEWED"],
+            object=util.caliper.entities.Document(id="https://example.edu/etexts/1"),
+            eventTime="2016-11-15T10:15:00.000Z",
+        )
+        props.update(kwargs)
+        return util.caliper.events.ViewEvent(**props)
+
+    def _invalid_values(self):
+        return (
+            {"action": util.caliper.constants.CALIPER_ACTIONS["ABANDONED"]},
+            {"eventTime": "2016-11-15"},
+            {"id": "not-a-urn"},
+        )
+
+    def _mistyped_values(self):
+        return (
+            {"object": "not a uri"},
+            {"actor": self.entities["edApp"]},
+        )
+
+    def testStrictByDefault(self):
+        self.assertEqual(self.base.get_validation_level(), "strict")
+        for kwargs in self._invalid_values() + self._mistyped_values():
+            with self.assertRaises((TypeError, ValueError)):
+                self._event(**kwargs)
+
+    def testTrustedOnlyChecksRequired(self):
+        with self.base.validation_level("trusted"):
+            for kwargs in self._invalid_values():
+                self.assertEqual(self._event(**kwargs).type, "ViewEvent")
+            self.assertTrue(self._event().id.startswith("urn:uuid:"))
+            with self.assertRaises(ValueError):
+                self._event(eventTime=None)
+            with self.assertRaises(ValueError):
+                self._event(actor=None)
+            with self.assertRaises(ValueError):
+                util.caliper.entities.Person(id=None)
+        self.assertEqual(self.base.get_validation_level(), "strict")
+
+    def testTrustedKeepsTypeChecks(self):
+        with self.base.validation_level("trusted"):
+            for kwargs in self._mistyped_values():
+                with self.assertRaises(TypeError):
+                    self._event(**kwargs)
+            self.assertTrue(self.base.ensure_type("not a uri", str))
+            with self.assertRaises(TypeError):
+                self.base.ensure_type("not a uri", self.entities["actor"].type)
+            with self.assertRaises(TypeError):
+                self.base.ensure_list_type([{}], self.base.CaliperSerializable)
+
+    def testTrustedSerializesTheSame(self):
+        event = self._event(id="urn:uuid:ff9ec22a-fc59-4ae1-ae8d-2c9463ee2f8f")
+        with self.base.validation_level("trusted"):
+            trusted = self._event(id=event.id)
+        self.assertEqual(trusted.as_json(), event.as_json())
+
+    def testScopedToThread(self):
+        seen = []
+        with self.base.validation_level("trusted"):
+            thread = threading.Thread(
+                target=lambda: seen.append(self.base.get_validation_level())
+            )
+            thread.start()
+            thread.join()
+            with self.base.validation_level("strict"):
+                self.assertEqual(self.base.get_validation_level(), "strict")
+            self.assertEqual(self.base.get_validation_level(), "trusted")
+        self.assertEqual(seen, ["strict"])
+
+    def testDefaultLevel(self):
+        self.addCleanup(self.base.set_validation_level, "strict")
+        self.base.set_validation_level("trusted")
+        self._event(eventTime="2016-11-15")
+        with self.base.validation_level("strict"):
+            with self.assertRaises(ValueError):
+                self._event(eventTime="2016-11-15")
+
+    def testInvalidLevel(self):
+        with self.assertRaises(ValueError):
+            self.base.set_validation_level("lenient")
+        with self.assertRaises(ValueError):
+            with self.base.validation_level(None):
+                pass
+        with self.assertRaises(ValueError):
+            self.base.HttpOptions(validation_level="lenient")
+
+
+class TestCompactObjects(unittest.TestCase):
+    def setUp(self):
+        self.base = util.caliper.base
+        self.entities = util.build_sample_entities()
+
+    def testNoInstanceDicts(self):
+        for module in (util.caliper.entities, util.caliper.events):
+            for name in dir(module):
+                cls = getattr(module, name)
+                if isinstance(cls, type) and issubclass(
+                    cls, self.base.CaliperSerializable
+                ):
+                    self.assertNotIn("__dict__", dir(cls), name)
+        event = util.build_sample_event(entities=self.entities)
+        with self.assertRaises(AttributeError):
+            event.not_a_property = True
+        self.assertIs(weakref.ref(event)(), event)
+
+    def testPerClassStateShared(self):
+        first, second = util.build_sample_events(2, entities=self.entities)
+        self.assertEqual(first._classname, "caliper.events.ViewEvent")
+        self.assertIs(first._context_hashes, second._context_hashes)
+        self.assertIs(first._nulls, second._nulls)
+        self.assertNotIn(None, first._props.values())
+
+    def testNullPropertiesSerialized(self):
+        event = util.build_sample_event(entities=self.entities)
+        self.assertIsNone(event.target)
+        full = event.as_dict()
+        self.assertIn("target", full)
+        self.assertIsNone(full["target"])
+        self.assertNotIn("target", event.as_dict(thin_props=True))
+        session = self.entities["session"]
+        session.endedAtTime = "2016-11-15T11:05:00.000Z"
+        self.assertEqual(session.endedAtTime, "2016-11-15T11:05:00.000Z")
+        self.assertNotIn("endedAtTime", session._nulls)
+        session.endedAtTime = None
+        self.assertIsNone(session.as_dict()["endedAtTime"])
+
+    def testHoldersListenOnceHeld(self):
+        base = self.base
+
+        class Holder(base.CaliperSerializable):
+            __slots__ = ()
+
+            def __init__(self, item):
+                base.CaliperSerializable.__init__(self)
+                self._update_props("item", item)
+
+        class CachedHolder(Holder):
+            __slots__ = ()
+
+            _cache_serialization = True
+
+        session = self.entities["session"]
+        holder = Holder(session)
+        self.assertIsNone(session._parents)
+        top = CachedHolder(holder)
+        top.as_json()
+        session.endedAtTime = "2016-11-15T11:05:00.000Z"
+        self.assertEqual(
+            top.as_dict()["item"]["item"]["endedAtTime"], "2016-11-15T11:05:00.000Z"
+        )
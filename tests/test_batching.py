@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing batch dispatch)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+
+from . import util
+
+
+class TestBatchDispatch(unittest.TestCase):
+    def setUp(self):
+        self.entities = util.build_sample_entities()
+
+    def _client(self, url, **kwargs):
+        options = util.caliper.base.HttpOptions(host=url, batch_dispatch=True, **kwargs)
+        return util.caliper.sensor.Client(config_options=options)
+
+    def _events(self, count):
+        return util.build_sample_events(count, entities=self.entities)
+
+    def _sent_events(self, endpoint):
+        return [e for _, _, body in endpoint.received for e in json.loads(body)["data"]]
+
+    def testSendQueues(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._client(endpoint.url, batch_max_wait=60000) as client:
+                events = self._events(3)
+                self.assertIsNone(client.send(events, sensor_id=util._SENSOR_ID))
+                self.assertEqual(endpoint.received, [])
+                self.assertTrue(client.flush())
+                self.assertEqual(len(endpoint.received), 1)
+                self.assertEqual(client.stats.successful.count, 3)
+        self.assertEqual(
+            [e["id"] for e in self._sent_events(endpoint)], [e.id for e in events]
+        )
+
+    def testCutsOnEventCount(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._client(
+                endpoint.url, batch_max_events=4, batch_max_wait=60000
+            ) as client:
+                for event in self._events(10):
+                    client.send([event], sensor_id=util._SENSOR_ID)
+        self.assertEqual(
+            [len(json.loads(body)["data"]) for _, _, body in endpoint.received],
+            [4, 4, 2],
+        )
+
+    def testCutsOnAge(self):
+        with util.LocalEndpoint() as endpoint:
+            client = self._client(endpoint.url, batch_max_wait=50)
+            client.send(self._events(2), sensor_id=util._SENSOR_ID)
+            for i in range(100):
+                if endpoint.received:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(len(endpoint.received), 1)
+            client.close()
+
+    def testCutsOnBytes(self):
+        max_bytes = 2048
+        with util.LocalEndpoint() as endpoint:
+            with self._client(
+                endpoint.url,
+                batch_max_bytes=max_bytes,
+                batch_max_wait=60000,
+                stream_payload=False,
+            ) as client:
+                client.send(self._events(10), sensor_id=util._SENSOR_ID)
+        self.assertGreater(len(endpoint.received), 1)
+        for _, _, body in endpoint.received:
+            self.assertLessEqual(len(body), max_bytes)
+        self.assertEqual(len(self._sent_events(endpoint)), 10)
+
+    def testCutsOnEndpointLimit(self):
+        config = {
+            "caliper_maximum_payload_size": 2048,
+            "caliper_supported_versions": [util.caliper.constants.CALIPER_CORE_CONTEXT],
+        }
+        threads = []
+        with util.LocalEndpoint(config=config) as endpoint:
+            with self._client(
+                endpoint.url,
+                batch_max_wait=60000,
+                split_payloads=True,
+                stream_payload=False,
+            ) as client:
+                get_payload_limit = client._requestor.get_payload_limit
+
+                def resolve():
+                    threads.append(threading.current_thread())
+                    return get_payload_limit()
+
+                client._requestor.get_payload_limit = resolve
+                client.send(self._events(10), sensor_id=util._SENSOR_ID)
+                client.flush()
+                client.send(self._events(10), sensor_id=util._SENSOR_ID)
+        self.assertGreater(len(endpoint.received), 2)
+        for _, _, body in endpoint.received:
+            self.assertLessEqual(len(body), 2048)
+        self.assertEqual(len(self._sent_events(endpoint)), 20)
+        # the limit gets resolved on the queue's thread, not the sending one
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def testOversizedEventGoesAlone(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._client(
+                endpoint.url, batch_max_bytes=16, batch_max_wait=60000
+            ) as client:
+                client.send(self._events(3), sensor_id=util._SENSOR_ID)
+                client.flush()
+                self.assertEqual(client.stats.successful.count, 3)
+        self.assertEqual(len(endpoint.received), 3)
+
+    def testCloseDrainsQueue(self):
+        with util.LocalEndpoint() as endpoint:
+            client = self._client(endpoint.url, batch_max_wait=60000)
+            client.send(self._events(5), sensor_id=util._SENSOR_ID)
+            client.close()
+            self.assertEqual(len(self._sent_events(endpoint)), 5)
+            # the queue keeps working after closing
+            client.send(self._events(2), sensor_id=util._SENSOR_ID)
+            client.close()
+            self.assertEqual(len(self._sent_events(endpoint)), 7)
+
+    def testDeduplicatesWithinBatch(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._client(
+                endpoint.url,
+                batch_max_wait=60000,
+                deduplicate_entities=True,
+                stream_payload=False,
+            ) as client:
+                for event in self._events(3):
+                    client.send([event], sensor_id=util._SENSOR_ID)
+        first, *rest = self._sent_events(endpoint)
+        self.assertEqual(first["actor"]["id"], self.entities["actor"].id)
+        for event in rest:
+            self.assertEqual(event["actor"], self.entities["actor"].id)
+
+    def _check_described_once(self, endpoint):
+        # each envelope describes the actor in full once, before referring to
+        # it by its id
+        for _, _, body in endpoint.received:
+            first, *rest = json.loads(body)["data"]
+            self.assertEqual(first["actor"]["id"], self.entities["actor"].id)
+            for event in rest:
+                self.assertEqual(event["actor"], self.entities["actor"].id)
+
+    def testDeduplicatesAcrossCuts(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._client(
+                endpoint.url,
+                batch_max_bytes=4096,
+                batch_max_wait=60000,
+                deduplicate_entities=True,
+                stream_payload=False,
+            ) as client:
+                client.send(self._events(10), sensor_id=util._SENSOR_ID)
+                threads = [
+                    threading.Thread(
+                        target=lambda: [
+                            client.send([event], sensor_id=util._SENSOR_ID)
+                            for event in self._events(10)
+                        ]
+                    )
+                    for i in range(4)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        self.assertGreater(len(endpoint.received), 2)
+        self.assertEqual(len(self._sent_events(endpoint)), 50)
+        self._check_described_once(endpoint)
+
+    def testEncodesOutsideLock(self):
+        for dedupe in (False, True):
+            locked = []
+            with util.LocalEndpoint() as endpoint:
+                with self._client(
+                    endpoint.url, batch_max_wait=60000, deduplicate_entities=dedupe
+                ) as client:
+                    queue = client._get_queue()
+                    # an RLock knows which thread holds it
+                    queue._cond = threading.Condition(threading.RLock())
+                    get_data_encoder = client._requestor.get_data_encoder
+
+                    def get_checked_encoder(described_objects=None):
+                        encoder = get_data_encoder(described_objects)
+                        encode_item = encoder.encode_item
+
+                        def encode_checked(item, described_objects=None):
+                            locked.append(queue._cond._is_owned())
+                            return encode_item(item, described_objects)
+
+                        encoder.encode_item = encode_checked
+                        return encoder
+
+                    client._requestor.get_data_encoder = get_checked_encoder
+                    for event in self._events(3):
+                        client.send([event], sensor_id=util._SENSOR_ID)
+            self.assertEqual(locked, [False, False, False])
+            self.assertEqual(len(self._sent_events(endpoint)), 3)
+
+    def testEncodesOnSend(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._client(endpoint.url, batch_max_wait=60000) as client:
+                client.send(self._events(1), sensor_id=util._SENSOR_ID)
+                self.entities["session"].endedAtTime = "2016-11-15T11:05:00.000Z"
+        self.assertNotIn("endedAtTime", self._sent_events(endpoint)[0]["session"])
+
+    def testFailuresCounted(self):
+        with util.LocalEndpoint(respond=lambda body: 500) as endpoint:
+            with self._client(endpoint.url, batch_max_wait=60000) as client:
+                client.send(self._events(3), sensor_id=util._SENSOR_ID)
+                client.flush()
+                self.assertEqual(client.stats.failed.count, 3)
+                self.assertEqual(client.stats.successful.count, 0)
+
+    def testFullQueueTimesOut(self):
+        release = threading.Event()
+
+        def respond(body):
+            release.wait(5)
+            return 201
+
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            client = self._client(endpoint.url, batch_max_events=1, batch_queue_size=2)
+            client.send(self._events(2), sensor_id=util._SENSOR_ID)
+            client.send(self._events(1), sensor_id=util._SENSOR_ID, deadline=50)
+            self.assertEqual(client.stats.failed.count, 1)
+            self.assertEqual(client.stats.timeouts.count, 1)
+            release.set()
+            client.close()
+            self.assertEqual(client.stats.successful.count, 2)
+
+    def testSensorFlush(self):
+        with util.LocalEndpoint() as endpoint:
+            options = util.caliper.base.HttpOptions(
+                host=endpoint.url, batch_dispatch=True, batch_max_wait=60000
+            )
+            sensor = util.caliper.build_sensor_from_config(
+                config_options=options, sensor_id=util._SENSOR_ID
+            )
+            self.assertEqual(sensor.send(self._events(2)), {"default": None})
+            self.assertTrue(sensor.flush())
+            self.assertEqual(len(self._sent_events(endpoint)), 2)
+            sensor.close()
+
+    def testInvalidOptions(self):
+        for k, v in (
+            ("batch_max_bytes", 0),
+            ("batch_max_events", 0),
+            ("batch_max_wait", -1),
+            ("batch_overflow", "retry"),
+            ("batch_queue_size", 0),
+            ("batch_sample_rate", 0),
+            ("batch_sample_rate", 1.5),
+        ):
+            with self.assertRaises(ValueError):
+                util.caliper.base.HttpOptions(**{k: v})
+
+
+class TestBatchOverflow(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.events = util.build_sample_events(6)
+
+    def _respond(self, body):
+        self.release.wait(5)
+        return 201
+
+    def _options(self, url, batch_queue_size=2, **kwargs):
+        return util.caliper.base.HttpOptions(
+            host=url,
+            batch_dispatch=True,
+            batch_max_events=1,
+            batch_queue_size=batch_queue_size,
+            **kwargs
+        )
+
+    def _client(self, url, **kwargs):
+        return util.caliper.sensor.Client(config_options=self._options(url, **kwargs))
+
+    def _send(self, client, events):
+        client.send(events, sensor_id=util._SENSOR_ID)
+
+    def _wait_in_flight(self, endpoint):
+        for i in range(500):
+            if endpoint.received:
+                return
+            time.sleep(0.01)
+
+    def _sent_ids(self, endpoint):
+        return [
+            e["id"]
+            for _, _, body in endpoint.received
+            for e in json.loads(body)["data"]
+        ]
+
+    def testDropNewest(self):
+        with util.LocalEndpoint(respond=self._respond) as endpoint:
+            client = self._client(endpoint.url, batch_overflow="drop_newest")
+            start = time.monotonic()
+            self._send(client, self.events[:4])
+            self.assertLess(time.monotonic() - start, 1)
+            self.assertEqual(client.stats.dropped_newest.sum, 2)
+            self.assertEqual(client.stats.failed.count, 2)
+            self.release.set()
+            client.close()
+        self.assertEqual(self._sent_ids(endpoint), [e.id for e in self.events[:2]])
+
+    def testDropOldest(self):
+        with util.LocalEndpoint(respond=self._respond) as endpoint:
+            client = self._client(endpoint.url, batch_overflow="drop_oldest")
+            self._send(client, self.events[:2])
+            self._wait_in_flight(endpoint)
+            self._send(client, self.events[2:4])
+            self.assertEqual(client.stats.dropped_oldest.sum, 2)
+            self.release.set()
+            client.close()
+            self.assertEqual(client.stats.successful.count, 2)
+            self.assertEqual(client.stats.failed.count, 2)
+        self.assertEqual(
+            self._sent_ids(endpoint), [self.events[0].id, self.events[3].id]
+        )
+
+    def testSpill(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with util.LocalEndpoint(respond=self._respond) as endpoint:
+                options = self._options(endpoint.url, batch_overflow="spill")
+                requestor = util.caliper.spool.SpoolingRequestor(
+                    util.caliper.request.HttpRequestor(options=options), directory
+                )
+                client = util.caliper.sensor.Client(
+                    config_options=options, requestor=requestor
+                )
+                self._send(client, self.events[:3])
+                self.assertEqual(client.stats.spilled.sum, 1)
+                self.assertEqual(client.stats.spooled.sum, 1)
+                self.release.set()
+                client.close()
+
+    def testSample(self):
+        with util.LocalEndpoint(respond=self._respond) as endpoint:
+            client = self._client(
+                endpoint.url,
+                batch_overflow="sample",
+                batch_queue_size=4,
+                batch_sample_rate=1e-9,
+            )
+            self._send(client, self.events)
+            # sampling starts once the queue is half full
+            self.assertEqual(client.stats.sampled_out.sum, 4)
+            self.release.set()
+            client.close()
+        self.assertEqual(len(endpoint.received), 2)
+
+    def testSheddingLeavesBreakerClosed(self):
+        for policy in ("drop_newest", "sample"):
+            with self.subTest(policy=policy):
+                with util.LocalEndpoint() as endpoint:
+                    client = self._client(
+                        endpoint.url,
+                        batch_overflow=policy,
+                        batch_queue_size=10,
+                        batch_sample_rate=1e-9,
+                        circuit_breaker=True,
+                        circuit_min_calls=1,
+                    )
+                    events = util.build_sample_events(40)
+                    self._send(client, events[:20])
+                    self._send(client, events[20:])
+                    self.assertGreater(client.stats.failed.count, 0)
+                    self.assertTrue(client.flush())
+                    self._send(client, events[:5])
+                    self.assertTrue(client.flush())
+                    client.close()
+                self.assertEqual(client.stats.circuit_opened.count, 0)
+                self.assertEqual(client.stats.circuit_rejected.count, 0)
+                self.assertEqual(client.circuit_state, util.caliper.breaker.CLOSED)
+
+    def testBlockTimeoutCounted(self):
+        with util.LocalEndpoint(respond=self._respond) as endpoint:
+            client = self._client(endpoint.url)
+            client.send(self.events[:3], sensor_id=util._SENSOR_ID, deadline=50)
+            self.assertEqual(client.stats.queue_timed_out.sum, 1)
+            self.assertEqual(client.stats.timeouts.count, 1)
+            self.release.set()
+            client.close()
+
+    def testQueueDepthHook(self):
+        depths = []
+        with util.LocalEndpoint(respond=self._respond) as endpoint:
+            client = util.caliper.sensor.Client(
+                config_options=self._options(endpoint.url, batch_queue_size=10),
+                on_queue_depth=lambda depth, capacity: depths.append((depth, capacity)),
+            )
+            self._send(client, self.events[:3])
+            self.assertEqual(depths, [(3, 10)])
+            self.assertEqual(client.queue_depth, 3)
+            self.release.set()
+            self.assertTrue(client.flush())
+            client.close()
+        self.assertEqual(depths[-1], (0, 10))
+        self.assertEqual(client.queue_depth, 0)
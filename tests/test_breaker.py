@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing client circuit breakers)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import tempfile
+import time
+import unittest
+
+from . import util
+
+CLOSED = util.caliper.breaker.CLOSED
+HALF_OPEN = util.caliper.breaker.HALF_OPEN
+OPEN = util.caliper.breaker.OPEN
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.transitions = []
+
+    def _breaker(self, **kwargs):
+        return util.caliper.breaker.CircuitBreaker(
+            on_change=lambda old, new: self.transitions.append(new), **kwargs
+        )
+
+    def _calls(self, breaker, *outcomes):
+        for outcome in outcomes:
+            self.assertTrue(breaker.allow())
+            breaker.record(outcome)
+
+    def testOpensOnFailureRate(self):
+        breaker = self._breaker(failure_rate=0.5, min_calls=4, window=4)
+        self._calls(breaker, True, False, True)
+        self.assertEqual(breaker.state, CLOSED)
+        self._calls(breaker, False)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(self.transitions, [OPEN])
+
+    def testWindowSlides(self):
+        breaker = self._breaker(failure_rate=0.5, min_calls=4, window=4)
+        self._calls(breaker, False, True, True, True, True, False, True)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def testSlowCallsCountAsFailures(self):
+        breaker = self._breaker(min_calls=2, slow_call=100)
+        breaker.record(True, latency=50)
+        breaker.record(True, latency=150)
+        self.assertEqual(breaker.state, OPEN)
+
+    def testHalfOpenTrial(self):
+        breaker = self._breaker(min_calls=1, reset_timeout=20)
+        self._calls(breaker, False)
+        time.sleep(0.03)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # a single trial call at a time
+        self.assertFalse(breaker.allow())
+        breaker.record(False)
+        self.assertEqual(breaker.state, OPEN)
+        time.sleep(0.03)
+        self._calls(breaker, True)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(self.transitions, [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED])
+
+    def testCallbackMayUseBreaker(self):
+        states = []
+        breaker = util.caliper.breaker.CircuitBreaker(
+            min_calls=1,
+            reset_timeout=20,
+            on_change=lambda old, new: states.append(breaker.state),
+        )
+        breaker.record(False)
+        time.sleep(0.03)
+        self.assertTrue(breaker.allow())
+        breaker.record(True)
+        self.assertEqual(states, [OPEN, HALF_OPEN, CLOSED])
+
+
+class TestClientCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.status = 503
+        self.events = util.build_sample_events(2)
+
+    def _options(self, url, **kwargs):
+        return util.caliper.base.HttpOptions(
+            host=url,
+            circuit_breaker=True,
+            circuit_min_calls=2,
+            retry_attempts=1,
+            **kwargs
+        )
+
+    def _endpoint(self):
+        return util.LocalEndpoint(respond=lambda body: self.status)
+
+    def _send(self, client):
+        return client.send(self.events, sensor_id=util._SENSOR_ID)
+
+    def testOpenCircuitSkipsEndpoint(self):
+        with self._endpoint() as endpoint:
+            client = util.caliper.sensor.Client(
+                config_options=self._options(endpoint.url)
+            )
+            self._send(client)
+            self._send(client)
+            self.assertEqual(client.circuit_state, OPEN)
+            self.assertEqual(self._send(client), [])
+            self.assertEqual(len(endpoint.received), 2)
+            stats = client.stats
+            self.assertEqual(stats.circuit_opened.count, 1)
+            self.assertEqual(stats.circuit_rejected.sum, 2)
+            self.assertEqual(stats.failed.count, 6)
+            client.close()
+
+    def testRecovers(self):
+        with self._endpoint() as endpoint:
+            client = util.caliper.sensor.Client(
+                config_options=self._options(endpoint.url, circuit_reset_timeout=20)
+            )
+            self._send(client)
+            self._send(client)
+            self.status = 201
+            time.sleep(0.03)
+            self._send(client)
+            self.assertEqual(client.circuit_state, CLOSED)
+            self.assertEqual(client.stats.successful.count, 2)
+            stats = client.stats
+            self.assertEqual(stats.circuit_half_opened.count, 1)
+            self.assertEqual(stats.circuit_closed.count, 1)
+            client.close()
+
+    def testSpoolFallback(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self._endpoint() as endpoint:
+                options = self._options(endpoint.url, circuit_fallback="spool")
+                requestor = util.caliper.spool.SpoolingRequestor(
+                    util.caliper.request.HttpRequestor(options=options), directory
+                )
+                client = util.caliper.sensor.Client(
+                    config_options=options, requestor=requestor
+                )
+                self._send(client)
+                self._send(client)
+                self._send(client)
+                self.assertEqual(len(endpoint.received), 2)
+                self.assertEqual(client.stats.spooled.sum, 6)
+                client.close()
+
+    def testBatchDispatchRejects(self):
+        with self._endpoint() as endpoint:
+            client = util.caliper.sensor.Client(
+                config_options=self._options(endpoint.url, batch_dispatch=True)
+            )
+            for i in range(2):
+                self._send(client)
+                client.flush()
+            self.assertEqual(client.circuit_state, OPEN)
+            self._send(client)
+            client.close()
+            self.assertEqual(len(endpoint.received), 2)
+            self.assertEqual(client.stats.circuit_rejected.sum, 2)
+
+    def testWithoutBreaker(self):
+        client = util.caliper.sensor.Client(config_options=util.get_testing_options())
+        self.assertIsNone(client.circuit_state)
+
+    def testInvalidOptions(self):
+        for k, v in (
+            ("circuit_failure_rate", 0),
+            ("circuit_failure_rate", 1.5),
+            ("circuit_fallback", "retry"),
+            ("circuit_min_calls", 0),
+            ("circuit_reset_timeout", -1),
+            ("circuit_slow_call", -1),
+            ("circuit_window", 0),
+        ):
+            with self.assertRaises(ValueError):
+                util.caliper.base.HttpOptions(**{k: v})
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing compression behaviour)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import gzip
+import os
+import tempfile
+import unittest
+import zlib
+
+from . import util
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.payload = util.build_sample_envelope(5).as_json().encode("utf-8")
+
+    def tearDown(self):
+        pass
+
+    def testRoundTrip(self):
+        zdict = self.payload[:200]
+        for encoding, z in (("gzip", None), ("deflate", None), ("deflate", zdict)):
+            compressor = util.caliper.compression.Compressor(encoding, zdict=z)
+            compressed = compressor.compress(self.payload)
+            self.assertLess(len(compressed), len(self.payload))
+            self.assertEqual(
+                util.caliper.compression.decompress(compressed, encoding, zdict=z),
+                self.payload,
+            )
+
+    def testStandardFormats(self):
+        compress = util.caliper.compression.Compressor
+        self.assertEqual(
+            gzip.decompress(compress("gzip").compress(self.payload)), self.payload
+        )
+        self.assertEqual(
+            zlib.decompress(compress("deflate").compress(self.payload)), self.payload
+        )
+
+    def testDictionaryRequired(self):
+        zdict = self.payload[:200]
+        compressed = util.caliper.compression.Compressor(
+            "deflate", zdict=zdict
+        ).compress(self.payload)
+        with self.assertRaises(zlib.error):
+            util.caliper.compression.decompress(compressed, "deflate")
+
+    def testInvalidArguments(self):
+        with self.assertRaises(ValueError):
+            util.caliper.compression.Compressor("br")
+        with self.assertRaises(ValueError):
+            util.caliper.compression.Compressor("gzip", zdict=b"{}")
+        with self.assertRaises(ValueError):
+            util.caliper.compression.decompress(
+                util.caliper.compression.Compressor().compress(self.payload)[:-8]
+            )
+
+
+class TestPresetDictionaries(unittest.TestCase):
+    def setUp(self):
+        self.payload = util.build_sample_envelope(1).as_json().encode("utf-8")
+        self.samples = [
+            util.build_sample_envelope(i + 1).as_json().encode("utf-8") + b"\n"
+            for i in range(5)
+        ]
+
+    def tearDown(self):
+        pass
+
+    def _compressed_size(self, zdict):
+        compressor = util.caliper.compression.Compressor("deflate", zdict=zdict)
+        compressed = compressor.compress(self.payload)
+        self.assertEqual(
+            util.caliper.compression.decompress(compressed, "deflate", zdict=zdict),
+            self.payload,
+        )
+        return len(compressed)
+
+    def testCaliperZdict(self):
+        zdict = util.caliper.compression.CALIPER_ZDICT
+        self.assertLessEqual(len(zdict), util.caliper.compression.MAX_ZDICT_SIZE)
+        self.assertIn(util.caliper.constants.CALIPER_CORE_CONTEXT.encode(), zdict)
+        self.assertIn(b'"ViewEvent"', zdict)
+        self.assertLess(self._compressed_size(zdict), self._compressed_size(None))
+
+    def testBuildZdictKeepsMostValuableFragments(self):
+        zdict = util.caliper.compression.build_zdict(["aaaa", "bbbb", "cccc"], size=9)
+        self.assertEqual(zdict, b"bbbbcccc")
+
+    def testTrainedZdict(self):
+        zdict = util.caliper.util.zdict.train_zdict(self.samples, size=4096)
+        self.assertEqual(len(zdict), 4096)
+        self.assertIn(b'"https://example.edu/users/554433"', zdict)
+        self.assertLess(
+            self._compressed_size(zdict),
+            self._compressed_size(util.caliper.compression.CALIPER_ZDICT),
+        )
+        with self.assertRaises(ValueError):
+            util.caliper.util.zdict.train_zdict([b"\n"])
+
+    def testTrainingTool(self):
+        with tempfile.TemporaryDirectory() as d:
+            sample, output = os.path.join(d, "traffic.ndjson"), os.path.join(d, "z")
+            with open(sample, "wb") as f:
+                f.writelines(self.samples)
+            util.caliper.util.zdict.main([sample, "-o", output, "--no-base"])
+            with open(output, "rb") as f:
+                zdict = f.read()
+        self.assertEqual(
+            zdict, util.caliper.util.zdict.train_zdict(self.samples, base=None)
+        )
@@ -44,3 +44,18 @@ class TestCaliperCondensor(unittest.TestCase):
     def testEnvelopeEventSingle(self):
         fixture = "caliperEnvelopeEventSingle"
         self.assertEqual(util.get_fixture(fixture), util.rebuild_envelope(fixture))
+
+    # test condensing straight from a json-string
+    def testEnvelopeFromJson(self):
+        envelope = util.build_sample_envelope(2)
+        for backend in ("json", "auto"):
+            payload = envelope.as_json(thin_context=True, thin_props=True)
+            data = util.condensor.from_caliper_envelope_json(
+                payload, strict=True, json_backend=backend
+            )
+            rebuilt = util.caliper.request.Envelope(
+                data=data, send_time=envelope.sendTime, sensor_id=envelope.sensor
+            )
+            self.assertEqual(
+                rebuilt.as_json(thin_context=True, thin_props=True), payload
+            )
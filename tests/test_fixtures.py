@@ -121,6 +121,27 @@ class TestBrokenCaliperEnvelopes(unittest.TestCase):
             raise AssertionError
 
 
+class TestCaliperEnvelopeIds(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = util.get_fixtures_of_type("envelope")
+
+    def tearDown(self):
+        pass
+
+    def testAllCaliperEnvelopeIds(self):
+        passing = True
+        for fixture in self.fixtures:
+            print("Testing envelope fixture ids: {}".format(fixture))
+            try:
+                payload, ids = util.rebuild_envelope_with_ids(fixture)
+                self.assertEqual(util.scan_ids(payload), ids)
+            except AssertionError:
+                passing = False
+                print("Mismatched ids for envelope fixture: {}".format(fixture))
+        if not passing:
+            raise AssertionError
+
+
 class TestCaliperEvents(unittest.TestCase):
     def setUp(self):
         self.fixtures = util.get_fixtures_of_type("event")
@@ -0,0 +1,668 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing request behaviour)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import io
+import json
+import requests
+import threading
+import time
+import unittest
+
+from . import util
+
+
+class TestEnvelopeEncoder(unittest.TestCase):
+    def setUp(self):
+        self.envelope = util.build_sample_envelope(3)
+
+    def tearDown(self):
+        pass
+
+    def _encoder(self, **kwargs):
+        return util.caliper.request.EnvelopeEncoder(
+            send_time=self.envelope.sendTime, sensor_id=self.envelope.sensor, **kwargs
+        )
+
+    def testEncodingMatchesEnvelope(self):
+        described = [util.build_sample_entities()["actor"].id]
+        for thin in (True, False):
+            for d in (None, described):
+                encoder = self._encoder(
+                    described_objects=d, thin_context=thin, thin_props=thin
+                )
+                payload, ids = self.envelope.as_json_with_ids(
+                    described_objects=d, thin_context=thin, thin_props=thin
+                )
+                self.assertEqual(encoder.encode(self.envelope.data), payload)
+                self.assertEqual(encoder.ids, ids)
+
+    def testEncodingEmptyData(self):
+        self.envelope.data = []
+        self.assertEqual(self._encoder().encode([]), self.envelope.as_json())
+
+    def testWriteToSink(self):
+        sink = io.BytesIO()
+        written = self._encoder().write(self.envelope.data, sink)
+        self.assertEqual(written, len(sink.getvalue()))
+        self.assertEqual(sink.getvalue().decode("utf-8"), self.envelope.as_json())
+
+    def testInvalidEnvelopeProperties(self):
+        with self.assertRaises(ValueError):
+            util.caliper.request.EnvelopeEncoder(send_time="yesterday", sensor_id="s")
+        with self.assertRaises(ValueError):
+            util.caliper.request.EnvelopeEncoder(send_time=self.envelope.sendTime)
+        with self.assertRaises(TypeError):
+            self._encoder().encode(["https://example.edu/not/an/object"])
+
+
+class TestStreamingHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.options = util.get_testing_options()
+        self.options.STREAM_PAYLOAD = True
+        self.sensor = util.caliper.build_sensor_from_config(
+            config_options=self.options, sensor_id=util._SENSOR_ID
+        )
+        self.events = util.build_sample_events(3)
+
+    def tearDown(self):
+        del self.sensor
+
+    def testChunkedSend(self):
+        received = []
+
+        def endpoint(request):
+            received.append((request.headers, util.read_body(request)))
+            return 201, {}, ""
+
+        ids, statistics = util.sensor_send_to(self.sensor, self.events, endpoint)
+        headers, body = received[0]
+        self.assertEqual(headers.get("Transfer-Encoding"), "chunked")
+        self.assertNotIn("Content-Length", headers)
+        sent = json.loads(body.decode("utf-8"))
+        self.assertEqual([e["id"] for e in sent["data"]], [e.id for e in self.events])
+        self.assertEqual(ids["default"], util.scan_ids(body.decode("utf-8")))
+        self.assertEqual(statistics[0].successful.count, len(self.events))
+
+
+class TestJsonBackendHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(3)
+        self.events[0].object.extensions.update({"title": "Café — 日本"})
+
+    def _send(self, stream_payload):
+        options = util.get_testing_options()
+        options.JSON_BACKEND = "auto"
+        options.STREAM_PAYLOAD = stream_payload
+        sensor = util.caliper.build_sensor_from_config(
+            config_options=options, sensor_id=util._SENSOR_ID
+        )
+        received = []
+
+        def endpoint(request):
+            received.append(util.read_body(request))
+            return 201, {}, ""
+
+        ids, _ = util.sensor_send_to(sensor, self.events, endpoint)
+        return received[0], ids["default"]
+
+    def testCanonicalPayload(self):
+        for stream_payload in (False, True):
+            body, ids = self._send(stream_payload)
+            sent = json.loads(body.decode("utf-8"))
+            self.assertEqual(
+                body,
+                util.caliper.base.get_json_backend("json").dumpb(sent),
+            )
+            self.assertEqual(
+                sent["data"][0]["object"]["extensions"]["title"], "Café — 日本"
+            )
+            self.assertEqual(ids, util.scan_ids(json.dumps(sent, sort_keys=True)))
+
+
+class TestDeduplicatingHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.entities = util.build_sample_entities()
+        self.events = util.build_sample_events(4, entities=self.entities)
+
+    def _send(self, stream_payload):
+        options = util.get_testing_options()
+        options.DEDUPLICATE_ENTITIES = True
+        options.STREAM_PAYLOAD = stream_payload
+        sensor = util.caliper.build_sensor_from_config(
+            config_options=options, sensor_id=util._SENSOR_ID
+        )
+        received = []
+
+        def endpoint(request):
+            received.append(util.read_body(request).decode("utf-8"))
+            return 201, {}, ""
+
+        ids, _ = util.sensor_send_to(sensor, self.events, endpoint)
+        return received[0], ids["default"]
+
+    def testSharedEntitiesSentOnce(self):
+        for stream_payload in (False, True):
+            body, ids = self._send(stream_payload)
+            self.assertEqual(ids, util.scan_ids(body))
+            sent = json.loads(body)["data"]
+            for entity in self.entities.values():
+                self.assertEqual(ids.count(entity.id), 1)
+            self.assertEqual(
+                [e["actor"] for e in sent[1:]], 3 * [sent[0]["actor"]["id"]]
+            )
+
+    def testCondensesWithReferences(self):
+        body, _ = self._send(False)
+        events = util.caliper.condensor.from_caliper_envelope_json(body)
+        self.assertEqual(events[0].actor.id, self.entities["actor"].id)
+        self.assertEqual(events[-1].actor, self.entities["actor"].id)
+
+
+class TestCompressingHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(10)
+
+    def _send(self, **kwargs):
+        options = util.get_testing_options()
+        for k, v in kwargs.items():
+            setattr(options, k, v)
+        sensor = util.caliper.build_sensor_from_config(
+            config_options=options, sensor_id=util._SENSOR_ID
+        )
+        received = []
+
+        # stands in for an endpoint that decodes what the sensor sends
+        def endpoint(request):
+            body = sent = util.read_body(request)
+            encoding = request.headers.get("Content-Encoding")
+            if encoding:
+                body = util.caliper.compression.decompress(
+                    sent, encoding, zdict=options.COMPRESSION_DICTIONARY
+                )
+            received.append((encoding, len(sent), body))
+            return 201, {}, ""
+
+        ids, statistics = util.sensor_send_to(sensor, self.events, endpoint)
+        return received[0], ids["default"], statistics[0]
+
+    def testCompressedPayloads(self):
+        zdict = b'"@context":"http://purl.imsglobal.org/ctx/caliper/v1p2"'
+        for compression, zdict in (
+            ("gzip", None),
+            ("deflate", None),
+            ("deflate", zdict),
+        ):
+            for stream_payload in (False, True):
+                (encoding, size, body), ids, stats = self._send(
+                    COMPRESSION=compression,
+                    COMPRESSION_DICTIONARY=zdict,
+                    STREAM_PAYLOAD=stream_payload,
+                )
+                self.assertEqual(encoding, compression)
+                sent = json.loads(body.decode("utf-8"))
+                self.assertEqual(
+                    [e["id"] for e in sent["data"]], [e.id for e in self.events]
+                )
+                self.assertEqual(ids, util.scan_ids(body.decode("utf-8")))
+                self.assertEqual(stats.compression_ratio.count, 1)
+                self.assertAlmostEqual(stats.compression_ratio.last, len(body) / size)
+                self.assertGreater(stats.compression_ratio.last, 5)
+                self.assertEqual(stats.compression_time.count, 1)
+
+    def testBelowThresholdSentAsIs(self):
+        (encoding, size, body), _, stats = self._send(
+            COMPRESSION="gzip", COMPRESSION_THRESHOLD=10**7
+        )
+        self.assertIsNone(encoding)
+        self.assertEqual(size, len(body))
+        self.assertEqual(stats.compression_ratio.count, 0)
+
+    def testInvalidCompressionOptions(self):
+        with self.assertRaises(ValueError):
+            util.caliper.base.HttpOptions(compression="br")
+        with self.assertRaises(ValueError):
+            util.caliper.base.HttpOptions(compression_dictionary="not bytes")
+        with self.assertRaises(ValueError):
+            util.caliper.base.HttpOptions(
+                compression="gzip", compression_dictionary=b"{}"
+            )
+        options = util.caliper.base.HttpOptions(
+            compression="deflate", compression_dictionary=b"{}"
+        )
+        with self.assertRaises(ValueError):
+            options.COMPRESSION = "gzip"
+        self.assertEqual(options.COMPRESSION, "deflate")
+        options.COMPRESSION = None
+        with self.assertRaises(ValueError):
+            options.COMPRESSION = "gzip"
+        options.COMPRESSION_DICTIONARY = None
+        options.COMPRESSION = "gzip"
+        with self.assertRaises(ValueError):
+            options.COMPRESSION_DICTIONARY = b"{}"
+        self.assertIsNone(options.COMPRESSION_DICTIONARY)
+
+
+class TestPooledHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(2)
+
+    def _requestor(self, url, **kwargs):
+        options = util.caliper.base.HttpOptions(host=url, **kwargs)
+        return util.caliper.request.HttpRequestor(options=options)
+
+    def testConnectionReused(self):
+        with util.LocalEndpoint() as endpoint:
+            requestor = self._requestor(endpoint.url)
+            for i in range(5):
+                results, _, _ = requestor.send(self.events, sensor_id=util._SENSOR_ID)
+                self.assertEqual(results, [True, True])
+            requestor.close()
+        self.assertEqual(len(endpoint.received), 5)
+        self.assertEqual(len(endpoint.client_addresses), 1)
+
+    def testWithoutKeepAlive(self):
+        with util.LocalEndpoint() as endpoint:
+            requestor = self._requestor(endpoint.url, keep_alive=False)
+            for i in range(3):
+                requestor.send(self.events, sensor_id=util._SENSOR_ID)
+            self.assertIsNone(requestor._session)
+        self.assertEqual(len(endpoint.client_addresses), 3)
+
+    def testSharedAcrossThreads(self):
+        results = []
+        with util.LocalEndpoint() as endpoint:
+            requestor = self._requestor(endpoint.url, pool_maxsize=4)
+
+            def send():
+                for i in range(5):
+                    results.extend(
+                        requestor.send(self.events, sensor_id=util._SENSOR_ID)[0]
+                    )
+
+            threads = [threading.Thread(target=send) for i in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            requestor.close()
+        self.assertEqual(results, 40 * [True])
+        self.assertLessEqual(len(endpoint.client_addresses), 4)
+
+    def testCloseReleasesSession(self):
+        with util.LocalEndpoint() as endpoint:
+            requestor = self._requestor(endpoint.url)
+            requestor.send(self.events, sensor_id=util._SENSOR_ID)
+            session = requestor._session
+            requestor.close()
+            self.assertIsNone(requestor._session)
+            requestor.send(self.events, sensor_id=util._SENSOR_ID)
+            self.assertIsNot(requestor._session, session)
+            requestor.close()
+        self.assertEqual(len(endpoint.client_addresses), 2)
+
+
+class TestHttpRequestorTimeouts(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(2)
+
+    def _sensor(self, url, **kwargs):
+        options = util.caliper.base.HttpOptions(host=url, **kwargs)
+        return util.caliper.build_sensor_from_config(
+            config_options=options, sensor_id=util._SENSOR_ID
+        )
+
+    def _slow(self, body):
+        time.sleep(0.5)
+        return 201
+
+    def testTimeoutsFromOptions(self):
+        options = util.caliper.base.HttpOptions(
+            connection_timeout=2000, socket_timeout=3000
+        )
+        requestor = util.caliper.request.HttpRequestor(options=options)
+        self.assertEqual(requestor._get_timeout(None), (2.0, 3.0))
+        for t in requestor._get_timeout(time.monotonic() + 0.5):
+            self.assertLessEqual(t, 0.5)
+
+    def testDeadlineBoundsSlowEndpoint(self):
+        with util.LocalEndpoint(respond=self._slow) as endpoint:
+            with self._sensor(endpoint.url) as sensor:
+                start = time.monotonic()
+                ids = sensor.send(self.events, deadline=100)
+                self.assertLess(time.monotonic() - start, 0.4)
+                self.assertEqual(ids["default"], [])
+                stats = sensor.statistics[0]
+                self.assertEqual(stats.timeouts.count, 1)
+                self.assertEqual(stats.failed.count, 2)
+
+    def testPoolWaitTimesOut(self):
+        with util.LocalEndpoint() as endpoint:
+            with self._sensor(endpoint.url, pool_maxsize=1) as sensor:
+                requestor = sensor.client_registry["default"]._requestor
+                _, slots = requestor._get_session()
+                slots.acquire()
+                sensor.send(self.events, deadline=50)
+                slots.release()
+                self.assertEqual(sensor.statistics[0].timeouts.count, 1)
+                sensor.send(self.events)
+                self.assertEqual(sensor.statistics[0].successful.count, 2)
+        self.assertEqual(len(endpoint.received), 1)
+
+    def testExpiredDeadline(self):
+        with util.LocalEndpoint() as endpoint:
+            options = util.caliper.base.HttpOptions(host=endpoint.url)
+            with util.caliper.build_simple_sensor(
+                config_options=options, sensor_id=util._SENSOR_ID
+            ) as sensor:
+                sensor.send(self.events, deadline=0)
+                self.assertIsNone(sensor.status_code)
+                self.assertEqual(sensor.statistics[0].timeouts.count, 1)
+        self.assertEqual(endpoint.received, [])
+
+
+class TestSplittingHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.entities = util.build_sample_entities()
+        self.events = util.build_sample_events(10, entities=self.entities)
+        self.event_size = len(
+            self.events[0].as_json(thin_context=True, thin_props=True)
+        )
+
+    def _config(self, size):
+        return {
+            "caliper_maximum_payload_size": size,
+            "caliper_supported_versions": [util.caliper.constants.CALIPER_CORE_CONTEXT],
+        }
+
+    def _requestor(self, url, split_payloads=True, **kwargs):
+        options = util.caliper.base.HttpOptions(
+            host=url, split_payloads=split_payloads, **kwargs
+        )
+        return util.caliper.request.HttpRequestor(options=options)
+
+    def _send(self, requestor):
+        return requestor.send(self.events, sensor_id=util._SENSOR_ID, debug=True)
+
+    def testSplitsToFitLimit(self):
+        limit = 4 * self.event_size
+        with util.LocalEndpoint(config=self._config(limit)) as endpoint:
+            requestor = self._requestor(endpoint.url)
+            results, ids, response = self._send(requestor)
+            requestor.close()
+        # each envelope's own properties leave room for three events
+        self.assertEqual(len(endpoint.received), 4)
+        sent = []
+        for _, _, body in endpoint.received:
+            self.assertLessEqual(len(body), limit)
+            sent.extend(json.loads(body)["data"])
+        self.assertEqual([e["id"] for e in sent], [e.id for e in self.events])
+        self.assertEqual(results, 10 * [True])
+        envelope = util.caliper.request.Envelope(
+            data=self.events,
+            send_time=util._SAMPLE_SEND_TIME,
+            sensor_id=util._SENSOR_ID,
+        )
+        _, expected = envelope.as_json_with_ids(thin_context=True, thin_props=True)
+        self.assertEqual(ids, expected)
+        self.assertEqual(response.status_code, 201)
+
+    def testConfigFetchedOnce(self):
+        with util.LocalEndpoint(config=self._config(1048576)) as endpoint:
+            requestor = self._requestor(endpoint.url)
+            for i in range(3):
+                self._send(requestor)
+            self.assertEqual(requestor.get_payload_limit(), 1048576)
+            requestor.close()
+        self.assertEqual(endpoint.config_requests, 1)
+        self.assertEqual(len(endpoint.received), 3)
+
+    def testWithoutLimit(self):
+        with util.LocalEndpoint() as endpoint:
+            requestor = self._requestor(endpoint.url)
+            self._send(requestor)
+            self.assertIsNone(requestor.get_payload_limit())
+            requestor.close()
+        self.assertEqual(len(endpoint.received), 1)
+
+    def testOffByDefault(self):
+        with util.LocalEndpoint(config=self._config(64)) as endpoint:
+            options = util.caliper.base.HttpOptions(host=endpoint.url)
+            requestor = util.caliper.request.HttpRequestor(options=options)
+            self._send(requestor)
+            requestor.close()
+        self.assertEqual(endpoint.config_requests, 0)
+
+    def testFailedFetchRetried(self):
+        statuses = [503]
+        with util.LocalEndpoint(
+            config=self._config(4 * self.event_size),
+            config_status=lambda: statuses.pop() if statuses else 200,
+        ) as endpoint:
+            requestor = self._requestor(endpoint.url, retry_backoff=50)
+            self._send(requestor)
+            self.assertIsNone(requestor.get_payload_limit())
+            self.assertEqual(endpoint.config_requests, 1)
+            self.assertEqual(len(endpoint.received), 1)
+            time.sleep(0.06)
+            self._send(requestor)
+            self.assertEqual(requestor.get_payload_limit(), 4 * self.event_size)
+            requestor.close()
+        self.assertEqual(endpoint.config_requests, 2)
+        self.assertGreater(len(endpoint.received), 2)
+
+    def testUnreachableFetchRetried(self):
+        with util.LocalEndpoint() as endpoint:
+            url = endpoint.url
+        requestor = self._requestor(url, retry_backoff=50)
+        fetches = []
+        get_config_response = requestor._get_config_response
+
+        def counted(*args):
+            fetches.append(args)
+            return get_config_response(*args)
+
+        requestor._get_config_response = counted
+        self.assertIsNone(requestor.get_payload_limit())
+        # backing off
+        self.assertIsNone(requestor.get_payload_limit())
+        self.assertEqual(len(fetches), 1)
+        time.sleep(0.06)
+        self.assertIsNone(requestor.get_payload_limit())
+        self.assertEqual(len(fetches), 2)
+        requestor.close()
+
+    def testSplittingOff(self):
+        with util.LocalEndpoint(config=self._config(64)) as endpoint:
+            requestor = self._requestor(endpoint.url, split_payloads=False)
+            self._send(requestor)
+            requestor.close()
+        self.assertEqual(endpoint.config_requests, 0)
+        self.assertEqual(len(endpoint.received), 1)
+
+    def testOversizedEventGoesAlone(self):
+        with util.LocalEndpoint(config=self._config(64)) as endpoint:
+            requestor = self._requestor(endpoint.url)
+            results, _, _ = self._send(requestor)
+            requestor.close()
+        self.assertEqual(len(endpoint.received), 10)
+        self.assertEqual(results, 10 * [True])
+
+    def testResultsMergedInOrder(self):
+        def respond(body):
+            return (
+                500 if json.loads(body)["data"][0]["id"] == self.events[3].id else 201
+            )
+
+        limit = 4 * self.event_size
+        with util.LocalEndpoint(respond=respond, config=self._config(limit)) as ep:
+            requestor = self._requestor(ep.url)
+            results, ids, response = self._send(requestor)
+            requestor.close()
+        self.assertEqual(results, 3 * [True] + 3 * [False] + 4 * [True])
+        self.assertNotIn(self.events[3].id, ids)
+        self.assertIn(self.events[6].id, ids)
+        self.assertEqual(response.status_code, 500)
+
+    def testDeduplicationPerEnvelope(self):
+        limit = 4 * self.event_size
+        with util.LocalEndpoint(config=self._config(limit)) as endpoint:
+            requestor = self._requestor(endpoint.url, deduplicate_entities=True)
+            self._send(requestor)
+            requestor.close()
+        self.assertGreater(len(endpoint.received), 1)
+        for _, _, body in endpoint.received:
+            first, *rest = json.loads(body)["data"]
+            self.assertEqual(first["actor"]["id"], self.entities["actor"].id)
+            for event in rest:
+                self.assertEqual(event["actor"], self.entities["actor"].id)
+
+
+class TestRetryingHttpRequestor(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(2)
+        self.stats = util.caliper.util.stats.Statistics()
+
+    def _requestor(self, url, **kwargs):
+        kwargs.setdefault("retry_backoff", 1)
+        options = util.caliper.base.HttpOptions(host=url, **kwargs)
+        requestor = util.caliper.request.HttpRequestor(options=options)
+        requestor.stats = self.stats
+        return requestor
+
+    def _responder(self, *statuses):
+        replies = list(statuses)
+        return lambda body: replies.pop(0) if len(replies) > 1 else replies[0]
+
+    def _send(self, requestor, **kwargs):
+        r = requestor.send(self.events, sensor_id=util._SENSOR_ID, debug=True, **kwargs)
+        requestor.close()
+        return r
+
+    def testRetriesUntilSuccess(self):
+        with util.LocalEndpoint(respond=self._responder(503, 502, 201)) as endpoint:
+            results, ids, response = self._send(self._requestor(endpoint.url))
+        self.assertEqual(len(endpoint.received), 3)
+        self.assertEqual(results, [True, True])
+        self.assertIn(self.events[0].id, ids)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stats.attempts.sum, 3)
+        # every attempt carries the same events
+        bodies = {
+            tuple(e["id"] for e in json.loads(body)["data"])
+            for _, _, body in endpoint.received
+        }
+        self.assertEqual(len(bodies), 1)
+
+    def testGivesUpAfterMaxAttempts(self):
+        with util.LocalEndpoint(respond=self._responder(503)) as endpoint:
+            results, ids, response = self._send(
+                self._requestor(endpoint.url, retry_attempts=4)
+            )
+        self.assertEqual(len(endpoint.received), 4)
+        self.assertEqual(results, [False, False])
+        self.assertEqual(ids, [])
+        self.assertEqual(response.status_code, 503)
+
+    def testOtherStatusNotRetried(self):
+        with util.LocalEndpoint(respond=self._responder(500)) as endpoint:
+            self._send(self._requestor(endpoint.url))
+        self.assertEqual(len(endpoint.received), 1)
+        with util.LocalEndpoint(respond=self._responder(500, 201)) as endpoint:
+            results, _, _ = self._send(
+                self._requestor(endpoint.url, retry_status_codes=[500])
+            )
+        self.assertEqual(results, [True, True])
+
+    def testRetryAfter(self):
+        respond = self._responder((429, {"Retry-After": "0.2"}), 201)
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            start = time.monotonic()
+            results, _, _ = self._send(self._requestor(endpoint.url))
+            self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(results, [True, True])
+
+    def testRetryAfterPastDeadline(self):
+        respond = self._responder((503, {"Retry-After": "10"}), 201)
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            start = time.monotonic()
+            results, _, _ = self._send(self._requestor(endpoint.url), deadline=500)
+            self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(len(endpoint.received), 1)
+        self.assertEqual(results, [False, False])
+
+    def testRetryAfterPastBackoffMax(self):
+        respond = self._responder((503, {"Retry-After": "60"}), 201)
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            start = time.monotonic()
+            results, _, _ = self._send(
+                self._requestor(endpoint.url, retry_backoff_max=1000)
+            )
+            self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(len(endpoint.received), 1)
+        self.assertEqual(results, [False, False])
+
+    def testStreamedPayloadRetried(self):
+        with util.LocalEndpoint(respond=self._responder(503, 201)) as endpoint:
+            results, _, _ = self._send(
+                self._requestor(endpoint.url, stream_payload=True)
+            )
+        self.assertEqual(results, [True, True])
+        for _, _, body in endpoint.received:
+            self.assertEqual(len(json.loads(body)["data"]), len(self.events))
+
+    def testConnectionErrorRetried(self):
+        with util.LocalEndpoint() as endpoint:
+            url = endpoint.url
+        requestor = self._requestor(url, retry_attempts=2)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self._send(requestor)
+        self.assertEqual(self.stats.attempts.sum, 2)
+
+    def testBackoffWithFullJitter(self):
+        requestor = self._requestor(
+            "https://example.edu", retry_backoff=100, retry_backoff_max=250
+        )
+        error = requests.exceptions.ConnectionError()
+        for attempt, cap in ((1, 0.1), (2, 0.2), (3, 0.25), (10, 0.25)):
+            requestor._options.RETRY_ATTEMPTS = attempt + 1
+            waits = [
+                requestor._get_retry_wait(attempt, None, error, None) for i in range(50)
+            ]
+            self.assertTrue(all(0 <= w <= cap for w in waits))
+            self.assertGreater(len(set(waits)), 1)
+        self.assertIsNone(requestor._get_retry_wait(attempt + 1, None, error, None))
+
+    def testRetryAfterDate(self):
+        class Response(object):
+            headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+
+        self.assertEqual(util.caliper.request._get_retry_after(Response()), 0.0)
+        Response.headers = {"Retry-After": "soon"}
+        self.assertIsNone(util.caliper.request._get_retry_after(Response()))
+
+    def testInvalidOptions(self):
+        for k, v in (
+            ("retry_attempts", 0),
+            ("retry_backoff", -1),
+            ("retry_backoff_max", -1),
+            ("retry_exceptions", ["ConnectionError"]),
+        ):
+            with self.assertRaises(ValueError):
+                util.caliper.base.HttpOptions(**{k: v})
@@ -19,6 +19,8 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 
 import json
+import threading
+import time
 import unittest
 
 from . import util
@@ -247,6 +249,20 @@ class TestCaliperSensor(unittest.TestCase):
             self.assertEqual(succeeded, self.iterations)
             self.assertEqual(failed, 0)
 
+    def testValidationLevel(self):
+        base = util.caliper.base
+        with self.sensor.validation():
+            self.assertEqual(base.get_validation_level(), "strict")
+        sensor = util.caliper.build_sensor_from_config(
+            config_options=base.HttpOptions(validation_level="trusted")
+        )
+        self.assertEqual(sensor.validation_level, "trusted")
+        with sensor.validation():
+            self.assertEqual(base.get_validation_level(), "trusted")
+        self.assertEqual(base.get_validation_level(), "strict")
+        with self.assertRaises(ValueError):
+            sensor.validation_level = "lenient"
+
 
 class TestDebugSensor(unittest.TestCase):
     def setUp(self):
@@ -262,3 +278,340 @@ class TestDebugSensor(unittest.TestCase):
             )
         for response in self.sensor.client_registry["default"].debug:
             self.assertEqual(response.status_code, 201)
+
+
+class TestClient(unittest.TestCase):
+    def setUp(self):
+        self.options = util.get_testing_options()
+
+    def testProvidedRequestorAndStats(self):
+        requestor = util.caliper.request.HttpRequestor(options=self.options)
+        stats = util.caliper.util.stats.Statistics()
+        client = util.caliper.sensor.Client(
+            config_options=self.options, requestor=requestor, stats=stats
+        )
+        self.assertIs(client._requestor, requestor)
+        self.assertIs(client.stats, stats)
+        self.assertIs(requestor.stats, stats)
+        client._reset()
+        self.assertIs(requestor.stats, client.stats)
+
+    def testStatisticsThreadSafe(self):
+        stats = util.caliper.util.stats.Statistics()
+        self.assertEqual(list(stats._keys)[:3], ["MEASURE", "DESCRIBE", "SUCCESSFUL"])
+        self.assertEqual(
+            set(util.caliper.util.stats.SimpleStatistics._keys) - set(stats._keys),
+            {"SENT"},
+        )
+
+        def update():
+            for i in range(10000):
+                stats.update_successful(1)
+
+        threads = [threading.Thread(target=update) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.successful.count, 80000)
+        self.assertEqual(stats.successful.sum, 80000.0)
+
+    def testContextManagersClose(self):
+        with util.LocalEndpoint() as endpoint:
+            self.options.HOST = endpoint.url
+            with util.caliper.build_sensor_from_config(
+                config_options=self.options, sensor_id=util._SENSOR_ID
+            ) as sensor:
+                sensor.send(util.build_sample_events(1))
+                requestor = sensor.client_registry["default"]._requestor
+                self.assertIsNotNone(requestor._session)
+            self.assertIsNone(requestor._session)
+            with util.caliper.build_simple_sensor(
+                config_options=self.options, sensor_id=util._SENSOR_ID
+            ) as sensor:
+                sensor.send(util.build_sample_events(1))
+            self.assertIsNone(sensor._requestor._session)
+
+
+class TestSensorFanOut(unittest.TestCase):
+    def setUp(self):
+        self.delay = 0.3
+        self.release = threading.Event()
+
+    def _respond(self, body):
+        time.sleep(self.delay)
+        return 201
+
+    def _sensor(self, urls, **kwargs):
+        sensor = util.caliper.sensor.Sensor(sensor_id=util._SENSOR_ID, **kwargs)
+        for i, url in enumerate(urls):
+            options = util.caliper.base.HttpOptions(host=url, retry_attempts=1)
+            sensor.register_client(
+                "client{}".format(i), util.caliper.sensor.Client(config_options=options)
+            )
+        return sensor
+
+    def testLatencyIsSlowestEndpoint(self):
+        with util.LocalEndpoint(respond=self._respond) as first:
+            with util.LocalEndpoint(respond=self._respond) as second:
+                with util.LocalEndpoint(respond=self._respond) as third:
+                    endpoints = [first, second, third]
+                    with self._sensor([e.url for e in endpoints]) as sensor:
+                        events = util.build_sample_events(2)
+                        start = time.monotonic()
+                        identifiers = sensor.send(events)
+                        elapsed = time.monotonic() - start
+                        self.assertGreaterEqual(elapsed, self.delay)
+                        self.assertLess(elapsed, 2 * self.delay)
+                        self.assertEqual(
+                            list(identifiers), ["client0", "client1", "client2"]
+                        )
+                        for k, client in sensor.client_registry.items():
+                            for event in events:
+                                self.assertIn(event.id, identifiers[k])
+                            self.assertEqual(client.stats.successful.count, 2)
+                        start = time.monotonic()
+                        sensor.describe(util.build_sample_entities()["actor"])
+                        self.assertLess(time.monotonic() - start, 2 * self.delay)
+        for endpoint in endpoints:
+            self.assertEqual(len(endpoint.received), 2)
+
+    def testClientTimeout(self):
+        def respond(body):
+            self.release.wait(5)
+            return 201
+
+        with util.LocalEndpoint(respond=respond) as slow:
+            with util.LocalEndpoint() as fast:
+                sensor = self._sensor([slow.url, fast.url], client_timeout=100)
+                start = time.monotonic()
+                identifiers = sensor.send(util.build_sample_events(1))
+                self.assertLess(time.monotonic() - start, 1)
+                self.release.set()
+                slow_client, fast_client = sensor.client_registry.values()
+                self.assertEqual(slow_client.stats.timeouts.count, 1)
+                self.assertEqual(slow_client.stats.failed.count, 1)
+                self.assertEqual(fast_client.stats.successful.count, 1)
+                self.assertEqual(identifiers["client0"], [])
+                self.assertTrue(identifiers["client1"])
+                sensor.close()
+
+    def testClientErrorRaisedAfterOthersFinish(self):
+        with util.LocalEndpoint() as endpoint:
+            url = endpoint.url
+        with util.LocalEndpoint() as endpoint:
+            sensor = self._sensor([url, endpoint.url])
+            with self.assertRaises(util.caliper.request.requests.ConnectionError):
+                sensor.send(util.build_sample_events(1))
+            self.assertEqual(len(endpoint.received), 1)
+            sensor.close()
+
+    def testInvalidClientTimeout(self):
+        with self.assertRaises(ValueError):
+            util.caliper.sensor.Sensor(client_timeout=-1)
+
+
+class TestSharedEncoding(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(4)
+
+    def _sensor(self, options_list):
+        sensor = util.caliper.sensor.Sensor(sensor_id=util._SENSOR_ID)
+        for i, options in enumerate(options_list):
+            sensor.register_client(
+                "client{}".format(i), util.caliper.sensor.Client(config_options=options)
+            )
+        return sensor
+
+    def _options(self, url, **kwargs):
+        return util.caliper.base.HttpOptions(host=url, retry_attempts=1, **kwargs)
+
+    def _data(self, endpoint):
+        return [json.loads(body)["data"] for _, _, body in endpoint.received]
+
+    def _count_encodings(self):
+        encoder = util.caliper.request.DataEncoder
+        encode_item = encoder.encode_item
+        self.encodings = 0
+
+        def counting(encoder, *args, **kwargs):
+            self.encodings += 1
+            return encode_item(encoder, *args, **kwargs)
+
+        encoder.encode_item = counting
+        self.addCleanup(setattr, encoder, "encode_item", encode_item)
+
+    def testEncodesOncePerSettings(self):
+        self._count_encodings()
+        with util.LocalEndpoint() as first, util.LocalEndpoint() as second:
+            with util.LocalEndpoint() as alone:
+                with self._sensor(
+                    [
+                        self._options(first.url),
+                        self._options(second.url),
+                        self._options(alone.url, json_backend="json"),
+                    ]
+                ) as sensor:
+                    self.assertEqual(
+                        list(sensor._encode_shared(self.events, None)),
+                        [(True, None)],
+                    )
+                    self.encodings = 0
+                    identifiers = sensor.send(self.events)
+                    self.assertEqual(self.encodings, len(self.events))
+                    for client in sensor.client_registry.values():
+                        self.assertEqual(client.stats.successful.count, 4)
+        self.assertEqual(identifiers["client0"], identifiers["client1"])
+        self.assertEqual(identifiers["client0"], identifiers["client2"])
+        self.assertEqual(self._data(first), self._data(second))
+        self.assertEqual(self._data(first), self._data(alone))
+
+    def testSharedItemsSplitToEndpointLimit(self):
+        config = {
+            "caliper_maximum_payload_size": 2048,
+            "caliper_supported_versions": [util.caliper.constants.CALIPER_CORE_CONTEXT],
+        }
+        events = util.build_sample_events(10)
+        with util.LocalEndpoint(config=config) as limited:
+            with util.LocalEndpoint() as unlimited:
+                with self._sensor(
+                    [
+                        self._options(limited.url, split_payloads=True),
+                        self._options(unlimited.url, split_payloads=True),
+                    ]
+                ) as sensor:
+                    sensor.send(events)
+        self.assertGreater(len(limited.received), 1)
+        for _, _, body in limited.received:
+            self.assertLessEqual(len(body), 2048)
+        self.assertEqual(len(unlimited.received), 1)
+        self.assertEqual(
+            [e for data in self._data(limited) for e in data],
+            self._data(unlimited)[0],
+        )
+
+    def testUnsharedSettings(self):
+        options = util.get_testing_options()
+        sensor = self._sensor(
+            [
+                util.caliper.base.HttpOptions(deduplicate_entities=True),
+                util.caliper.base.HttpOptions(deduplicate_entities=True),
+                util.caliper.base.HttpOptions(batch_dispatch=True),
+                util.caliper.base.HttpOptions(batch_dispatch=True),
+                options,
+            ]
+        )
+        self.assertEqual(sensor._encode_shared(self.events, None), {})
+        with self.assertRaises(TypeError):
+            self._sensor([options, options]).send([None])
+
+    def testChecksEventsOnce(self):
+        sensor_module = util.caliper.sensor
+        ensure_list_type = sensor_module.ensure_list_type
+        checked = []
+
+        def counting(items, t):
+            checked.append(t)
+            return ensure_list_type(items, t)
+
+        sensor_module.ensure_list_type = counting
+        self.addCleanup(setattr, sensor_module, "ensure_list_type", ensure_list_type)
+        with util.LocalEndpoint() as first, util.LocalEndpoint() as second:
+            with util.LocalEndpoint() as alone:
+                with self._sensor(
+                    [
+                        self._options(first.url),
+                        self._options(second.url),
+                        self._options(alone.url, json_backend="json"),
+                    ]
+                ) as sensor:
+                    sensor.send(self.events)
+                    self.assertEqual(checked, [util.caliper.events.Event])
+                    del checked[:]
+                    sensor.client_registry["client2"].send(
+                        self.events, sensor_id=util._SENSOR_ID
+                    )
+                    self.assertEqual(checked, [util.caliper.events.Event])
+        self.assertEqual(len(alone.received), 2)
+
+
+class TestSendAsync(unittest.TestCase):
+    def setUp(self):
+        self.events = util.build_sample_events(2)
+        self.done = threading.Event()
+        self.outcomes = []
+
+    def _sensor(self, url):
+        return util.caliper.build_sensor_from_config(
+            config_options=util.caliper.base.HttpOptions(host=url, retry_attempts=1),
+            sensor_id=util._SENSOR_ID,
+        )
+
+    def _on(self, outcome):
+        def callback(value):
+            self.outcomes.append((outcome, value))
+            self.done.set()
+
+        return callback
+
+    def _send(self, sensor, **kwargs):
+        return sensor.send_async(
+            self.events,
+            on_success=self._on("success"),
+            on_failure=self._on("failure"),
+            **kwargs
+        )
+
+    def testReturnsBeforeDelivery(self):
+        release = threading.Event()
+
+        def respond(body):
+            release.wait(5)
+            return 201
+
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            with self._sensor(endpoint.url) as sensor:
+                future = self._send(sensor)
+                self.assertFalse(future.done())
+                release.set()
+                identifiers = future.result(5)
+                self.assertTrue(self.done.wait(5))
+        for event in self.events:
+            self.assertIn(event.id, identifiers["default"])
+        self.assertEqual(self.outcomes, [("success", identifiers)])
+        self.assertEqual(sensor.statistics[0].successful.count, 2)
+
+    def testFailureCallback(self):
+        with util.LocalEndpoint() as endpoint:
+            url = endpoint.url
+        future = self._send(self._sensor(url))
+        with self.assertRaises(util.caliper.request.requests.ConnectionError):
+            future.result(5)
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.outcomes[0][0], "failure")
+        self.assertIs(self.outcomes[0][1], future.exception())
+
+    def testBacklogFullTimesOut(self):
+        module = util.caliper.sensor
+        self.addCleanup(setattr, module, "_send_slots", module._send_slots)
+        module._send_slots = threading.BoundedSemaphore(1)
+        release = threading.Event()
+
+        def respond(body):
+            release.wait(5)
+            return 201
+
+        with util.LocalEndpoint(respond=respond) as endpoint:
+            with self._sensor(endpoint.url) as sensor:
+                first = sensor.send_async(self.events)
+                second = self._send(sensor, deadline=50)
+                self.assertTrue(second.done())
+                self.assertIsInstance(
+                    second.exception(),
+                    util.caliper.sensor.concurrent.futures.TimeoutError,
+                )
+                self.assertEqual(self.outcomes[0][0], "failure")
+                release.set()
+                self.assertTrue(first.result(5)["default"])
+                third = sensor.send_async(self.events)
+                self.assertTrue(third.result(5)["default"])
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Caliper-python testing package (testing the on-disk spool)
+#
+# This file is part of the IMS Caliper Analytics(tm) and is licensed to IMS
+# Global Learning Consortium, Inc. (http://www.imsglobal.org) under one or more
+# contributor license agreements. See the NOTICE file distributed with this
+# work for additional information.
+#
+# IMS Caliper is free software: you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation, version 3 of the License.
+#
+# IMS Caliper is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+
+import json
+import os
+import tempfile
+import unittest
+
+from . import util
+
+
+class TestSpool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _spool(self, **kwargs):
+        return util.caliper.spool.Spool(self.directory, **kwargs)
+
+    def _record(self, i):
+        return "s{}".format(i), [b'{"n": %d}' % i, b'{"m": %d}' % i], ["id{}".format(i)]
+
+    def _replay(self, spool, fail_at=None):
+        replayed = []
+
+        def send(sensor_id, fragments, ids):
+            if len(replayed) == fail_at:
+                return False
+            replayed.append((sensor_id, fragments, ids))
+            return True
+
+        return spool.replay(send), replayed
+
+    def _segments(self):
+        return sorted(n for n in os.listdir(self.directory) if n.endswith(".seg"))
+
+    def testReplaysInOrder(self):
+        spool = self._spool()
+        tokens = [spool.append(*self._record(i)) for i in range(5)]
+        self.assertTrue(spool.pending)
+        self.assertFalse(spool.delivered(tokens[0]))
+        done, replayed = self._replay(spool)
+        self.assertTrue(done)
+        self.assertEqual(replayed, [self._record(i) for i in range(5)])
+        self.assertFalse(spool.pending)
+        self.assertTrue(all(spool.delivered(t) for t in tokens))
+        spool.close()
+
+    def testReplayStopsAtFailure(self):
+        spool = self._spool()
+        for i in range(5):
+            spool.append(*self._record(i))
+        done, replayed = self._replay(spool, fail_at=2)
+        self.assertFalse(done)
+        self.assertEqual(len(replayed), 2)
+        done, replayed = self._replay(spool)
+        self.assertTrue(done)
+        self.assertEqual(replayed, [self._record(i) for i in range(2, 5)])
+
+    def testSegmentsRollAndGo(self):
+        spool = self._spool(segment_size=64, max_bytes=4096)
+        for i in range(6):
+            spool.append(*self._record(i))
+        self.assertEqual(len(self._segments()), 6)
+        done, replayed = self._replay(spool)
+        self.assertEqual(len(replayed), 6)
+        self.assertEqual(len(self._segments()), 1)
+
+    def testOffsetSurvivesReopening(self):
+        spool = self._spool(segment_size=64, max_bytes=4096)
+        for i in range(6):
+            spool.append(*self._record(i))
+        self._replay(spool, fail_at=4)
+        spool.close()
+        spool = self._spool(segment_size=64, max_bytes=4096)
+        self.assertTrue(spool.pending)
+        done, replayed = self._replay(spool)
+        self.assertEqual(replayed, [self._record(4), self._record(5)])
+
+    def testTornTailCutOff(self):
+        spool = self._spool()
+        for i in range(3):
+            spool.append(*self._record(i))
+        spool.close()
+        with open(os.path.join(self.directory, self._segments()[-1]), "ab") as f:
+            f.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{")
+        spool = self._spool()
+        spool.append(*self._record(3))
+        done, replayed = self._replay(spool)
+        self.assertEqual(replayed, [self._record(i) for i in range(4)])
+        self.assertEqual(spool.dropped, 0)
+
+    def testCorruptRecordSkipped(self):
+        spool = self._spool(segment_size=64, max_bytes=4096)
+        for i in range(3):
+            spool.append(*self._record(i))
+        spool.close()
+        with open(os.path.join(self.directory, self._segments()[0]), "r+b") as f:
+            f.seek(12)
+            f.write(b"X")
+        spool = self._spool(segment_size=64, max_bytes=4096)
+        done, replayed = self._replay(spool)
+        self.assertEqual(replayed, [self._record(1), self._record(2)])
+        self.assertEqual(spool.dropped, 1)
+
+    def testDiskUsageBounded(self):
+        spool = self._spool(segment_size=64, max_bytes=192)
+        for i in range(6):
+            self.assertIsNotNone(spool.append(*self._record(i)))
+        self.assertEqual(len(self._segments()), 3)
+        self.assertEqual(spool.dropped, 6)
+        done, replayed = self._replay(spool)
+        self.assertEqual(replayed, [self._record(i) for i in range(3, 6)])
+        self.assertIsNone(spool.append("s", [b"x" * 100], []))
+
+    def testInvalidOptions(self):
+        with self.assertRaises(ValueError):
+            self._spool(segment_size=1024, max_bytes=512)
+        with self.assertRaises(ValueError):
+            self._spool(sync_interval=-1)
+
+
+class TestSpoolingRequestor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.status = 503
+        self.stats = util.caliper.util.stats.Statistics()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _requestor(self, url, **kwargs):
+        options = util.caliper.base.HttpOptions(host=url, retry_attempts=1, **kwargs)
+        requestor = util.caliper.spool.SpoolingRequestor(
+            util.caliper.request.HttpRequestor(options=options), self.tmp.name
+        )
+        requestor.stats = self.stats
+        return requestor
+
+    def _endpoint(self):
+        return util.LocalEndpoint(respond=lambda body: self.status)
+
+    def _send(self, requestor, events):
+        return requestor.send(events, sensor_id=util._SENSOR_ID)
+
+    def testSpoolsAndReplaysInOrder(self):
+        events = util.build_sample_events(6)
+        with self._endpoint() as endpoint:
+            requestor = self._requestor(endpoint.url)
+            results, ids, _ = self._send(requestor, events[:2])
+            self.assertEqual(results, [False, False])
+            self.assertEqual(self.stats.spooled.sum, 2)
+            # while the spool holds events, new ones queue behind them
+            results, _, _ = self._send(requestor, events[2:4])
+            self.assertEqual(results, [False, False])
+            self.assertEqual(len(endpoint.received), 2)
+            self.status = 201
+            results, ids, _ = self._send(requestor, events[4:])
+            self.assertEqual(results, [True, True])
+            self.assertIn(events[4].id, ids)
+            self.assertEqual(self.stats.replayed.sum, 6)
+            requestor.close()
+        delivered = [
+            e["id"]
+            for _, _, body in endpoint.received[2:]
+            for e in json.loads(body)["data"]
+        ]
+        self.assertEqual(delivered, [e.id for e in events])
+
+    def testSurvivesRestart(self):
+        events = util.build_sample_events(3)
+        with self._endpoint() as endpoint:
+            requestor = self._requestor(endpoint.url)
+            self._send(requestor, events)
+            requestor.close()
+            self.status = 201
+            requestor = self._requestor(endpoint.url)
+            self.assertTrue(requestor.replay())
+            requestor.close()
+        sent = json.loads(endpoint.received[-1][2])["data"]
+        self.assertEqual([e["id"] for e in sent], [e.id for e in events])
+
+    def testConnectionErrorSpooled(self):
+        with util.LocalEndpoint() as endpoint:
+            url = endpoint.url
+        requestor = self._requestor(url)
+        results, _, _ = self._send(requestor, util.build_sample_events(2))
+        self.assertEqual(results, [False, False])
+        self.assertEqual(self.stats.spooled.sum, 2)
+        requestor.close()
+
+    def testEncodedSendsSpooled(self):
+        events = util.build_sample_events(2)
+        with self._endpoint() as endpoint:
+            requestor = self._requestor(endpoint.url)
+            encoder = requestor.get_data_encoder()
+            fragments = [encoder.encode_item(e) for e in events]
+            results, _, _ = requestor.send_encoded(
+                fragments=fragments, ids=encoder.ids, sensor_id=util._SENSOR_ID
+            )
+            self.assertEqual(results, [False, False])
+            self.status = 201
+            self.assertTrue(requestor.replay())
+            requestor.close()
+        first, second = (json.loads(body) for _, _, body in endpoint.received)
+        self.assertEqual(first["data"], second["data"])
+
+    def testFullQueueSpools(self):
+        options = util.caliper.base.HttpOptions(
+            host="http://127.0.0.1:9/caliper", retry_attempts=1
+        )
+        requestor = util.caliper.spool.SpoolingRequestor(
+            util.caliper.request.HttpRequestor(options=options), self.tmp.name
+        )
+        self.assertEqual(
+            requestor.spool(util.build_sample_events(3), sensor_id=util._SENSOR_ID), 3
+        )
+        self.assertEqual(
+            util.caliper.request.HttpRequestor(options=options).spool(
+                util.build_sample_events(3)
+            ),
+            0,
+        )
+        requestor.close()
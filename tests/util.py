@@ -20,11 +20,22 @@
 
 import json
 import os
+import re
 import responses
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from .context import caliper, TESTDIR
 from caliper import CALIPER_VERSION
+import caliper.breaker
+import caliper.compression
 import caliper.condensor as condensor
+import caliper.entities
+import caliper.events
+import caliper.request
+import caliper.spool
+import caliper.util.zdict
 
 ###
 # NOTE: FIXTURE_DIR assumes that the caliper fixtures repo contents are hosted
@@ -76,6 +87,59 @@ def build_simple_sensor():
     )
 
 
+# sample entities and events built directly, for tests that should not depend on
+# the spec fixtures
+_SAMPLE_EVENT_TIME = "2016-11-15T10:15:00.000Z"
+_SAMPLE_SEND_TIME = "2016-11-15T11:05:01.000Z"
+
+
+def build_sample_entities():
+    return {
+        "actor": caliper.entities.Person(id="https://example.edu/users/554433"),
+        "edApp": caliper.entities.SoftwareApplication(
+            id="https://example.edu", version="v2"
+        ),
+        "group": caliper.entities.CourseSection(
+            id="https://example.edu/terms/201601/courses/7/sections/1",
+            academicSession="Fall 2016",
+            courseNumber="CPS 435-01",
+        ),
+        "session": caliper.entities.Session(
+            id="https://example.edu/sessions/1f6442a482de72ea6ad134943812bff564a76259",
+            startedAtTime="2016-11-15T10:00:00.000Z",
+        ),
+    }
+
+
+def build_sample_event(entities=None, index=0, **kwargs):
+    ents = entities or build_sample_entities()
+    return caliper.events.ViewEvent(
+        action=caliper.constants.CALIPER_ACTIONS["VIEWED"],
+        object=caliper.entities.Document(
+            id="https://example.edu/etexts/{}.epub".format(index),
+            name="IMS Caliper Implementation Guide",
+            dateCreated="2016-08-01T06:00:00.000Z",
+            version="1.1",
+            extensions={"pages": [1, 2, 3]},
+        ),
+        eventTime=_SAMPLE_EVENT_TIME,
+        **dict(ents, **kwargs),
+    )
+
+
+def build_sample_events(count, entities=None):
+    ents = entities or build_sample_entities()
+    return [build_sample_event(entities=ents, index=i) for i in range(count)]
+
+
+def build_sample_envelope(count, entities=None):
+    return caliper.request.Envelope(
+        data=build_sample_events(count, entities=entities),
+        send_time=_SAMPLE_SEND_TIME,
+        sensor_id=_SENSOR_ID,
+    )
+
+
 # TestError caliper serializable to make error handling more uniform to ease testing
 class TestError(caliper.base.CaliperSerializable):
     def __init__(self, error=None, fixture=None, **kwargs):
@@ -174,6 +238,35 @@ def rebuild_envelope(
         return TestError(e, env_dict)
 
 
+# the ids that a json-string representation describes, found by scanning the
+# string (with any extensions stripped out), to check the ids gathered during
+# serialization against
+def _strip_extensions(v):
+    if isinstance(v, dict):
+        return {k: _strip_extensions(i) for k, i in v.items() if k != "extensions"}
+    elif isinstance(v, list):
+        return [_strip_extensions(i) for i in v]
+    return v
+
+
+def scan_ids(json_string):
+    s = json.dumps(_strip_extensions(json.loads(json_string)), sort_keys=True)
+    return re.findall(r'"id": "(.+?(?="))"', re.sub(r'"@context": \[.+?\],', "", s))
+
+
+def rebuild_envelope_with_ids(fixture, thin_props=True, thin_context=True):
+    env_dict = json.loads(get_fixture(fixture))
+    try:
+        payload = condensor.from_caliper_envelope(env_dict, strict=True)
+        return caliper.request.Envelope(
+            data=payload,
+            send_time=env_dict.get("sendTime"),
+            sensor_id=env_dict.get("sensor"),
+        ).as_json_with_ids(thin_props=thin_props, thin_context=thin_context)
+    except Exception as e:
+        return TestError(e, env_dict).as_json(), None
+
+
 # build an envelope from a sensor and the contents of a fixture
 def get_envelope(sensor, fixture):
     env_dict = json.loads(get_fixture(fixture))
@@ -211,9 +304,106 @@ def sensor_config(sensor, data):
     return cfg
 
 
+# send with a callback standing in for the endpoint, which gets each request and
+# returns a (status, headers, body) tuple
+def sensor_send_to(sensor, data, callback):
+    with responses.RequestsMock() as resps:
+        resps.add_callback(responses.POST, _TEST_ENDPOINT, callback=callback)
+        ids = sensor.send(data)
+    return ids, sensor.statistics
+
+
+# a mocked request's body as bytes, whether it went out as a string, as bytes, or
+# as an iterator of byte chunks
+def read_body(request):
+    body = request.body
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    elif isinstance(body, bytes):
+        return body
+    return b"".join(body)
+
+
 def sensor_describe(sensor, data):
     return _send(sensor.describe, sensor, data)
 
 
 def sensor_send(sensor, data):
     return _send(sensor.send, sensor, data)
+
+
+# a real HTTP/1.1 endpoint on localhost, for tests that need actual connections;
+# records (client address, headers, body) for each request, and answers with
+# respond(body), which returns a status code (201 by default), or a status code
+# and a dict of headers to send with it; GET requests get
+# config, the endpoint's config, with the status config_status() returns (200
+# by default), and are counted in config_requests
+class LocalEndpoint(object):
+    def __init__(self, respond=None, config=None, config_status=None):
+        self.received = []
+        self.config_requests = 0
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _read_body(self):
+                if self.headers.get("Transfer-Encoding") != "chunked":
+                    return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                body = b""
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    chunk = self.rfile.read(size + 2)[:size]
+                    if not size:
+                        return body
+                    body += chunk
+
+            def _reply(self, status, body=b""):
+                headers = {}
+                if isinstance(status, tuple):
+                    status, headers = status
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                endpoint.config_requests += 1
+                self._reply(
+                    config_status() if config_status else 200,
+                    json.dumps(config or {}).encode("utf-8"),
+                )
+
+            def do_POST(self):
+                body = self._read_body()
+                endpoint.received.append((self.client_address, self.headers, body))
+                self._reply(respond(body) if respond else 201)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        # clients that time out hang up mid-reply; that's expected here
+        self._server.handle_error = lambda request, client_address: None
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        )
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}/caliper".format(self._server.server_address[1])
+
+    @property
+    def client_addresses(self):
+        return {address for address, _, _ in self.received}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()